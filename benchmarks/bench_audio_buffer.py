@@ -0,0 +1,95 @@
+"""
+Per-packet cost of buffering streamed audio.
+
+Compares the previous `np.concatenate` based buffering of `ServeClientBase` against
+`AudioRingBuffer` while a buffer fills up, including fetching the pending window for transcription.
+
+    python -m benchmarks.bench_audio_buffer --seconds 120
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from whisper_live.backend.audio_buffer import AudioRingBuffer
+
+RATE = 16000
+
+
+class ConcatenateBuffer:
+    """The buffering scheme `ServeClientBase` used before the ring buffer."""
+
+    def __init__(self):
+        self.frames_np = None
+        self.frames_offset = 0.0
+
+    def append(self, frame_np):
+        if self.frames_np is not None and self.frames_np.shape[0] > 45 * RATE:
+            self.frames_offset += 30.0
+            self.frames_np = self.frames_np[int(30 * RATE):]
+        if self.frames_np is None:
+            self.frames_np = frame_np.copy()
+        else:
+            self.frames_np = np.concatenate((self.frames_np, frame_np), axis=0)
+
+    def pending(self, timestamp_offset):
+        samples_take = max(0, (timestamp_offset - self.frames_offset) * RATE)
+        return self.frames_np[int(samples_take):].copy()
+
+
+class RingBuffer:
+    def __init__(self):
+        self.buffer = AudioRingBuffer(45 * RATE)
+
+    def append(self, frame_np):
+        self.buffer.append(frame_np)
+
+    def pending(self, timestamp_offset):
+        return self.buffer.view(int(timestamp_offset * RATE))
+
+
+def run(buffer, seconds, packet_size, report_every):
+    packet = np.random.default_rng(0).standard_normal(packet_size).astype(np.float32)
+    num_packets = int(seconds * RATE / packet_size)
+    per_report = max(1, int(report_every * RATE / packet_size))
+    rows = []
+    elapsed = 0.0
+    for i in range(1, num_packets + 1):
+        start = time.perf_counter()
+        buffer.append(packet)
+        # no speech committed, so the whole buffer stays pending, the worst case for both schemes
+        buffer.pending(0.0)
+        elapsed += time.perf_counter() - start
+        if i % per_report == 0:
+            rows.append({
+                "audio_seconds": round(i * packet_size / RATE, 1),
+                "us_per_packet": round(elapsed / per_report * 1e6, 2),
+            })
+            elapsed = 0.0
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120, help="Seconds of audio to stream.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per packet.")
+    parser.add_argument("--report_every", type=float, default=10, help="Report interval in seconds of audio.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = {
+        name: run(cls(), args.seconds, args.packet_size, args.report_every)
+        for name, cls in (("concatenate", ConcatenateBuffer), ("ring_buffer", RingBuffer))
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'audio (s)':>10} {'concatenate (us)':>18} {'ring buffer (us)':>18}")
+    for old, new in zip(results["concatenate"], results["ring_buffer"]):
+        print(f"{old['audio_seconds']:>10} {old['us_per_packet']:>18} {new['us_per_packet']:>18}")
+
+
+if __name__ == "__main__":
+    main()
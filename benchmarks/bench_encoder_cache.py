@@ -0,0 +1,112 @@
+"""
+Encoder output reuse on a streamed conversation with long pauses.
+
+Builds a conversation from an audio file by cutting it into turns separated by pauses, streams it into a
+faster_whisper client in packets and runs the transcription loop the way `ServeClientBase.speech_to_text`
+paces it: a pass after every packet, and another one every 100 ms while a segment is still open. Passes that
+run before new audio arrived see the same window again; the benchmark reports how many of them reuse the
+cached encoder output, and the time spent transcribing with and without the cache.
+
+    python -m benchmarks.bench_encoder_cache --model /path/to/ct2/model --audio assets/jfk.flac
+"""
+import argparse
+import json
+import time
+from unittest import mock
+
+import numpy as np
+from faster_whisper.audio import decode_audio
+
+from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+from whisper_live.backend.model_registry import ModelRegistry
+
+RATE = 16000
+
+
+def make_conversation(audio, turn_seconds, pause_seconds, noise=1e-3):
+    rng = np.random.default_rng(0)
+    parts = []
+    turn = int(turn_seconds * RATE)
+    for start in range(0, audio.shape[0], turn):
+        parts.append(audio[start:start + turn])
+        parts.append((rng.standard_normal(int(pause_seconds * RATE)) * noise).astype(np.float32))
+    return np.concatenate(parts)
+
+
+def run(model_ref, registry, conversation, packet_size, use_cache, decoding_profile=None):
+    ServeClientFasterWhisper.SINGLE_MODEL = None
+    client = ServeClientFasterWhisper(
+        mock.MagicMock(),
+        language="en",
+        client_uid="bench",
+        model=model_ref,
+        use_vad=False,
+        single_model=True,
+        start_thread=False,
+        model_registry=registry,
+        decoding_profile=decoding_profile,
+    )
+    if not use_cache:
+        client.encoder_cache = None
+    packet_seconds = packet_size / RATE
+    passes = 0
+    elapsed = 0.0
+    for start in range(0, conversation.shape[0], packet_size):
+        client.add_frames(conversation[start:start + packet_size])
+        idle = packet_seconds
+        while True:
+            begin = time.perf_counter()
+            wait_time = client.transcription_step()
+            elapsed += time.perf_counter() - begin
+            passes += 1
+            # the loop polls again after `wait_time` only if no packet arrived in the meantime
+            if wait_time is None or wait_time >= idle:
+                break
+            idle -= wait_time
+    stats = client.encoder_cache.get_stats() if use_cache else {}
+    client.exit = True
+    return dict(stats, passes=passes, seconds=round(elapsed, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=str, default="tiny.en", help="Model size, Hugging Face id or CT2 path.")
+    parser.add_argument("--audio", type=str, default="assets/jfk.flac", help="Speech to build the conversation from.")
+    parser.add_argument("--repeat", type=int, default=3, help="How many times the speech is repeated.")
+    parser.add_argument("--turn_seconds", type=float, default=4, help="Length of each turn.")
+    parser.add_argument("--pause_seconds", type=float, default=6, help="Pause after each turn.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per packet.")
+    parser.add_argument("--decoding_profile", type=str, default=None, help="Decoding profile of the client.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    audio = np.tile(decode_audio(args.audio, sampling_rate=RATE), args.repeat)
+    conversation = make_conversation(audio, args.turn_seconds, args.pause_seconds)
+    registry = ModelRegistry()
+    registry.get(args.model)
+
+    results = {
+        "audio_seconds": round(conversation.shape[0] / RATE, 1),
+        "without_cache": run(
+            args.model, registry, conversation, args.packet_size, False, args.decoding_profile
+        ),
+        "with_cache": run(
+            args.model, registry, conversation, args.packet_size, True, args.decoding_profile
+        ),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    with_cache = results["with_cache"]
+    print(f"audio: {results['audio_seconds']}s")
+    print(f"without cache: {results['without_cache']['passes']} passes in {results['without_cache']['seconds']}s")
+    print(f"with cache:    {with_cache['passes']} passes in {with_cache['seconds']}s")
+    print(
+        f"encoder cache: {with_cache['hits']} hits, {with_cache['near_hits']} near hits, "
+        f"{with_cache['misses']} misses, hit rate {100 * with_cache['hit_rate']:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+End-to-end latency and capacity under concurrent load.
+
+Opens `--clients` connections to a running server (or one started with `--spawn_server`) and streams an audio
+file over each of them at `--speed` times real time, using the `Client` protocol without PyAudio. For every
+connection it measures the time to `SERVER_READY`, the latency of partial results and of committed segments
+(wall time from sending the end of a segment's audio to receiving it), and the word error rate of the final
+transcript against `--reference`. Jain's fairness index of the median partial latency of every connection is 1 when
+all connections see the same latency and drops towards 1 / clients as a few of them are served first. CPU time and peak resident memory of the server process are read from /proc,
+so server resources are only reported on Linux.
+
+    python -m benchmarks.bench_load --spawn_server --model tiny.en --clients 1 4 8 --json --output load.json
+"""
+import argparse
+import bisect
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import av
+import jiwer
+import numpy as np
+
+from whisper_live.client import Client
+
+try:
+    from whisper.normalizers import EnglishTextNormalizer
+    normalize = EnglishTextNormalizer()
+except ImportError:
+    import re
+
+    def normalize(text):
+        return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+RATE = 16000
+JFK_REFERENCE = (
+    "And so my fellow Americans, ask not, what your country can do for you. Ask what you can do for your country!"
+)
+
+
+def load_audio(path):
+    """Decodes an audio file to mono 16-bit PCM bytes at 16 kHz."""
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=RATE)
+    chunks = []
+    with av.open(path) as container:
+        for frame in container.decode(audio=0):
+            chunks.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(frame))
+    chunks.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(None))
+    return np.concatenate(chunks).astype(np.int16).tobytes()
+
+
+def wait_for_server(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"Server on {host}:{port} did not start within {timeout:g}s")
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if len(values) else None
+
+
+def summarize(values):
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": percentile(values, 100),
+    }
+
+
+def jain_index(values):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values) or not values.any():
+        return None
+    return round(float(values.sum() ** 2 / (len(values) * (values ** 2).sum())), 4)
+
+
+class LoadClient(Client):
+    """
+    `Client` that records when audio was sent and when results arrived instead of printing them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.created = time.monotonic()
+        self.ready_time = None
+        self.sent_audio = [0.0]    # seconds of audio sent, with the wall time they were sent at below
+        self.sent_times = [self.created]
+        self.partial_latencies = []
+        self.commit_latencies = []
+        self.committed = set()
+        self.lock = threading.Lock()
+        super().__init__(*args, log_transcription=False, **kwargs)
+
+    def on_message(self, ws, message):
+        super().on_message(ws, message)
+        if self.recording and self.ready_time is None:
+            self.ready_time = time.monotonic() - self.created
+
+    def sent_at(self, audio_time):
+        """Wall time at which the audio up to `audio_time` seconds had been sent."""
+        with self.lock:
+            index = min(bisect.bisect_left(self.sent_audio, audio_time), len(self.sent_times) - 1)
+            return self.sent_times[index]
+
+    def process_segments(self, segments, translated=False):
+        now = time.monotonic()
+        for seg in segments:
+            latency = now - self.sent_at(float(seg["end"]))
+            if not seg.get("completed", False):
+                self.partial_latencies.append(latency)
+            elif (seg["start"], seg["end"]) not in self.committed:
+                self.committed.add((seg["start"], seg["end"]))
+                self.commit_latencies.append(latency)
+        super().process_segments(segments, translated)
+
+    def stream(self, pcm16, speed, chunk_seconds, drain_seconds, timeout):
+        """
+        Waits for `SERVER_READY`, sends `pcm16` paced at `speed` times real time, and waits until no result
+        arrived for `drain_seconds` before ending the stream.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.recording:
+            if self.server_error or self.waiting or time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+
+        chunk = int(chunk_seconds * RATE) * 2
+        start = time.monotonic()
+        for offset in range(0, len(pcm16), chunk):
+            data = pcm16[offset:offset + chunk]
+            self.send_audio_to_server(data)
+            with self.lock:
+                self.sent_audio.append((offset + len(data)) / 2 / RATE)
+                self.sent_times.append(time.monotonic())
+            # pace on the stream clock, so slow sends do not accumulate drift
+            delay = start + self.sent_audio[-1] / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.last_response_received = self.last_response_received or time.time()
+        while time.time() - self.last_response_received < drain_seconds and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.send_packet_to_server(Client.END_OF_AUDIO.encode("utf-8"))
+        return True
+
+    def final_text(self):
+        transcript = list(self.transcript)
+        if self.last_segment is not None and (not transcript or transcript[-1]["text"] != self.last_segment["text"]):
+            transcript.append(self.last_segment)
+        return " ".join(seg["text"].strip() for seg in transcript)
+
+
+class ProcessMonitor:
+    """Samples CPU time and resident memory of a process from /proc."""
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self.stopped = threading.Event()
+        self.ticks = os.sysconf("SC_CLK_TCK")
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of the whole line, after pid and comm
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.peak_rss = max(self.peak_rss, self.rss_bytes())
+            except OSError:
+                return
+
+    def __enter__(self):
+        self.start_wall = time.monotonic()
+        self.start_cpu = self.cpu_seconds()
+        self.peak_rss = self.rss_bytes()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        wall = time.monotonic() - self.start_wall
+        self.cpu = self.cpu_seconds() - self.start_cpu
+        self.result = {
+            "cpu_seconds": round(self.cpu, 2),
+            "cpu_percent": round(100 * self.cpu / wall, 1) if wall > 0 else 0.0,
+            "peak_rss_mb": round(self.peak_rss / 2 ** 20, 1),
+        }
+
+
+def run_load(args, num_clients, pcm16, reference):
+    clients = []
+    for k in range(num_clients):
+        clients.append(LoadClient(
+            args.host, args.port, lang=args.lang, model=args.model, use_vad=args.use_vad,
+            audio_encoding=args.audio_encoding, srt_file_path=os.devnull,
+            priority=args.priorities[k % len(args.priorities)],
+        ))
+        if args.ramp_seconds and k < num_clients - 1:
+            time.sleep(args.ramp_seconds / num_clients)
+
+    completed = [False] * num_clients
+
+    def session(k):
+        completed[k] = clients[k].stream(pcm16, args.speed, args.chunk_seconds, args.drain_seconds, args.timeout)
+
+    threads = [threading.Thread(target=session, args=(k,)) for k in range(num_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close_websocket()
+
+    served = [client for client, ok in zip(clients, completed) if ok]
+    wers = [jiwer.wer(normalize(reference), normalize(client.final_text()) or "<empty>") for client in served]
+    return {
+        "clients": num_clients,
+        "failed_clients": num_clients - len(served),
+        "server_ready_seconds": summarize([client.ready_time for client in served]),
+        "partial_latency_seconds": summarize([x for client in served for x in client.partial_latencies]),
+        "commit_latency_seconds": summarize([x for client in served for x in client.commit_latencies]),
+        "partial_latency_fairness": jain_index(
+            [np.median(client.partial_latencies) for client in served if client.partial_latencies]
+        ),
+        "wer": {"mean": round(float(np.mean(wers)), 4) if wers else None, "max": percentile(wers, 100)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", type=str, default="localhost", help="Server host.")
+    parser.add_argument("--port", type=int, default=9090, help="Server port.")
+    parser.add_argument("--spawn_server", action="store_true", help="Start run_server.py for the benchmark.")
+    parser.add_argument("--server_args", type=str, nargs=argparse.REMAINDER, default=[],
+                        help="Extra arguments of the spawned server, must come last.")
+    parser.add_argument("--server_pid", type=int, default=None, help="Process to report CPU and memory of.")
+    parser.add_argument("--audio", type=str, default="assets/jfk.flac", help="Audio streamed by every client.")
+    parser.add_argument("--reference", type=str, default=JFK_REFERENCE, help="Reference text, or a file with it.")
+    parser.add_argument("--model", type=str, default="tiny.en", help="Model requested by the clients.")
+    parser.add_argument("--lang", type=str, default="en", help="Language requested by the clients.")
+    parser.add_argument("--use_vad", action="store_true", help="Enable voice activity detection on the server.")
+    parser.add_argument("--audio_encoding", type=str, default="float32", help="Audio encoding of the clients.")
+    parser.add_argument("--priorities", type=str, nargs="+", default=["normal"],
+                        help="Priority tiers assigned to the clients in turn, for servers with --fair_scheduling.")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4], help="Concurrent connections per run.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Streaming speed relative to real time.")
+    parser.add_argument("--chunk_seconds", type=float, default=0.256, help="Audio per message.")
+    parser.add_argument("--ramp_seconds", type=float, default=0.0, help="Spread connection starts over this long.")
+    parser.add_argument("--drain_seconds", type=float, default=3.0, help="Quiet time that ends a stream.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Maximum duration of one connection.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    reference = args.reference
+    if os.path.isfile(reference):
+        with open(reference) as f:
+            reference = f.read()
+    pcm16 = load_audio(args.audio)
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, "run_server.py", "--port", str(args.port)] + args.server_args)
+        args.server_pid = server.pid
+    try:
+        if server is not None:
+            wait_for_server(args.host, args.port, args.timeout)
+        runs = []
+        for num_clients in args.clients:
+            if args.server_pid is not None and sys.platform.startswith("linux"):
+                with ProcessMonitor(args.server_pid) as monitor:
+                    run = run_load(args, num_clients, pcm16, reference)
+                run["server"] = monitor.result
+            else:
+                run = run_load(args, num_clients, pcm16, reference)
+            runs.append(run)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    results = {
+        "audio": args.audio,
+        "audio_seconds": round(len(pcm16) / 2 / RATE, 2),
+        "model": args.model,
+        "speed": args.speed,
+        "audio_encoding": args.audio_encoding,
+        "priorities": args.priorities,
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'clients':>8} {'failed':>7} {'ready p95 (s)':>14} {'partial p50/p99 (s)':>20} {'fairness':>9} "
+        f"{'commit p50/p95 (s)':>19} {'WER':>7} {'server CPU %':>13} {'RSS (MB)':>9}"
+    )
+    for run in runs:
+        server_stats = run.get("server", {})
+        print(
+            f"{run['clients']:>8} {run['failed_clients']:>7} {str(run['server_ready_seconds']['p95']):>14} "
+            f"{str(run['partial_latency_seconds']['p50']) + '/' + str(run['partial_latency_seconds']['p99']):>20} "
+            f"{str(run['partial_latency_fairness']):>9} "
+            f"{str(run['commit_latency_seconds']['p50']) + '/' + str(run['commit_latency_seconds']['p95']):>19} "
+            f"{str(run['wer']['mean']):>7} {str(server_stats.get('cpu_percent', '-')):>13} "
+            f"{str(server_stats.get('peak_rss_mb', '-')):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
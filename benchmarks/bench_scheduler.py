@@ -0,0 +1,100 @@
+"""
+Fairness of sessions taking turns on a shared model.
+
+Simulates `--interactive` sessions that decode 1 s windows and `--backlog` sessions that decode 25 s windows on one
+model, each running passes back to back for `--seconds`. A pass holds the model for its window times `--rtf`. With
+the plain lock of single model mode, whichever thread grabs it next runs; with `FairScheduler`, sessions take turns
+by deficit round robin over the audio of their windows. Reports the p50 and p99 latency of the passes of
+interactive sessions, from asking for the model to the end of the pass, and Jain's fairness index of the audio
+every session got transcribed (1 when all sessions got the same).
+
+    python -m benchmarks.bench_scheduler --interactive 10 --backlog 1 --seconds 10
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from whisper_live.backend.fair_scheduler import FairScheduler
+
+INTERACTIVE_WINDOW = 1.0
+BACKLOG_WINDOW = 25.0
+
+
+def jain_index(values):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values) or not values.any():
+        return None
+    return round(float(values.sum() ** 2 / (len(values) * (values ** 2).sum())), 4)
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if len(values) else None
+
+
+def run(mode, args):
+    lock = threading.Lock()
+    scheduler = FairScheduler()
+    windows = [INTERACTIVE_WINDOW] * args.interactive + [BACKLOG_WINDOW] * args.backlog
+    latencies = [[] for _ in windows]
+    audio = [0.0] * len(windows)
+    barrier = threading.Barrier(len(windows))
+
+    def session(k):
+        barrier.wait()
+        stop = time.monotonic() + args.seconds
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            with scheduler.turn(k, windows[k]) if mode == "fair" else lock:
+                time.sleep(windows[k] * args.rtf)
+            latencies[k].append(time.perf_counter() - start)
+            audio[k] += windows[k]
+
+    threads = [threading.Thread(target=session, args=(k,)) for k in range(len(windows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    interactive = [x for k in range(args.interactive) for x in latencies[k]]
+    backlog = [x for k in range(args.interactive, len(windows)) for x in latencies[k]]
+    return {
+        "mode": mode,
+        "interactive_latency_p50": percentile(interactive, 50),
+        "interactive_latency_p99": percentile(interactive, 99),
+        "backlog_latency_p50": percentile(backlog, 50),
+        "fairness": jain_index(audio),
+        "audio_seconds": round(sum(audio), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactive", type=int, default=10, help="Sessions decoding 1 s windows.")
+    parser.add_argument("--backlog", type=int, default=1, help="Sessions decoding 25 s windows.")
+    parser.add_argument("--rtf", type=float, default=0.01, help="Model time per second of audio.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of every run.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    rows = [run(mode, args) for mode in ("lock", "fair")]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(
+        f"{'mode':>6} {'interactive p50 (s)':>20} {'interactive p99 (s)':>20} {'backlog p50 (s)':>16} "
+        f"{'fairness':>9} {'audio (s)':>10}"
+    )
+    for row in rows:
+        print(
+            f"{row['mode']:>6} {str(row['interactive_latency_p50']):>20} {str(row['interactive_latency_p99']):>20} "
+            f"{str(row['backlog_latency_p50']):>16} {str(row['fairness']):>9} {row['audio_seconds']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+VAD throughput with many concurrent streams.
+
+Compares scoring every stream with its own `session.run` calls, as `VoiceActivityDetector` does with a shared
+`VoiceActivityDetection`, against `VoiceActivityDetectionService`, which gathers the frames of all streams into
+batched runs. Every stream sends one packet per round, from its own thread when using the service.
+
+    python -m benchmarks.bench_vad --streams 1 16 64 256
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from whisper_live.vad import VADStreamState, VoiceActivityDetection, VoiceActivityDetectionService
+
+RATE = 16000
+
+
+def make_packets(num_streams, rounds, packet_size):
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((num_streams, rounds, packet_size)).astype(np.float32) * 0.1
+
+
+def run_per_stream(model, packets):
+    states = [VADStreamState(RATE) for _ in range(packets.shape[0])]
+    start = time.perf_counter()
+    for k in range(packets.shape[1]):
+        for stream, state in zip(packets, states):
+            model.stream(stream[k], state)
+    return time.perf_counter() - start
+
+
+def run_service(service, packets):
+    barrier = threading.Barrier(packets.shape[0] + 1)
+
+    def session(stream):
+        state = VADStreamState(RATE)
+        barrier.wait()
+        for packet in stream:
+            service.stream(packet, state)
+
+    threads = [threading.Thread(target=session, args=(stream,)) for stream in packets]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 16, 64, 256], help="Concurrent streams.")
+    parser.add_argument("--rounds", type=int, default=20, help="Packets sent by every stream.")
+    parser.add_argument("--packet_size", type=int, default=4096, help="Samples per packet.")
+    parser.add_argument("--max_batch_wait_ms", type=float, default=2, help="Batch wait of the service.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    model = VoiceActivityDetection()
+    rows = []
+    for num_streams in args.streams:
+        packets = make_packets(num_streams, args.rounds, args.packet_size)
+        service = VoiceActivityDetectionService(
+            model, max_batch_size=num_streams, max_batch_wait_ms=args.max_batch_wait_ms
+        )
+        try:
+            batched = run_service(service, packets)
+        finally:
+            service.close()
+        per_stream = run_per_stream(model, packets)
+        num_frames = num_streams * args.rounds
+        rows.append({
+            "streams": num_streams,
+            "per_stream_frames_per_sec": round(num_frames / per_stream, 1),
+            "batched_frames_per_sec": round(num_frames / batched, 1),
+            "audio_seconds_per_sec": round(num_frames * args.packet_size / RATE / batched, 1),
+        })
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'streams':>8} {'per stream (frames/s)':>22} {'batched (frames/s)':>20} {'batched (audio s/s)':>20}")
+    for row in rows:
+        print(
+            f"{row['streams']:>8} {row['per_stream_frames_per_sec']:>22} {row['batched_frames_per_sec']:>20} "
+            f"{row['audio_seconds_per_sec']:>20}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Cost of streaming word timestamps.
+
+Transcribes the JFK asset with and without word timestamps, then streams a synthetic conversation of
+`--stream_minutes` minutes (the asset repeated, with pauses) through a faster_whisper client in both modes.
+Reports the time spent in transcription, the part of it spent aligning words (`add_word_timestamps`, which
+includes the cross-attention alignment run by the model), and the overhead of word timestamps relative to
+plain transcription. The run fails if the overhead on the stream exceeds `--budget`, 25% by default.
+
+    python -m benchmarks.bench_word_timestamps --model tiny.en --stream_minutes 10
+"""
+import argparse
+import json
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+from faster_whisper.audio import decode_audio
+
+from benchmarks.bench_encoder_cache import make_conversation
+from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+from whisper_live.backend.model_registry import ModelRegistry
+
+RATE = 16000
+
+
+class AlignmentTimer:
+    """Accumulates the time spent in `add_word_timestamps` of a model."""
+
+    def __init__(self, model):
+        self.seconds = 0.0
+        self.add_word_timestamps = model.add_word_timestamps
+        model.add_word_timestamps = self
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.add_word_timestamps(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def run_file(model, timer, audio, word_timestamps, repeat):
+    timer.seconds = 0.0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        segments, _ = model.transcribe(audio, language="en", word_timestamps=word_timestamps)
+    elapsed = time.perf_counter() - start
+    words = sum(len(s.words or []) for s in segments)
+    return {"seconds": round(elapsed / repeat, 4), "alignment_seconds": round(timer.seconds / repeat, 4), "words": words}
+
+
+def run_stream(model_ref, registry, timer, conversation, packet_size, word_timestamps, decoding_profile):
+    ServeClientFasterWhisper.SINGLE_MODEL = None
+    client = ServeClientFasterWhisper(
+        mock.MagicMock(),
+        language="en",
+        client_uid="bench",
+        model=model_ref,
+        use_vad=False,
+        single_model=True,
+        start_thread=False,
+        model_registry=registry,
+        decoding_profile=decoding_profile,
+        word_timestamps=word_timestamps,
+    )
+    timer.seconds = 0.0
+    elapsed = 0.0
+    for start in range(0, conversation.shape[0], packet_size):
+        client.add_frames(conversation[start:start + packet_size])
+        begin = time.perf_counter()
+        client.transcription_step()
+        elapsed += time.perf_counter() - begin
+    client.exit = True
+    return {
+        "seconds": round(elapsed, 2),
+        "alignment_seconds": round(timer.seconds, 2),
+        "windows": client.num_windows,
+        "segments": len(client.transcript),
+    }
+
+
+def overhead(plain, with_words):
+    return (with_words["seconds"] - plain["seconds"]) / plain["seconds"] if plain["seconds"] else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=str, default="tiny.en", help="Model size, Hugging Face id or CT2 path.")
+    parser.add_argument("--audio", type=str, default="assets/jfk.flac", help="Speech to transcribe.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions of the file transcription.")
+    parser.add_argument("--stream_minutes", type=float, default=10, help="Length of the synthetic stream.")
+    parser.add_argument("--pause_seconds", type=float, default=2, help="Pause after each turn of the stream.")
+    parser.add_argument("--packet_size", type=int, default=16000, help="Samples per streamed packet.")
+    parser.add_argument("--decoding_profile", type=str, default="live", help="Decoding profile of the client.")
+    parser.add_argument("--budget", type=float, default=0.25, help="Maximum relative overhead on the stream.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    model = registry.get(args.model)
+    timer = AlignmentTimer(model)
+    audio = decode_audio(args.audio, sampling_rate=RATE)
+
+    speech = np.tile(audio, int(np.ceil(args.stream_minutes * 60 * RATE / audio.shape[0])))
+    conversation = make_conversation(speech, audio.shape[0] / RATE, args.pause_seconds)
+    conversation = conversation[:int(args.stream_minutes * 60 * RATE)]
+
+    results = {"file": {}, "stream": {}}
+    for word_timestamps, name in ((False, "plain"), (True, "word_timestamps")):
+        results["file"][name] = run_file(model, timer, audio, word_timestamps, args.repeat)
+        results["stream"][name] = run_stream(
+            args.model, registry, timer, conversation, args.packet_size, word_timestamps, args.decoding_profile
+        )
+    for mode in ("file", "stream"):
+        results[mode]["overhead"] = round(overhead(results[mode]["plain"], results[mode]["word_timestamps"]), 4)
+    results["budget"] = args.budget
+    results["within_budget"] = results["stream"]["overhead"] <= args.budget
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for mode, label in (("file", f"{args.audio}"), ("stream", f"{args.stream_minutes:g} min stream")):
+            plain, words = results[mode]["plain"], results[mode]["word_timestamps"]
+            print(
+                f"{label}: {plain['seconds']}s without, {words['seconds']}s with word timestamps "
+                f"({words['alignment_seconds']}s aligning), overhead {100 * results[mode]['overhead']:.1f}%"
+            )
+        print(f"budget {100 * args.budget:.0f}%: {'ok' if results['within_budget'] else 'exceeded'}")
+    if not results["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
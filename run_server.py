@@ -47,6 +47,67 @@ if __name__ == "__main__":
                         type=str,
                         default="~/.cache/whisper-live/",
                         help='Path to cache the converted ctranslate2 models.')
+    parser.add_argument('--async', dest='async_mode',
+                        action='store_true',
+                        help='Serve all connections from one asyncio event loop and run inference on a bounded executor.')
+    parser.add_argument('--inference_workers',
+                        type=int,
+                        default=None,
+                        help='Maximum number of concurrent transcription passes when running with --async.')
+    parser.add_argument('--batch_inference',
+                        action='store_true',
+                        help='Batch pending audio of all clients into shared model calls. Requires single model mode with faster_whisper.')
+    parser.add_argument('--max_batch_size',
+                        type=int,
+                        default=8,
+                        help='Maximum number of client windows per batch with --batch_inference.')
+    parser.add_argument('--max_batch_wait_ms',
+                        type=float,
+                        default=20,
+                        help='Maximum time in milliseconds a window waits for others to join its batch with --batch_inference.')
+    parser.add_argument('--min_new_audio',
+                        type=float,
+                        default=0.0,
+                        help='Seconds of new audio a client must send before its audio is transcribed again.')
+    parser.add_argument('--preload_models',
+                        type=str,
+                        nargs='+',
+                        default=None,
+                        help='faster_whisper models (sizes, Hugging Face ids or paths) to prepare before accepting connections.')
+    parser.add_argument('--batch_vad',
+                        action='store_true',
+                        help='Score the VAD frames of all clients together in batched model calls.')
+    parser.add_argument('--vad_batch_wait_ms',
+                        type=float,
+                        default=2,
+                        help='Maximum time in milliseconds a VAD frame waits for frames of other clients with --batch_vad.')
+    parser.add_argument('--metrics_port',
+                        type=int,
+                        default=None,
+                        help='Port to serve Prometheus metrics on at /metrics. Disabled by default.')
+    parser.add_argument('--trace_path',
+                        type=str,
+                        default=None,
+                        help='Write per stage timings to this Chrome trace JSON file on exit. Disabled by default.')
+    parser.add_argument('--target_rtf',
+                        type=float,
+                        default=None,
+                        help='Real-time factor above which clients run fewer transcription passes over shorter windows. Disabled by default.')
+    parser.add_argument('--capacity',
+                        type=float,
+                        default=None,
+                        help='Inference budget in cost units of a tiny model session. Clients are admitted while the estimated cost of all sessions fits. Disabled by default.')
+    parser.add_argument('--fair_scheduling',
+                        action="store_true",
+                        help='Take turns between the clients of a shared model by deficit round robin, weighted by client priority.')
+    parser.add_argument('--model_replicas',
+                        type=int,
+                        default=1,
+                        help='Instances of each model shared by all clients, each pass runs on the least loaded one. 0 sizes the pool from CPU cores and memory (faster_whisper only).')
+    parser.add_argument('--replica_workers',
+                        type=int,
+                        default=1,
+                        help='Passes each faster_whisper replica runs in parallel, as CTranslate2 workers sharing its weights.')
     args = parser.parse_args()
 
     if args.backend == "tensorrt":
@@ -71,4 +132,20 @@ if __name__ == "__main__":
         max_connection_time=args.max_connection_time,
         cache_path=args.cache_path,
         translation_model_path=args.translation_model_path,
+        async_mode=args.async_mode,
+        inference_workers=args.inference_workers,
+        batch_inference=args.batch_inference,
+        max_batch_size=args.max_batch_size,
+        max_batch_wait_ms=args.max_batch_wait_ms,
+        min_new_audio=args.min_new_audio,
+        batch_vad=args.batch_vad,
+        vad_batch_wait_ms=args.vad_batch_wait_ms,
+        preload_models=args.preload_models,
+        metrics_port=args.metrics_port,
+        trace_path=args.trace_path,
+        target_rtf=args.target_rtf,
+        capacity=args.capacity,
+        fair_scheduling=args.fair_scheduling,
+        model_replicas=args.model_replicas,
+        replica_workers=args.replica_workers,
     )
@@ -38,7 +38,9 @@ setup(
             "Audio-Transcription-Chrome",
             "Audio-Transcription-Firefox",
             "requirements",
-            "whisper-finetuning"
+            "whisper-finetuning",
+            "benchmarks",
+            "benchmarks.*",
         )
     ),
     install_requires=[
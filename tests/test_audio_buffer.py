@@ -0,0 +1,194 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from whisper_live.backend.audio_buffer import AudioRingBuffer, SpeechTimeline
+from whisper_live.backend.base import ServeClientBase
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_append_and_view(self):
+        buffer = AudioRingBuffer(10)
+        buffer.append(np.arange(4, dtype=np.float32))
+        self.assertEqual(len(buffer), 4)
+        np.testing.assert_array_equal(buffer.view(), np.arange(4))
+        np.testing.assert_array_equal(buffer.view(1, 3), [1, 2])
+
+    def test_wraparound_view_is_contiguous(self):
+        buffer = AudioRingBuffer(10)
+        stream = np.arange(27, dtype=np.float32)
+        for chunk in np.array_split(stream, 9):
+            buffer.append(chunk)
+        self.assertEqual((buffer.start_sample, buffer.end_sample), (17, 27))
+        window = buffer.view()
+        self.assertTrue(window.flags.c_contiguous)
+        self.assertFalse(window.flags.writeable)
+        self.assertIs(window.base, buffer._data)
+        np.testing.assert_array_equal(window, stream[17:])
+        np.testing.assert_array_equal(buffer.view(20, 25), stream[20:25])
+
+    def test_view_is_clamped(self):
+        buffer = AudioRingBuffer(5)
+        buffer.append(np.arange(8, dtype=np.float32))
+        np.testing.assert_array_equal(buffer.view(0, 100), [3, 4, 5, 6, 7])
+        self.assertEqual(buffer.view(10).shape[0], 0)
+
+    def test_append_longer_than_capacity(self):
+        buffer = AudioRingBuffer(4)
+        buffer.append(np.arange(3, dtype=np.float32))
+        buffer.append(np.arange(3, 13, dtype=np.float32))
+        self.assertEqual((buffer.start_sample, buffer.end_sample), (9, 13))
+        np.testing.assert_array_equal(buffer.view(), [9, 10, 11, 12])
+
+
+class TestServeClientBaseBuffering(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("test", mock.MagicMock())
+
+    def test_frames_offset_tracks_dropped_audio(self):
+        self.assertIsNone(self.client.frames_np)
+        packet = np.ones(ServeClientBase.RATE, dtype=np.float32)
+        for _ in range(50):
+            self.client.add_frames(packet)
+        self.assertEqual(self.client.frames_np.shape[0], ServeClientBase.MAX_BUFFER_SECONDS * ServeClientBase.RATE)
+        self.assertAlmostEqual(self.client.frames_offset, 5.0)
+        self.assertAlmostEqual(self.client.timestamp_offset, 5.0)
+
+    def test_audio_chunk_for_processing(self):
+        stream = np.arange(3 * ServeClientBase.RATE, dtype=np.float32)
+        self.client.add_frames(stream)
+        self.client.timestamp_offset = 1.0
+        input_bytes, duration = self.client.get_audio_chunk_for_processing()
+        self.assertAlmostEqual(duration, 2.0)
+        np.testing.assert_array_equal(input_bytes, stream[ServeClientBase.RATE:])
+
+    def test_chunk_survives_appends_during_pass(self):
+        capacity = ServeClientBase.MAX_BUFFER_SECONDS * ServeClientBase.RATE
+        stream = np.arange(capacity, dtype=np.float32)
+        self.client.add_frames(stream)
+        input_bytes, duration = self.client.get_audio_chunk_for_processing()
+        self.assertEqual(duration, ServeClientBase.MAX_BUFFER_SECONDS)
+        # the receive thread keeps appending while the window is transcribed
+        self.client.add_frames(np.full(4096, -1, dtype=np.float32))
+        np.testing.assert_array_equal(input_bytes, stream)
+
+    def test_clip_audio_without_valid_segment(self):
+        self.client.add_frames(np.zeros(30 * ServeClientBase.RATE, dtype=np.float32))
+        self.client.clip_audio_if_no_valid_segment()
+        self.assertAlmostEqual(self.client.timestamp_offset, 25.0)
+
+
+class TestSpeechTimeline(unittest.TestCase):
+    def test_regions_are_merged_and_queried(self):
+        timeline = SpeechTimeline()
+        timeline.add_speech(0, 100)
+        timeline.add_speech(100, 200)
+        timeline.add_speech(500, 600)
+        self.assertEqual([list(r) for r in timeline.regions], [[0, 200], [500, 600]])
+        self.assertTrue(timeline.has_speech(150, 300))
+        self.assertFalse(timeline.has_speech(200, 500))
+        self.assertTrue(timeline.has_speech(550))
+        self.assertFalse(timeline.has_speech(600))
+
+    def test_discard_before(self):
+        timeline = SpeechTimeline()
+        timeline.add_speech(0, 100)
+        timeline.add_speech(200, 300)
+        timeline.discard_before(150)
+        self.assertEqual([list(r) for r in timeline.regions], [[200, 300]])
+
+
+class TestVADGatedTranscription(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("test", mock.MagicMock(), vad_gate=lambda frame: bool(frame.any()))
+        self.client.language = "en"
+        self.client.transcribe_audio = mock.MagicMock(return_value=None)
+
+    def test_silence_skips_inference(self):
+        for _ in range(4):
+            self.client.add_frames(np.zeros(ServeClientBase.RATE // 2, dtype=np.float32))
+        self.assertIsNone(self.client.transcription_step())
+        self.client.transcribe_audio.assert_not_called()
+        self.assertAlmostEqual(self.client.timestamp_offset, 2.0 - ServeClientBase.VAD_PAD_SECONDS)
+
+    def test_speech_after_skipped_silence_keeps_onset(self):
+        self.client.add_frames(np.zeros(ServeClientBase.RATE, dtype=np.float32))
+        self.client.transcription_step()
+        self.client.transcribe_audio.assert_not_called()
+        self.client.add_frames(np.ones(ServeClientBase.RATE, dtype=np.float32))
+        self.client.transcription_step()
+        self.client.transcribe_audio.assert_called_once()
+        window = self.client.transcribe_audio.call_args[0][0]
+        self.assertEqual(window.shape[0], int((1 + ServeClientBase.VAD_PAD_SECONDS) * ServeClientBase.RATE))
+        self.assertFalse(window[: int(ServeClientBase.VAD_PAD_SECONDS * ServeClientBase.RATE)].any())
+
+    def test_speech_runs_inference(self):
+        self.client.add_frames(np.zeros(ServeClientBase.RATE, dtype=np.float32))
+        self.client.add_frames(np.ones(ServeClientBase.RATE // 2, dtype=np.float32))
+        self.client.transcription_step()
+        self.client.transcribe_audio.assert_called_once()
+        self.assertEqual(self.client.transcribe_audio.call_args[0][0].shape[0], int(1.5 * ServeClientBase.RATE))
+
+
+class TestTranscriptionWakeup(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("test", mock.MagicMock(), min_new_audio=0.5)
+        self.client.language = "en"
+        self.client.transcribe_audio = mock.MagicMock(return_value=None)
+
+    def test_wait_times_out_without_audio(self):
+        self.assertIsNone(self.client.run_transcription_step())
+        self.assertFalse(self.client.wait_for_audio(timeout=0.05))
+
+    def test_min_new_audio_threshold(self):
+        packet = np.zeros(ServeClientBase.RATE // 4, dtype=np.float32)
+        self.client.add_frames(packet)
+        self.client.run_transcription_step()
+        self.client.add_frames(packet)
+        self.assertFalse(self.client.wait_for_audio(timeout=0))
+        self.client.add_frames(packet)
+        self.assertTrue(self.client.wait_for_audio(timeout=0))
+
+    def test_add_frames_wakes_waiting_loop(self):
+        self.client.run_transcription_step()
+        woken = threading.Event()
+
+        def wait():
+            if self.client.wait_for_audio(timeout=5):
+                woken.set()
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.05)
+        self.assertFalse(woken.is_set())
+        self.client.add_frames(np.zeros(ServeClientBase.RATE, dtype=np.float32))
+        waiter.join(timeout=5)
+        self.assertTrue(woken.is_set())
+
+    def test_no_wakeup_below_min_chunk(self):
+        self.client.run_transcription_step()
+        self.client.on_wakeup = mock.MagicMock()
+        packet = np.zeros(ServeClientBase.RATE // 2, dtype=np.float32)
+        self.client.add_frames(packet)
+        self.client.on_wakeup.assert_not_called()
+        self.client.add_frames(packet)
+        self.client.on_wakeup.assert_called_once()
+
+    def test_cleanup_stops_idle_thread(self):
+        self.client.add_frames(np.zeros(ServeClientBase.RATE // 10, dtype=np.float32))
+        thread = threading.Thread(target=self.client.speech_to_text)
+        thread.start()
+        time.sleep(0.3)
+        self.client.cleanup()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        stats = self.client.get_cpu_stats()
+        self.assertLess(stats["loop_cpu_time"], 0.05)
+        self.client.transcribe_audio.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
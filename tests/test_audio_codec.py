@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from whisper_live.audio_codec import AudioDecoder, AudioEncoder
+from whisper_live.server import TranscriptionServer
+
+
+def speech_like(seconds=1.0, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * 220 * t) * 0.3 * np.sin(2 * np.pi * 3 * t)).astype(np.float32)
+
+
+def to_pcm16(audio):
+    return (audio * 32767).astype(np.int16).tobytes()
+
+
+class TestAudioCodec(unittest.TestCase):
+    def roundtrip(self, encoding, audio, packet_size=4096):
+        encoder, decoder = AudioEncoder(encoding), AudioDecoder(encoding)
+        pcm16 = to_pcm16(audio)
+        messages = []
+        for start in range(0, len(pcm16), 2 * packet_size):
+            messages.extend(encoder.encode(pcm16[start:start + 2 * packet_size]))
+        decoded = [decoder.decode(message) for message in messages]
+        return messages, np.concatenate(decoded)
+
+    def test_pcm_encodings_are_lossless(self):
+        audio = speech_like()
+        expected = np.frombuffer(to_pcm16(audio), dtype=np.int16) / 32768.0
+        for encoding, bytes_per_sample in (("float32", 4), ("int16", 2)):
+            messages, decoded = self.roundtrip(encoding, audio)
+            self.assertEqual(decoded.dtype, np.float32)
+            self.assertEqual(sum(len(m) for m in messages), bytes_per_sample * len(audio))
+            np.testing.assert_array_equal(decoded, expected.astype(np.float32))
+
+    def test_opus_roundtrip(self):
+        audio = speech_like(2.0)
+        messages, decoded = self.roundtrip("opus", audio)
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertLess(sum(len(m) for m in messages), len(audio) * 4 / 10)
+        # the codec delays the signal by a few milliseconds
+        delay = max(range(400), key=lambda d: np.dot(decoded[d:d + 16000], audio[:16000]))
+        correlation = np.corrcoef(decoded[delay:delay + 16000], audio[:16000])[0, 1]
+        self.assertGreater(correlation, 0.9)
+
+    def test_unknown_encoding(self):
+        with self.assertRaises(ValueError):
+            AudioDecoder("mp3")
+
+
+class TestServerAudioDecoding(unittest.TestCase):
+    def test_negotiated_encoding_is_decoded(self):
+        server = TranscriptionServer()
+        pcm16 = to_pcm16(speech_like(0.1))
+        frame = server.parse_audio_frame(pcm16, AudioDecoder("int16"))
+        np.testing.assert_allclose(frame, np.frombuffer(pcm16, dtype=np.int16) / 32768.0)
+        self.assertEqual(len(server.parse_audio_frame(frame.tobytes())), len(frame))
+        self.assertIs(server.parse_audio_frame(b"END_OF_AUDIO", AudioDecoder("int16")), False)
+
+
+if __name__ == "__main__":
+    unittest.main()
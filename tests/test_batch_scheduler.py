@@ -0,0 +1,101 @@
+import threading
+import unittest
+
+import numpy as np
+
+from whisper_live.backend.batch_scheduler import BatchInferenceScheduler
+
+
+class FakeBatchModel:
+    def __init__(self, fail=False, unbatched=()):
+        self.batches = []
+        self.fail = fail
+        self.unbatched = unbatched
+        self.single_threads = []
+
+    def transcribe_batch(self, requests, run_unbatched=True):
+        if self.fail:
+            raise RuntimeError("model failure")
+        self.batches.append(requests)
+        return [
+            None if request["language"] in self.unbatched and not run_unbatched
+            else (request["audio"].sum(), request["language"])
+            for request in requests
+        ]
+
+    def transcribe(self, audio, language):
+        self.single_threads.append(threading.current_thread().name)
+        return audio.sum(), language
+
+
+class TestBatchInferenceScheduler(unittest.TestCase):
+    def run_clients(self, scheduler, num_clients):
+        results = [None] * num_clients
+        errors = []
+
+        def client(index):
+            try:
+                results[index] = scheduler.transcribe(
+                    np.full(10, index, dtype=np.float32), language=f"lang{index}"
+                )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(num_clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results, errors
+
+    def test_concurrent_requests_are_batched(self):
+        model = FakeBatchModel()
+        scheduler = BatchInferenceScheduler(model, max_batch_size=4, max_batch_wait_ms=500)
+        results, errors = self.run_clients(scheduler, 4)
+        scheduler.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [(10.0 * i, f"lang{i}") for i in range(4)])
+        self.assertEqual(len(model.batches), 1)
+        self.assertEqual(len(model.batches[0]), 4)
+
+    def test_batch_size_is_capped(self):
+        model = FakeBatchModel()
+        scheduler = BatchInferenceScheduler(model, max_batch_size=2, max_batch_wait_ms=200)
+        results, errors = self.run_clients(scheduler, 5)
+        scheduler.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [(10.0 * i, f"lang{i}") for i in range(5)])
+        self.assertTrue(all(len(batch) <= 2 for batch in model.batches))
+        self.assertEqual(sum(len(batch) for batch in model.batches), 5)
+
+    def test_errors_reach_every_client(self):
+        scheduler = BatchInferenceScheduler(FakeBatchModel(fail=True), max_batch_size=3, max_batch_wait_ms=200)
+        results, errors = self.run_clients(scheduler, 3)
+        scheduler.close()
+
+        self.assertEqual(results, [None] * 3)
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+
+    def test_unbatched_requests_run_on_caller_thread(self):
+        model = FakeBatchModel(unbatched=("lang1",))
+        scheduler = BatchInferenceScheduler(model, max_batch_size=3, max_batch_wait_ms=500)
+        results, errors = self.run_clients(scheduler, 3)
+        scheduler.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [(10.0 * i, f"lang{i}") for i in range(3)])
+        self.assertEqual(len(model.single_threads), 1)
+        self.assertNotEqual(model.single_threads[0], scheduler.worker.name)
+
+    def test_close_stops_worker(self):
+        scheduler = BatchInferenceScheduler(FakeBatchModel())
+        scheduler.close()
+        scheduler.worker.join(timeout=1)
+        self.assertFalse(scheduler.worker.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from whisper_live.transcriber.transcriber_faster_whisper import DecodingContext, WhisperModel, pad_or_trim
+
+EOT = 900
+SPECIAL_TOKENS = {
+    "<|endoftext|>": EOT,
+    "<|startoftranscript|>": 901,
+    "<|startoflm|>": 902,
+    "<|startofprev|>": 903,
+    "<|transcribe|>": 904,
+    "<|translate|>": 905,
+    "<|notimestamps|>": 999,
+}
+T = 1000    # timestamp_begin, T + n is the timestamp n * 0.02 s
+
+
+def window_digest(features):
+    return hashlib.sha1(np.ascontiguousarray(features, dtype=np.float32).tobytes()).hexdigest()
+
+
+class FakeHFTokenizer:
+    """Text tokens are the code points of the characters, decoded back to text."""
+
+    def token_to_id(self, token):
+        return SPECIAL_TOKENS.get(token)
+
+    def encode(self, text, add_special_tokens=False):
+        return SimpleNamespace(ids=[ord(char) % EOT for char in text])
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+class FakeCTranslate2Model:
+    """
+    Stands in for `ctranslate2.models.Whisper`. The encoder output of a window is the digest of its features, and
+    the decoder returns the scripted result of the window at the sampling temperature, so every window decodes the
+    same whether it is part of a batch or not. Windows without a script decode to one short segment.
+    """
+    is_multilingual = False
+    device = "cpu"
+    device_index = [0]
+
+    def __init__(self):
+        self.scripts = {}
+        self.prompts = []
+        self.batch_sizes = []
+
+    def encode(self, features, to_cpu=False):
+        return [window_digest(window) for window in np.array(features)]
+
+    def generate(self, encoder_output, prompts, sampling_temperature=0.0, **kwargs):
+        self.batch_sizes.append(len(prompts))
+        results = []
+        for digest, prompt in zip(encoder_output, prompts):
+            self.prompts.append((digest, list(prompt)))
+            script = self.scripts.get(digest, {})
+            tokens, score, no_speech_prob = script.get(
+                sampling_temperature, script.get(None, ([104, 105, T + 50], -0.1, 0.0))
+            )
+            results.append(SimpleNamespace(sequences_ids=[tokens], scores=[score], no_speech_prob=no_speech_prob))
+        return results
+
+
+class TestTranscribeBatchParity(unittest.TestCase):
+    """`transcribe_batch` must return the same segments as `transcribe` for every request."""
+
+    def setUp(self):
+        self.model = WhisperModel.__new__(WhisperModel)
+        self.model.logger = logging.getLogger("test")
+        self.model.model = FakeCTranslate2Model()
+        self.model.hf_tokenizer = FakeHFTokenizer()
+        self.model.feature_extractor = FeatureExtractor()
+        self.model.input_stride = 2
+        self.model.num_samples_per_token = self.model.feature_extractor.hop_length * 2
+        self.model.frames_per_second = 100
+        self.model.tokens_per_second = 50
+        self.model.time_precision = 0.02
+        self.model.max_length = 448
+        self.seed = 0
+
+    def make_audio(self, script, seconds=4.0):
+        """Returns distinct audio whose window decodes as `script`, temperature: (tokens, score, no_speech_prob)."""
+        self.seed += 1
+        audio = np.random.default_rng(self.seed).uniform(-0.1, 0.1, int(seconds * 16000)).astype(np.float32)
+        features = self.model.feature_extractor(audio)
+        digest = window_digest(pad_or_trim(features[:, : features.shape[-1] - 1]))
+        self.model.model.scripts[digest] = script
+        return audio
+
+    def assert_parity(self, requests):
+        self.model.model.prompts = []
+        expected = []
+        for request in requests:
+            segments, info = self.model.transcribe(**request)
+            expected.append((None if segments is None else list(segments), info))
+        single_prompts = self.model.model.prompts
+
+        self.model.model.prompts = []
+        results = self.model.transcribe_batch(requests)
+        self.assertEqual(len(results), len(requests))
+        for (segments, info), (expected_segments, expected_info) in zip(results, expected):
+            self.assertEqual(None if segments is None else list(segments), expected_segments)
+            self.assertEqual(info is None, expected_info is None)
+            if info is not None:
+                self.assertEqual(info.language, expected_info.language)
+                self.assertEqual(info.duration, expected_info.duration)
+        # every window is decoded with the prompt `transcribe` uses for it
+        self.assertEqual(
+            {(digest, tuple(prompt)) for digest, prompt in self.model.model.prompts},
+            {(digest, tuple(prompt)) for digest, prompt in single_prompts},
+        )
+        return results
+
+    def test_segment_layouts(self):
+        requests = [
+            # two completed segments and a single timestamp ending
+            {"audio": self.make_audio({None: ([T, 104, 105, T + 50, T + 50, 106, T + 100], -0.1, 0.0)})},
+            # no timestamps at all, a single segment over the whole window
+            {"audio": self.make_audio({None: ([104, 105], -0.1, 0.0)})},
+            # a zero-length segment and an empty one are dropped
+            {"audio": self.make_audio({None: ([T + 10, T + 10, T + 10, 104, T + 40, T + 40, T + 60, T + 60, 105,
+                                               T + 90], -0.1, 0.0)})},
+            # the last segment is not closed, so the rest of the audio is decoded again from its start
+            {"audio": self.make_audio({None: ([T, 104, T + 40, T + 40, 105], -0.1, 0.0)})},
+        ]
+        for request in requests:
+            request["language"] = "en"
+        results = self.assert_parity(requests)
+        # all four windows were decoded in one batch, the unfinished one was then transcribed again
+        self.assertIn(4, self.model.model.batch_sizes)
+        self.assertEqual([segment.text for segment in results[0][0]], ["hi", "j"])
+        self.assertEqual([(segment.start, segment.end) for segment in results[2][0]], [(0.2, 0.8), (1.2, 1.8)])
+
+    def test_silence_is_skipped(self):
+        audio = self.make_audio({None: ([104, T + 20], -2.0, 0.9)})
+        results = self.assert_parity([{"audio": audio, "language": "en"}])
+        self.assertEqual(results[0][0], [])
+
+    def test_empty_audio(self):
+        request = {"audio": np.zeros(0, dtype=np.float32), "language": "en"}
+        self.assertEqual(self.model.transcribe_batch([request]), [(None, None)])
+
+    def test_temperature_fallback(self):
+        audio = self.make_audio({
+            0.0: ([T, 104, T + 50, T + 50, 105, T + 100], -3.0, 0.0),
+            0.2: ([T, 106, T + 50, T + 50, 107, T + 100], -0.2, 0.0),
+        })
+        results = self.assert_parity([
+            {"audio": audio, "language": "en"},
+            {"audio": self.make_audio({None: ([T, 104, T + 50], -0.1, 0.0)}), "language": "en"},
+        ])
+        self.assertEqual(results[0][0][0].temperature, 0.2)
+        self.assertEqual([segment.text for segment in results[0][0]], ["j", "k"])
+
+    def test_fallback_left_to_caller(self):
+        requests = [
+            {"audio": self.make_audio({0.0: ([T, 104, T + 50], -3.0, 0.0)}), "language": "en"},
+            {"audio": self.make_audio({None: ([T, 104, T + 50], -0.1, 0.0)}), "language": "en"},
+        ]
+        self.model.model.batch_sizes = []
+        results = self.model.transcribe_batch(requests, run_unbatched=False)
+        self.assertIsNone(results[0])
+        self.assertEqual([segment.text for segment in results[1][0]], ["h"])
+        # only the batched greedy pass ran, the fallback temperatures were not decoded
+        self.assertEqual(self.model.model.batch_sizes, [2])
+
+    def test_prompt_reuse(self):
+        context = DecodingContext(self.model)
+        context.commit([104, 105, 106])
+        script = {None: ([T, 107, T + 50, T + 50, 108, T + 100], -0.1, 0.0)}
+        requests = [
+            {"audio": self.make_audio(script), "language": "en", "initial_prompt": "hey",
+             "decoding_context": context},
+            {"audio": self.make_audio(script), "language": "en", "decoding_context": context},
+            {"audio": self.make_audio(script), "language": "en", "initial_prompt": "hey"},
+        ]
+        self.assert_parity(requests)
+        prompts = [prompt for _, prompt in self.model.model.prompts]
+        sot_prev = SPECIAL_TOKENS["<|startofprev|>"]
+        self.assertIn([sot_prev] + [ord(char) for char in " hey"] + [104, 105, 106, 901], prompts)
+        self.assertIn([sot_prev, 104, 105, 106, 901], prompts)
+        self.assertIn([sot_prev] + [ord(char) for char in " hey"] + [901], prompts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,16 @@ import os
 import scipy
 import websocket
 import copy
+import io
+import queue
 import unittest
+import av
+import numpy as np
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+from whisper_live.audio_codec import AudioEncoder
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.translation_backend import ServeClientTranslation
 from whisper_live.client import Client, TranscriptionClient, TranscriptionTeeClient
 from whisper_live.utils import resample
 from pathlib import Path
@@ -55,6 +63,14 @@ class TestClientCallbacks(BaseTestCase):
             "same_output_threshold": 10,
             "enable_translation": False,
             "target_language": "fr",
+            "decoding_profile": None,
+            "commit_policy": None,
+            "word_timestamps": False,
+            "language_detection_seconds": 2.0,
+            "audio_encoding": "float32",
+            "delta_segments": False,
+            "allow_model_downgrade": False,
+            "priority": "normal",
         })
         self.client.on_open(self.mock_ws_app)
         self.mock_ws_app.send.assert_called_with(expected_message)
@@ -100,6 +116,92 @@ class TestClientCallbacks(BaseTestCase):
         self.assertEqual(self.client.error_message, error_message)
 
 
+class TestDeltaSegments(BaseTestCase):
+    @patch('whisper_live.client.websocket.WebSocketApp')
+    @patch('whisper_live.client.pyaudio.PyAudio')
+    def setUp(self, mock_audio, mock_websocket):
+        super().setUp()
+        self.received = {}
+        self.clients = {
+            delta: Client(
+                host='localhost', port=9090, lang="en", send_last_n_segments=2, delta_segments=delta,
+                transcription_callback=lambda text, segments, delta=delta: self.received[delta].append(segments),
+                translation_callback=lambda text, segments, delta=delta: self.received[delta].append(segments),
+            )
+            for delta in (False, True)
+        }
+        for delta, client in self.clients.items():
+            client.server_backend = "faster_whisper"
+            self.received[delta] = []
+
+    def tearDown(self):
+        for client in self.clients.values():
+            client.close_websocket()
+        super().tearDown()
+
+    def stream(self, delta):
+        """Runs the server side of a session and returns the messages it sends."""
+        websocket = MagicMock()
+        translation_queue = queue.Queue()
+        server = ServeClientBase(
+            self.clients[delta].uid, websocket, send_last_n_segments=2, same_output_threshold=2,
+            translation_queue=translation_queue,
+        )
+        server.delta_segments = delta
+        windows = []
+        for i in range(6):
+            windows.append(([(f" Sentence {i}.", 0.0, 1.0), (" And", 1.0, 1.5)], 1.5))
+            windows.append(([(" And then", 0.0, 1.0)], 1.0))
+        windows += [([(" And then", 0.0, 1.0)], 1.0)] * 3
+        for window, duration in windows:
+            result = [
+                SimpleNamespace(text=text, start=start, end=end, no_speech_prob=0.0, temperature=0.0, tokens=[])
+                for text, start, end in window
+            ]
+            segments = server.prepare_segments(server.update_segments(result, duration))
+            if segments:
+                server.send_transcription_to_client(segments)
+
+        translation = ServeClientTranslation(
+            self.clients[delta].uid, websocket, translation_queue, send_last_n_segments=2, auto_load_model=False
+        )
+        translation.delta_segments = delta
+        translation.translate_text = str.upper
+        translation_queue.put(None)
+        translation.process_translation_queue()
+        return [call.args[0] for call in websocket.send.call_args_list]
+
+    def test_both_modes_produce_identical_transcripts(self):
+        messages = {delta: self.stream(delta) for delta in (False, True)}
+        for delta, client in self.clients.items():
+            for message in messages[delta]:
+                client.on_message(self.mock_ws_app, message)
+
+        full, delta = self.clients[False], self.clients[True]
+        self.assertEqual(len(full.transcript), 7)
+        self.assertEqual(delta.transcript, full.transcript)
+        self.assertGreater(len(full.translated_transcript), 2)
+        self.assertEqual(delta.translated_transcript, full.translated_transcript)
+        self.assertEqual(self.received[True], self.received[False])
+        self.assertLess(sum(map(len, messages[True])), sum(map(len, messages[False])))
+
+    def test_failed_send_is_resent(self):
+        websocket = MagicMock()
+        websocket.send.side_effect = [ConnectionError("closed"), None]
+        server = ServeClientBase("uid", websocket)
+        server.delta_segments = True
+        server.transcript = [server.format_segment(0.0, 1.0, "a", completed=True)]
+        server.send_transcription_to_client(server.prepare_segments())
+        self.assertEqual(server.sent_segments, 0)
+
+        server.transcript.append(server.format_segment(1.0, 2.0, "b", completed=True))
+        segments = server.prepare_segments({"text": "c"})
+        self.assertEqual([segment.get("id") for segment in segments], [0, 1, None])
+        server.send_transcription_to_client(segments)
+        self.assertEqual(server.sent_segments, 2)
+        self.assertEqual(server.prepare_segments(), [])
+
+
 class TestAudioResampling(unittest.TestCase):
     def test_resample_audio(self):
         original_audio = "assets/jfk.flac"
@@ -149,6 +251,44 @@ class TestTee(BaseTestCase):
         self.client2.client_socket.send.assert_not_called()
         self.client3.client_socket.send.assert_called_with(self.mock_audio_packet, websocket.ABNF.OPCODE_BINARY)
 
+    def test_multicast_audio_uses_each_client_encoding(self):
+        pcm16 = b'\x00\x40' * 4
+        self.client2.recording = True
+        self.client3.recording = True
+        self.client3.audio_encoder = AudioEncoder("int16")
+        self.tee.multicast_audio(pcm16)
+        self.client2.client_socket.send.assert_called_with(
+            TranscriptionTeeClient.bytes_to_float_array(pcm16).tobytes(), websocket.ABNF.OPCODE_BINARY
+        )
+        self.client3.client_socket.send.assert_called_with(pcm16, websocket.ABNF.OPCODE_BINARY)
+
+    @patch('whisper_live.client.time.sleep')
+    def test_av_stream_sent_in_client_encoding(self, mock_sleep):
+        # one second of stereo 44.1 kHz float audio, as a network stream might carry it
+        buffer = io.BytesIO()
+        with av.open(buffer, mode="w", format="wav") as output:
+            stream = output.add_stream("pcm_f32le", rate=44100, layout="stereo")
+            frame = av.AudioFrame.from_ndarray(np.zeros((1, 88200), dtype=np.float32), format="flt", layout="stereo")
+            frame.rate = 44100
+            for packet in stream.encode(frame):
+                output.mux(packet)
+            for packet in stream.encode():
+                output.mux(packet)
+        buffer.seek(0)
+
+        self.client2.recording = True
+        self.client3.recording = True
+        self.client3.audio_encoder = AudioEncoder("int16")
+        self.tee.process_av_stream(av.open(buffer, format="wav"), stream_type="RTSP")
+
+        def sent_bytes(client):
+            return sum(
+                len(call.args[0]) for call in client.client_socket.send.call_args_list
+                if call.args[0] != Client.END_OF_AUDIO.encode('utf-8')
+            )
+        self.assertAlmostEqual(sent_bytes(self.client3) / 2, 16000, delta=400)
+        self.assertEqual(sent_bytes(self.client2), 2 * sent_bytes(self.client3))
+
     def test_close_all(self):
         self.tee.close_all_clients()
         for client in self.tee.clients:
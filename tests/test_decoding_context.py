@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+
+from whisper_live.transcriber.transcriber_faster_whisper import DecodingContext
+
+
+class TestDecodingContext(unittest.TestCase):
+    def setUp(self):
+        self.model = mock.MagicMock(max_length=40)
+        self.model.hf_tokenizer.encode.return_value = mock.MagicMock(ids=[1, 2, 3])
+        self.context = DecodingContext(self.model, max_history_tokens=10)
+
+    def test_initial_prompt_encoded_once(self):
+        self.assertEqual(self.context.get_prompt_tokens("hello"), [1, 2, 3])
+        self.assertEqual(self.context.get_prompt_tokens("hello"), [1, 2, 3])
+        self.model.hf_tokenizer.encode.assert_called_once_with(" hello", add_special_tokens=False)
+        self.assertIsNone(self.context.get_prompt_tokens(None))
+
+    def test_history_follows_initial_prompt(self):
+        self.context.commit([10, 11])
+        self.context.commit([12])
+        self.assertEqual(self.context.get_prompt_tokens("hello"), [1, 2, 3, 10, 11, 12])
+        self.assertEqual(self.context.get_prompt_tokens(None), [10, 11, 12])
+
+    def test_history_is_bounded(self):
+        self.context.commit(list(range(100, 125)))
+        self.assertEqual(self.context.history, list(range(115, 125)))
+        # the prompt never exceeds what `get_prompt` keeps, and the initial prompt is not cut
+        self.context.max_history_tokens = self.context.max_prompt_tokens
+        self.context.commit(list(range(200, 230)))
+        prompt = self.context.get_prompt_tokens("hello")
+        self.assertEqual(len(prompt), self.context.max_prompt_tokens)
+        self.assertEqual(prompt[:3], [1, 2, 3])
+        self.assertEqual(prompt[-1], 229)
+        self.context.reset_history()
+        self.assertEqual(self.context.get_prompt_tokens("hello"), [1, 2, 3])
+
+    @mock.patch("whisper_live.transcriber.transcriber_faster_whisper.Tokenizer")
+    def test_tokenizer_cached_per_task_and_language(self, tokenizer):
+        first = self.context.get_tokenizer("transcribe", "en")
+        self.assertIs(self.context.get_tokenizer("transcribe", "en"), first)
+        self.context.get_tokenizer("translate", "de")
+        self.assertEqual(tokenizer.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
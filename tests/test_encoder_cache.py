@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from whisper_live.transcriber.encoder_cache import EncoderOutputCache
+
+
+class TestEncoderOutputCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.features = rng.standard_normal((80, 3000)).astype(np.float32)
+
+    def window(self, content_frames):
+        features = self.features.copy()
+        features[:, content_frames:] = 0
+        return features
+
+    def encode(self, cache, key, content_frames):
+        encoder_output, digest = cache.lookup(key, self.window(content_frames), content_frames)
+        if encoder_output is None:
+            encoder_output = ("encoded", key, content_frames)
+            cache.store(key, content_frames, digest, encoder_output)
+        return encoder_output
+
+    def test_identical_window_hits(self):
+        cache = EncoderOutputCache()
+        first = self.encode(cache, 0, 500)
+        self.assertIs(self.encode(cache, 0, 500), first)
+        self.assertEqual(cache.get_stats(), {"hits": 1, "near_hits": 0, "misses": 1, "hit_rate": 0.5})
+
+    def test_changed_features_miss(self):
+        cache = EncoderOutputCache()
+        self.encode(cache, 0, 500)
+        features = self.window(500)
+        features[0, 10] += 1
+        encoder_output, _ = cache.lookup(0, features, 500)
+        self.assertIsNone(encoder_output)
+        self.assertIsNone(cache.lookup(16000, self.window(500), 500)[0])
+
+    def test_grown_window_within_tolerance(self):
+        cache = EncoderOutputCache(max_new_frames=10)
+        first = self.encode(cache, 0, 500)
+        self.assertIs(self.encode(cache, 0, 505), first)
+        self.assertIs(self.encode(cache, 0, 510), first)
+        # staleness is bounded by the last encoded window, not the last lookup
+        self.assertIsNot(self.encode(cache, 0, 511), first)
+        self.assertEqual((cache.hits, cache.near_hits, cache.misses), (0, 2, 2))
+
+    def test_grown_window_misses_without_tolerance(self):
+        cache = EncoderOutputCache()
+        first = self.encode(cache, 0, 500)
+        self.assertIsNot(self.encode(cache, 0, 505), first)
+
+    def test_oldest_entries_evicted(self):
+        cache = EncoderOutputCache(max_entries=2)
+        for key in (0, 1, 2):
+            self.encode(cache, key, 500)
+        self.assertEqual(list(cache.entries), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from whisper_live import metrics
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.fair_scheduler import FairScheduler
+
+
+class TestFairScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = FairScheduler()
+        self.order = []
+
+    def run_turn(self, session, cost, priority):
+        with self.scheduler.turn(session, cost, priority):
+            self.order.append(session)
+
+    def queue_request(self, session, cost, priority="normal"):
+        """Starts a thread asking for a turn and waits until its request is pending."""
+        waiting = self.scheduler.waiting()
+        thread = threading.Thread(target=self.run_turn, args=(session, cost, priority))
+        thread.start()
+        while self.scheduler.waiting() == waiting:
+            time.sleep(0.001)
+        return thread
+
+    def run_queued(self, requests):
+        self.scheduler.acquire("holder", 0.0)
+        threads = [self.queue_request(*request) for request in requests]
+        self.scheduler.release()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+    def test_session_alone_does_not_wait_for_credit(self):
+        start = time.perf_counter()
+        for _ in range(3):
+            with self.scheduler.turn("backlog", 25.0):
+                pass
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.scheduler.waiting(), 0)
+
+    def test_short_windows_run_before_a_long_backlog(self):
+        self.run_queued([("backlog", 25.0), ("a", 1.0), ("b", 1.0), ("c", 1.0)])
+        self.assertEqual(self.order, ["a", "b", "c", "backlog"])
+
+    def test_priority_tiers(self):
+        self.run_queued([("low", 4.0, "low"), ("normal", 4.0, "normal"), ("high", 4.0, "high")])
+        self.assertEqual(self.order, ["high", "normal", "low"])
+
+    def test_unknown_priority_is_normal(self):
+        self.run_queued([("custom", 2.0, "urgent"), ("normal", 2.0, "normal")])
+        self.assertEqual(self.order, ["custom", "normal"])
+
+    def test_wait_recorded(self):
+        count = metrics.SCHEDULER_WAIT_SECONDS.get(priority="high")[0]
+        with self.scheduler.turn("a", 1.0, "high"):
+            pass
+        self.assertEqual(metrics.SCHEDULER_WAIT_SECONDS.get(priority="high")[0], count + 1)
+
+
+class TestModelTurn(unittest.TestCase):
+    def test_lock_without_scheduler(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        lock = threading.Lock()
+        with client.model_turn(lock, 1.0):
+            self.assertTrue(lock.locked())
+        self.assertFalse(lock.locked())
+        with client.model_turn(None, 1.0):
+            pass
+
+    def test_scheduler_replaces_lock(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        client.model_scheduler = mock.MagicMock()
+        client.priority = "high"
+        lock = threading.Lock()
+        with client.model_turn(lock, 2.0):
+            self.assertFalse(lock.locked())
+        client.model_scheduler.turn.assert_called_once_with("uid", 2.0, "high")
+
+
+if __name__ == "__main__":
+    unittest.main()
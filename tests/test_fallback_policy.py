@@ -0,0 +1,82 @@
+import logging
+import unittest
+from dataclasses import fields
+from unittest import mock
+
+from whisper_live.transcriber.transcriber_faster_whisper import (
+    TranscriptionInfo,
+    TranscriptionOptions,
+    WhisperModel,
+)
+
+TIMESTAMP_BEGIN = 1000
+
+
+def make_options(**overrides):
+    options = {field.name: None for field in fields(TranscriptionOptions)}
+    options.update(
+        beam_size=5,
+        best_of=5,
+        patience=1,
+        length_penalty=1,
+        repetition_penalty=1,
+        no_repeat_ngram_size=0,
+        log_prob_threshold=-1.0,
+        no_speech_threshold=0.6,
+        compression_ratio_threshold=2.4,
+        temperatures=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        suppress_blank=True,
+        suppress_tokens=[],
+        max_initial_timestamp=1.0,
+        max_fallbacks=None,
+        fallback_completed_only=False,
+    )
+    options.update(overrides)
+    return TranscriptionOptions(**options)
+
+
+class TestBoundedFallback(unittest.TestCase):
+    def setUp(self):
+        self.model = WhisperModel.__new__(WhisperModel)
+        self.model.time_precision = 0.02
+        self.model.max_length = 448
+        self.model.logger = logging.getLogger("test")
+        self.model.model = mock.MagicMock()
+        self.tokenizer = mock.MagicMock(timestamp_begin=TIMESTAMP_BEGIN)
+        self.tokenizer.decode.return_value = "some text"
+        self.info = TranscriptionInfo("en", 1, 1.0, 1.0, None, None, None)
+
+    def decode_with(self, tokens, **options):
+        # a low score fails the log probability threshold at every temperature
+        result = mock.MagicMock(sequences_ids=[tokens], scores=[-5.0], no_speech_prob=0.0)
+        self.model.model.generate.return_value = [result]
+        return self.model.generate_with_fallback(None, [1], self.tokenizer, make_options(**options), self.info)
+
+    def test_full_ladder_by_default(self):
+        _, _, temperature, _ = self.decode_with([5, 6, 7])
+        self.assertEqual(self.model.model.generate.call_count, 6)
+        self.assertEqual(self.info.num_fallbacks, 5)
+        self.assertEqual(temperature, 1.0)
+
+    def test_max_fallbacks_caps_attempts(self):
+        _, _, temperature, _ = self.decode_with([5, 6, 7], max_fallbacks=1)
+        self.assertEqual(self.model.model.generate.call_count, 2)
+        self.assertEqual(self.info.num_fallbacks, 1)
+        self.assertEqual(temperature, 0.2)
+
+    def test_incomplete_window_keeps_first_decoding(self):
+        tokens = [TIMESTAMP_BEGIN, 5, 6, TIMESTAMP_BEGIN + 50]
+        _, _, temperature, _ = self.decode_with(tokens, fallback_completed_only=True)
+        self.assertEqual(self.model.model.generate.call_count, 1)
+        self.assertEqual(self.info.num_fallbacks, 0)
+        self.assertEqual(temperature, 0.0)
+
+    def test_completed_segment_falls_back(self):
+        tokens = [TIMESTAMP_BEGIN, 5, TIMESTAMP_BEGIN + 20, TIMESTAMP_BEGIN + 20, 6, TIMESTAMP_BEGIN + 50]
+        self.decode_with(tokens, fallback_completed_only=True, max_fallbacks=2)
+        self.assertEqual(self.model.model.generate.call_count, 3)
+        self.assertEqual(self.info.num_fallbacks, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import logging
+import unittest
+from unittest import mock
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+from whisper_live.transcriber.transcriber_faster_whisper import WhisperModel
+
+
+class TestLanguageDetectionEncoderReuse(unittest.TestCase):
+    def setUp(self):
+        self.model = WhisperModel.__new__(WhisperModel)
+        self.model.logger = logging.getLogger("test")
+        self.model.feature_extractor = FeatureExtractor()
+        self.model.frames_per_second = 100
+        self.model.hf_tokenizer = mock.MagicMock()
+        self.model.model = mock.MagicMock(is_multilingual=True)
+        self.model.encode = mock.MagicMock(return_value="encoder output")
+        self.model.generate_segments = mock.MagicMock(return_value=[])
+        self.audio = np.zeros(3 * 16000, dtype=np.float32)
+
+    def detect(self, probability, **kwargs):
+        self.model.model.detect_language.return_value = [[("<|de|>", probability), ("<|en|>", 0.01)]]
+        return self.model.transcribe(self.audio, suppress_tokens=[], **kwargs)
+
+    def test_first_window_encoded_once(self):
+        segments, info = self.detect(0.9)
+        self.assertEqual((info.language, info.language_probability), ("de", 0.9))
+        self.model.encode.assert_called_once()
+        self.assertEqual(self.model.generate_segments.call_args[0][4], "encoder output")
+
+    def test_low_probability_skips_decoding(self):
+        segments, info = self.detect(0.3, min_language_probability=0.5)
+        self.assertEqual(segments, [])
+        self.assertEqual(info.language, "de")
+        self.model.generate_segments.assert_not_called()
+
+        self.detect(0.6, min_language_probability=0.5)
+        self.model.generate_segments.assert_called_once()
+
+
+class TestSessionLanguageDetection(unittest.TestCase):
+    def make_client(self, language):
+        client = ServeClientFasterWhisper.__new__(ServeClientFasterWhisper)
+        client.language = language
+        client.language_detection_seconds = 3.0
+        client.window_controller = None
+        client.client_uid = "uid"
+        client.websocket = mock.MagicMock()
+        return client
+
+    def test_waits_for_detection_sample(self):
+        client = self.make_client(None)
+        self.assertEqual(client.get_min_chunk_duration(), 3.0)
+        self.assertEqual(self.make_client("de").get_min_chunk_duration(), 1.0)
+
+    def test_confident_detection_is_kept(self):
+        client = self.make_client(None)
+        client.set_language(mock.MagicMock(language="de", language_probability=0.4))
+        self.assertIsNone(client.language)
+        client.set_language(mock.MagicMock(language="de", language_probability=0.8))
+        self.assertEqual(client.language, "de")
+        self.assertEqual(client.get_min_chunk_duration(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
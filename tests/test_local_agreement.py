@@ -0,0 +1,88 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.local_agreement import LocalAgreement
+
+
+def hypothesis(*texts, start=0.0):
+    return [(start + i, start + i + 1, f" {text}") for i, text in enumerate(texts)]
+
+
+def segment(words, no_speech_prob=0.0):
+    words = [SimpleNamespace(start=start, end=end, word=text, probability=0.9) for start, end, text in words]
+    return SimpleNamespace(words=words, no_speech_prob=no_speech_prob, temperature=0.0)
+
+
+class TestLocalAgreement(unittest.TestCase):
+    def test_commits_common_prefix(self):
+        policy = LocalAgreement()
+        committed, pending = policy.insert(hypothesis("the", "quick"), 0.0)
+        self.assertEqual((committed, len(pending)), ([], 2))
+        committed, pending = policy.insert(hypothesis("the", "quick", "brown"), 0.0)
+        self.assertEqual([w[2] for w in committed], [" the", " quick"])
+        self.assertEqual([w[2] for w in pending], [" brown"])
+
+    def test_disagreement_stops_prefix(self):
+        policy = LocalAgreement()
+        policy.insert(hypothesis("the", "quick", "brown"), 0.0)
+        committed, _ = policy.insert(hypothesis("the", "quack", "brown"), 0.0)
+        self.assertEqual([w[2] for w in committed], [" the"])
+
+    def test_punctuation_and_case_ignored(self):
+        policy = LocalAgreement()
+        policy.insert(hypothesis("Hello,", "world"), 0.0)
+        committed, _ = policy.insert(hypothesis("hello", "world."), 0.0)
+        self.assertEqual(len(committed), 2)
+
+    def test_pending_words_compared_after_commit(self):
+        policy = LocalAgreement()
+        policy.insert(hypothesis("a", "b"), 0.0)
+        policy.insert(hypothesis("a", "b", "c"), 0.0)
+        # the next window starts after "b", only "c" is left to agree on
+        committed, _ = policy.insert(hypothesis("c", "d", start=2.0), 2.0)
+        self.assertEqual([w[2] for w in committed], [" c"])
+
+    def test_three_hypotheses(self):
+        policy = LocalAgreement(n=3)
+        policy.insert(hypothesis("a", "b"), 0.0)
+        self.assertEqual(policy.insert(hypothesis("a", "b"), 0.0)[0], [])
+        committed, _ = policy.insert(hypothesis("a", "x"), 0.0)
+        self.assertEqual([w[2] for w in committed], [" a"])
+
+
+class TestLocalAgreementCommitPolicy(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("uid", mock.MagicMock())
+        self.client.local_agreement = LocalAgreement()
+        self.client.text_committed = mock.MagicMock()
+
+    def test_window_moves_to_last_committed_word(self):
+        last = self.client.update_segments([segment(hypothesis("one", "two"))], 3.0)
+        self.assertEqual(last["text"], " one two")
+        self.assertEqual(self.client.timestamp_offset, 0.0)
+
+        last = self.client.update_segments([segment(hypothesis("one", "two", "three"))], 3.5)
+        self.assertEqual(self.client.timestamp_offset, 2.0)
+        self.assertEqual(self.client.transcript[-1]["text"], " one two")
+        self.assertTrue(self.client.transcript[-1]["completed"])
+        self.assertEqual(last, self.client.format_segment(2.0, 3.0, " three"))
+        self.assertNotIn("words", last)
+        self.client.text_committed.assert_called_once()
+
+        # word times of the next window are relative to the new offset
+        self.client.update_segments([segment(hypothesis("three", "four"))], 2.0)
+        self.assertEqual(self.client.transcript[-1]["text"], " three")
+        self.assertEqual(self.client.transcript[-1]["start"], "2.000")
+        self.assertEqual(self.client.timestamp_offset, 3.0)
+        self.assertEqual(self.client.current_out, " four")
+
+    def test_no_speech_segments_ignored(self):
+        self.client.update_segments([segment(hypothesis("noise"), no_speech_prob=0.9)], 1.0)
+        self.assertEqual(self.client.current_out, "")
+        self.assertEqual(self.client.transcript, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
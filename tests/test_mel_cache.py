@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from whisper_live.transcriber.mel_cache import MelSpectrogramCache
+
+
+class TestMelSpectrogramCache(unittest.TestCase):
+    def setUp(self):
+        self.feature_extractor = FeatureExtractor()
+        self.cache = MelSpectrogramCache(self.feature_extractor)
+        rng = np.random.default_rng(0)
+        self.stream = (rng.standard_normal(16000 * 40) * 0.1).astype(np.float32)
+
+    def assert_parity(self, start, end):
+        window = self.stream[start:end]
+        expected = self.feature_extractor(window)
+        actual = self.cache(window, start)
+        self.assertEqual(actual.shape, expected.shape)
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-5)
+
+    def test_growing_window_reuses_frames(self):
+        for end in range(16000, 16000 * 10, 4096):
+            self.assert_parity(0, end)
+        self.assertGreater(self.cache.hits, 10 * self.cache.misses)
+
+    def test_advancing_window_start(self):
+        start = 0
+        for end in range(16000 * 2, 16000 * 40, 4096):
+            # segment ends are multiples of 20 ms, which keeps frame centers aligned with the cache
+            if end % 3 == 0:
+                start += 320 * 50
+            self.assert_parity(start, end)
+        self.assertGreater(self.cache.hits, self.cache.misses)
+
+    def test_unaligned_window_start(self):
+        self.assert_parity(0, 16000 * 5)
+        hits = self.cache.hits
+        self.assert_parity(1234, 16000 * 6)
+        self.assertEqual(self.cache.hits, hits)
+        self.assert_parity(1234 + 160 * 7, 16000 * 7)
+        self.assertGreater(self.cache.hits, hits)
+
+    def test_short_windows(self):
+        for end in (1, 100, 400, 801):
+            self.assert_parity(0, end)
+
+    def test_dynamic_range_uses_whole_window(self):
+        self.stream[16000 * 4:16000 * 5] *= 1000
+        self.assert_parity(0, 16000 * 6)
+        # the loud second is no longer part of the window, so the normalization changes
+        self.assert_parity(16000 * 5, 16000 * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import numpy as np
+
+from whisper_live import metrics
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.server import ClientManager
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.MetricsRegistry()
+
+    def test_render_exposition_format(self):
+        counter = self.registry.counter("requests_total", "Requests.", ("path",))
+        counter.inc(path="/a")
+        counter.inc(2, path='/"b"')
+        histogram = self.registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(3.0)
+        self.assertEqual(
+            self.registry.render().splitlines(),
+            [
+                "# HELP requests_total Requests.",
+                "# TYPE requests_total counter",
+                'requests_total{path="/\\"b\\""} 2.0',
+                'requests_total{path="/a"} 1.0',
+                "# HELP latency_seconds Latency.",
+                "# TYPE latency_seconds histogram",
+                'latency_seconds_bucket{le="0.1"} 1.0',
+                'latency_seconds_bucket{le="1.0"} 2.0',
+                'latency_seconds_bucket{le="+Inf"} 3.0',
+                "latency_seconds_sum 3.55",
+                "latency_seconds_count 3.0",
+            ],
+        )
+        self.assertEqual(histogram.get(), (3, 3.55))
+
+    def test_labels_must_match(self):
+        counter = self.registry.counter("requests_total", "Requests.", ("path",))
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            counter.inc(-1, path="/a")
+
+    def test_register_returns_existing_metric(self):
+        gauge = self.registry.gauge("depth", "Depth.")
+        self.assertIs(self.registry.gauge("depth", "Depth."), gauge)
+        with self.assertRaises(ValueError):
+            self.registry.counter("depth", "Depth.")
+
+    def test_collectors_run_before_render(self):
+        gauge = self.registry.gauge("depth", "Depth.")
+        self.registry.add_collector(lambda: gauge.set(7))
+        self.assertIn("depth 7.0", self.registry.render())
+
+    def test_http_endpoint(self):
+        self.registry.counter("requests_total", "Requests.").inc()
+        server = metrics.start_http_server(0, host="127.0.0.1", registry=self.registry)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/metrics") as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                self.assertIn("requests_total 1.0", response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestServerMetrics(unittest.TestCase):
+    def make_client(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        client.language = "en"
+        client.transcribe_audio = mock.MagicMock(return_value=None)
+        return client
+
+    def test_transcription_pass_recorded(self):
+        client = self.make_client()
+        passes = metrics.TRANSCRIBE_SECONDS.get(backend="base")[0]
+        audio = metrics.TRANSCRIBED_AUDIO_SECONDS.get(backend="base")
+        received = metrics.AUDIO_RECEIVED_SECONDS.get()
+        client.add_frames(np.zeros(2 * client.RATE, dtype=np.float32))
+        client.transcription_step()
+        self.assertEqual(metrics.TRANSCRIBE_SECONDS.get(backend="base")[0], passes + 1)
+        self.assertAlmostEqual(metrics.TRANSCRIBED_AUDIO_SECONDS.get(backend="base") - audio, 2.0)
+        self.assertAlmostEqual(metrics.AUDIO_RECEIVED_SECONDS.get() - received, 2.0)
+
+    def test_client_manager_collects_lag(self):
+        manager = ClientManager()
+        client = self.make_client()
+        manager.add_client("websocket", client)
+        client.add_frames(np.zeros(3 * client.RATE, dtype=np.float32))
+        client.timestamp_offset = 1.0
+        manager.collect_metrics()
+        self.assertEqual(metrics.CLIENTS.get(), 1)
+        self.assertEqual(metrics.CLIENT_LAG_SECONDS.get(client_uid="uid"), 2.0)
+
+        manager.clients.clear()
+        manager.collect_metrics()
+        self.assertEqual(metrics.CLIENTS.get(), 0)
+        self.assertNotIn("client_uid=\"uid\"", "\n".join(metrics.CLIENT_LAG_SECONDS.render()))
+
+
+if __name__ == "__main__":
+    unittest.main()
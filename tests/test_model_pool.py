@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.model_pool import ModelPool
+
+
+class TestModelPool(unittest.TestCase):
+    def test_least_loaded_replica(self):
+        pool = ModelPool(["a", "b"])
+        first, second = pool.acquire(), pool.acquire()
+        self.assertEqual({first, second}, {0, 1})
+        pool.release(first)
+        self.assertEqual(pool.acquire(), first)
+
+    def test_workers_per_replica(self):
+        pool = ModelPool(["a", "b"], workers=2)
+        self.assertEqual(pool.capacity, 4)
+        self.assertEqual(pool.scheduler.slots, 4)
+        self.assertEqual(sorted(pool.acquire() for _ in range(4)), [0, 0, 1, 1])
+
+    def test_waits_for_a_free_replica(self):
+        pool = ModelPool(["a"])
+        index = pool.acquire()
+        used = []
+
+        def run():
+            with pool.replica() as replica:
+                used.append(replica)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(used, [])
+        pool.release(index)
+        thread.join(timeout=5)
+        self.assertEqual(used, ["a"])
+        self.assertEqual(pool.loads, [0])
+
+    def test_needs_a_replica(self):
+        with self.assertRaises(ValueError):
+            ModelPool([])
+
+    def test_auto_size(self):
+        with mock.patch("whisper_live.backend.model_pool.os.cpu_count", return_value=8):
+            self.assertEqual(ModelPool.auto_size(2), 4)
+            self.assertEqual(ModelPool.auto_size(16), 1)
+            self.assertEqual(ModelPool.auto_size(1, memory_per_replica=2 ** 30, available_memory=6 * 2 ** 30), 3)
+            self.assertEqual(ModelPool.auto_size(1, memory_per_replica=2 ** 30, available_memory=2 ** 30), 1)
+
+    def test_model_turn_runs_on_pool(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        pool = ModelPool(["a", "b"])
+        lock = threading.Lock()
+        with client.model_turn(lock, 1.0, pool) as first:
+            self.assertFalse(lock.locked())
+            with client.model_turn(lock, 1.0, pool) as second:
+                self.assertEqual({first, second}, {"a", "b"})
+        self.assertEqual(pool.loads, [0, 0])
+
+    def test_scheduler_slots_run_concurrently(self):
+        pool = ModelPool(["a", "b"])
+        pool.scheduler.acquire("first", 1.0)
+        pool.scheduler.acquire("second", 1.0)
+        self.assertEqual(pool.scheduler.running, 2)
+        pool.scheduler.release()
+        pool.scheduler.release()
+        self.assertEqual(pool.scheduler.running, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import unittest
+from unittest import mock
+
+from whisper_live.backend.model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("whisper_live.backend.model_registry.WhisperModel")
+        self.whisper_model = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.whisper_model.side_effect = self.make_model
+        self.registry = ModelRegistry(device="cpu", warmup_audio="missing.flac")
+
+    @staticmethod
+    def make_model(model_path, **kwargs):
+        model = mock.MagicMock(name=model_path)
+        model.transcribe.return_value = ([], None)
+        return model
+
+    def test_model_size_resolves_without_download(self):
+        with mock.patch("whisper_live.backend.model_registry.snapshot_download") as snapshot_download:
+            self.assertEqual(self.registry.resolve("tiny.en"), "tiny.en")
+        snapshot_download.assert_not_called()
+        self.assertEqual(self.registry.resolved_models, ["tiny.en"])
+        self.assertEqual(self.registry.loaded_models, [])
+
+    def test_preload_loads_and_warms_up_once(self):
+        self.registry.preload(["tiny.en", "base.en"])
+        self.assertEqual(self.registry.loaded_models, ["tiny.en", "base.en"])
+        model = self.registry.get("tiny.en")
+        model.transcribe.assert_called_once()
+        self.assertIs(self.registry.get("tiny.en"), model)
+        self.assertEqual(self.whisper_model.call_count, 2)
+        self.assertEqual(self.whisper_model.call_args.kwargs["compute_type"], "int8")
+
+    def test_preload_without_loading(self):
+        self.registry.preload(["tiny.en"], load=False)
+        self.assertEqual(self.registry.resolved_models, ["tiny.en"])
+        self.assertEqual(self.registry.loaded_models, [])
+        self.whisper_model.assert_not_called()
+
+    def test_preload_spares_for_own_instances(self):
+        self.registry.preload(["tiny.en"], shared=False)
+        self.assertEqual(self.registry.loaded_models, [])
+        self.assertEqual(self.registry.spare_models, ["tiny.en"])
+        spare = self.registry.take("tiny.en")
+        spare.transcribe.assert_called_once()
+        self.assertIsNone(self.registry.take("tiny.en"))
+        self.assertIsNot(self.registry.create("tiny.en"), spare)
+        self.assertEqual(self.registry.spare_models, [])
+
+    def test_concurrent_get_loads_once(self):
+        threads = [threading.Thread(target=self.registry.get, args=("tiny.en",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.whisper_model.assert_called_once()
+
+    def test_create_returns_new_instances(self):
+        shared = self.registry.get("tiny.en")
+        self.assertIsNot(self.registry.create("tiny.en"), shared)
+
+    def test_pool_of_replicas(self):
+        registry = ModelRegistry(device="cpu", warmup_audio="missing.flac", replicas=3, replica_workers=2)
+        self.assertTrue(registry.pooled)
+        registry.preload(["tiny.en"])
+        pool = registry.pool("tiny.en")
+        self.assertEqual(len(pool.replicas), 3)
+        self.assertEqual(pool.capacity, 6)
+        self.assertIs(pool.replicas[0], registry.get("tiny.en"))
+        self.assertEqual(len({id(replica) for replica in pool.replicas}), 3)
+        self.assertEqual(self.whisper_model.call_count, 3)
+        self.assertEqual(self.whisper_model.call_args.kwargs["num_workers"], 2)
+        self.assertIs(registry.pool("tiny.en"), pool)
+        self.assertFalse(self.registry.pooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,19 @@
+import asyncio
 import subprocess
+import threading
 import time
 import json
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import numpy as np
 import jiwer
 
 from websockets.exceptions import ConnectionClosed
-from whisper_live.server import TranscriptionServer, BackendType, ClientManager
+from whisper_live.server import (
+    TranscriptionServer, BackendType, ClientManager, AsyncWebSocketBridge, VoiceActivityState
+)
 from whisper_live.client import Client, TranscriptionClient, TranscriptionTeeClient
 from whisper.normalizers import EnglishTextNormalizer
 
@@ -39,6 +44,72 @@ class TestGetWaitTime(unittest.TestCase):
         self.assertAlmostEqual(self.server.client_manager.get_wait_time(), expected_wait_time, places=2)
 
 
+class TestAdmissionControl(unittest.TestCase):
+    def setUp(self):
+        self.manager = ClientManager(max_clients=8, max_connection_time=600, capacity=16)
+        self.websocket = mock.MagicMock()
+
+    def add_client(self, name, cost, elapsed):
+        self.manager.add_client(name, mock.MagicMock(), cost)
+        self.manager.start_times[name] = time.time() - elapsed
+
+    def sent(self):
+        return json.loads(self.websocket.send.call_args[0][0])
+
+    def test_estimate_cost(self):
+        self.assertEqual(self.manager.estimate_cost({"model": "tiny.en"}), 1.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "large-v3"}), 12.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "large-v3-turbo"}), 5.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "distil-large-v3"}), 6.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "Systran/faster-whisper-medium.en"}), 6.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "/models/my-finetune"}), 3.0)
+        self.assertAlmostEqual(self.manager.estimate_cost({"model": "small", "use_vad": True}), 2.1)
+        self.assertEqual(self.manager.estimate_cost({"model": "small", "enable_translation": True}), 7.0)
+        self.assertEqual(self.manager.estimate_cost({"model": "large-v3"}, model="/models/tiny"), 1.0)
+
+    def test_admits_within_capacity(self):
+        self.add_client("a", 12.0, 0)
+        self.assertFalse(self.manager.is_server_full(self.websocket, {"uid": "new", "model": "small"}))
+        self.websocket.send.assert_not_called()
+
+    def test_wait_until_enough_cost_is_freed(self):
+        self.add_client("a", 3.0, 500)
+        self.add_client("b", 6.0, 300)
+        self.add_client("c", 6.0, 0)
+        self.assertTrue(self.manager.is_server_full(self.websocket, {"uid": "new", "model": "medium"}))
+        response = self.sent()
+        self.assertEqual(response["status"], "WAIT")
+        # freeing "a" alone leaves 12 + 6 > 16, "b" has to leave as well
+        self.assertAlmostEqual(response["message"], 5.0, places=1)
+
+    def test_client_limit_still_applies(self):
+        manager = ClientManager(max_clients=1, max_connection_time=600, capacity=100)
+        manager.add_client("a", mock.MagicMock(), 1.0)
+        self.assertTrue(manager.is_server_full(self.websocket, {"uid": "new", "model": "tiny"}))
+
+    def test_oversized_session_runs_on_idle_server(self):
+        self.assertFalse(self.manager.is_server_full(self.websocket, {"uid": "new", "model": "large-v3", "enable_translation": True}))
+
+    def test_downgrade_when_allowed(self):
+        self.add_client("a", 12.0, 0)
+        options = {"uid": "new", "model": "medium.en", "allow_model_downgrade": True}
+        self.assertFalse(self.manager.is_server_full(self.websocket, options))
+        self.assertEqual(options["model"], "small.en")
+        self.assertEqual(self.sent()["status"], "WARNING")
+
+    def test_no_downgrade_for_fixed_model(self):
+        self.add_client("a", 12.0, 0)
+        options = {"uid": "new", "model": "medium", "allow_model_downgrade": True}
+        self.assertTrue(self.manager.is_server_full(self.websocket, options, allow_downgrade=False))
+        self.assertEqual(options["model"], "medium")
+        self.assertEqual(self.sent()["status"], "WAIT")
+
+    def test_remove_client_frees_cost(self):
+        self.add_client("a", 12.0, 0)
+        self.manager.remove_client("a")
+        self.assertEqual(self.manager.get_load(), 0)
+
+
 class TestServerConnection(unittest.TestCase):
     def setUp(self):
         self.server = TranscriptionServer()
@@ -55,6 +126,34 @@ class TestServerConnection(unittest.TestCase):
         })
         self.server.recv_audio(mock_websocket, BackendType("faster_whisper"))
 
+    def test_failed_initialization_rejects_connection(self):
+        websocket = mock.MagicMock()
+        options = json.dumps({'uid': 'test_client', 'language': 'en', 'task': 'transcribe', 'model': 'tiny.en'})
+        self.server.backend = BackendType.FASTER_WHISPER
+        with mock.patch.object(self.server, "initialize_client"):
+            connected = self.server.handle_new_connection(websocket, None, None, False, options=options)
+        self.assertFalse(connected)
+        websocket.close.assert_called_once()
+        self.assertNotIn(websocket, self.server.audio_decoders)
+        self.assertNotIn(websocket, self.server.vad_states)
+
+    def test_unsupported_audio_encoding_rejected(self):
+        websocket = mock.MagicMock()
+        options = json.dumps({
+            'uid': 'test_client', 'language': 'en', 'task': 'transcribe', 'model': 'tiny.en', 'audio_encoding': 'mp3'
+        })
+        self.server.backend = BackendType.FASTER_WHISPER
+        with mock.patch.object(self.server, "initialize_client") as initialize_client:
+            connected = self.server.handle_new_connection(websocket, None, None, False, options=options)
+        self.assertFalse(connected)
+        initialize_client.assert_not_called()
+        message = json.loads(websocket.send.call_args[0][0])
+        self.assertEqual(message["uid"], "test_client")
+        self.assertEqual(message["status"], "ERROR")
+        self.assertIn("unsupported audio_encoding 'mp3'", message["message"])
+        websocket.close.assert_called_once()
+        self.assertEqual(self.server.client_manager.get_load(), 0)
+
     @mock.patch('websockets.WebSocketCommonProtocol')
     def test_recv_audio_exception_handling(self, mock_websocket):
         mock_websocket.recv.side_effect = [json.dumps({
@@ -70,6 +169,136 @@ class TestServerConnection(unittest.TestCase):
         self.assertNotIn(mock_websocket, self.server.client_manager.clients)
 
 
+class FakeAsyncWebSocket:
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = False
+
+    async def recv(self):
+        if not self.messages:
+            raise ConnectionClosed(None, None)
+        return self.messages.pop(0)
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAsyncServer(unittest.TestCase):
+    def setUp(self):
+        self.server = TranscriptionServer()
+        self.server.client_manager = ClientManager(max_clients=4, max_connection_time=600)
+        self.server.cache_path = "~/.cache/whisper-live/"
+
+    def test_bridge_send_from_worker_thread(self):
+        websocket = FakeAsyncWebSocket()
+
+        async def send_from_executor():
+            bridge = AsyncWebSocketBridge(websocket, asyncio.get_running_loop())
+            await asyncio.get_running_loop().run_in_executor(None, bridge.send, "hello")
+            bridge.send("from loop")
+            await asyncio.sleep(0)
+
+        asyncio.run(send_from_executor())
+        self.assertEqual(websocket.sent, ["hello", "from loop"])
+
+    def test_recv_audio_async_routes_frames(self):
+        frame = np.arange(4096, dtype=np.float32)
+        websocket = FakeAsyncWebSocket([
+            json.dumps({'uid': 'test_client', 'language': 'en', 'task': 'transcribe', 'model': 'tiny.en'}),
+            frame.tobytes(),
+            "END_OF_AUDIO",
+        ])
+        client = mock.MagicMock()
+        client.exit = False
+        client.transcription_step.return_value = 0
+
+        def fake_initialize_client(websocket, options, *args, **kwargs):
+            self.assertFalse(kwargs["start_thread"])
+            self.server.client_manager.add_client(websocket, client)
+
+        with mock.patch.object(self.server, "initialize_client", side_effect=fake_initialize_client):
+            asyncio.run(self.server.recv_audio_async(websocket, BackendType("faster_whisper")))
+
+        client.add_frames.assert_called_once()
+        np.testing.assert_array_equal(client.add_frames.call_args[0][0], frame)
+        client.cleanup.assert_called_once()
+        self.assertTrue(websocket.closed)
+        self.assertDictEqual(self.server.client_manager.clients, {})
+
+    def test_vad_gated_frames_run_on_ingest_executor(self):
+        websocket = FakeAsyncWebSocket([
+            json.dumps({'uid': 'test_client', 'language': 'en', 'task': 'transcribe', 'model': 'tiny.en'}),
+            np.zeros(4096, dtype=np.float32).tobytes(),
+            "END_OF_AUDIO",
+        ])
+        client = mock.MagicMock()
+        client.exit = False
+        client.run_transcription_step.return_value = None
+        threads = []
+        client.add_frames.side_effect = lambda frame: threads.append(threading.current_thread().name)
+
+        def fake_initialize_client(websocket, options, *args, **kwargs):
+            self.server.client_manager.add_client(websocket, client)
+
+        self.server.inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.server.ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+        try:
+            with mock.patch.object(self.server, "initialize_client", side_effect=fake_initialize_client):
+                asyncio.run(self.server.recv_audio_async(websocket, BackendType("faster_whisper")))
+        finally:
+            self.server.inference_executor.shutdown()
+            self.server.ingest_executor.shutdown()
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("ingest"))
+
+
+class TestPerConnectionVoiceActivity(unittest.TestCase):
+    def setUp(self):
+        self.server = TranscriptionServer()
+        self.server.backend = BackendType.TENSORRT
+        self.server.client_manager = ClientManager(max_clients=4, max_connection_time=600)
+        self.frame = np.zeros(4096, dtype=np.float32)
+
+    def add_connection(self, speech, use_vad=True):
+        websocket = mock.MagicMock()
+        client = mock.MagicMock()
+        client.eos = False
+        self.server.client_manager.add_client(websocket, client)
+        self.server.vad_states[websocket] = VoiceActivityState(mock.MagicMock(return_value=speech), use_vad)
+        return websocket, client
+
+    def test_silence_on_one_connection_does_not_affect_another(self):
+        silent_ws, silent_client = self.add_connection(speech=False)
+        speaking_ws, speaking_client = self.add_connection(speech=True)
+
+        start = time.monotonic()
+        for _ in range(VoiceActivityState.MAX_NO_VOICE_ACTIVITY_CHUNKS + 1):
+            self.assertTrue(self.server.handle_audio_frame(silent_ws, self.frame))
+            self.assertTrue(self.server.handle_audio_frame(speaking_ws, self.frame))
+        self.assertLess(time.monotonic() - start, 0.1)
+
+        silent_client.set_eos.assert_called_once_with(True)
+        silent_client.add_frames.assert_not_called()
+        speaking_client.set_eos.assert_called_with(False)
+        self.assertEqual(speaking_client.add_frames.call_count, VoiceActivityState.MAX_NO_VOICE_ACTIVITY_CHUNKS + 1)
+        self.assertEqual(self.server.vad_states[speaking_ws].no_voice_activity_chunks, 0)
+
+    def test_silent_frames_kept_without_vad(self):
+        websocket, client = self.add_connection(speech=False, use_vad=False)
+        self.assertTrue(self.server.handle_audio_frame(websocket, self.frame))
+        client.add_frames.assert_called_once()
+
+    def test_cleanup_drops_vad_state(self):
+        websocket, _ = self.add_connection(speech=True)
+        self.server.cleanup(websocket)
+        self.assertNotIn(websocket, self.server.vad_states)
+
+
 class TestServerInferenceAccuracy(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from whisper_live import tracing
+from whisper_live.backend.base import ServeClientBase
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "trace.json")
+
+    def tearDown(self):
+        tracing.disable()
+
+    def load_spans(self):
+        with open(self.path) as f:
+            events = json.load(f)["traceEvents"]
+        return [e for e in events if e["ph"] == "X"]
+
+    def test_disabled_spans_are_shared_noops(self):
+        self.assertIs(tracing.span("encode"), tracing.NULL_SPAN)
+        with tracing.span("encode", frames=10):
+            pass
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_nested_spans_inherit_arguments(self):
+        tracing.enable(self.path)
+        with tracing.span("pass", session="uid", window=1.5):
+            with tracing.span("encode", batch=1):
+                pass
+        tracing.disable()
+        encode, outer = self.load_spans()
+        self.assertEqual((outer["name"], encode["name"]), ("pass", "encode"))
+        self.assertEqual(encode["args"], {"session": "uid", "window": 1.5, "batch": 1})
+        self.assertEqual(outer["args"], {"session": "uid", "window": 1.5})
+        self.assertLessEqual(outer["ts"], encode["ts"])
+        self.assertGreaterEqual(outer["dur"], encode["dur"])
+
+    def test_event_limit(self):
+        tracer = tracing.enable(self.path, max_events=2)
+        for _ in range(3):
+            with tracing.span("encode"):
+                pass
+        self.assertEqual((len(tracer.events), tracer.dropped), (2, 1))
+
+    def test_transcription_pass_spans(self):
+        tracing.enable(self.path)
+        client = ServeClientBase("uid", mock.MagicMock())
+        client.language = "en"
+        client.transcribe_audio = mock.MagicMock(return_value=None)
+        client.add_frames(np.zeros(2 * client.RATE, dtype=np.float32))
+        client.transcription_step()
+        tracing.disable()
+        spans = {span["name"]: span for span in self.load_spans()}
+        self.assertEqual(spans["transcription_pass"]["args"], {"session": "uid", "window": 2.0})
+        self.assertEqual(spans["transcribe_audio"]["args"], {"session": "uid", "window": 2.0})
+        self.assertIn("get_audio_chunk", spans)
+
+
+if __name__ == "__main__":
+    unittest.main()
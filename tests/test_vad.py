@@ -1,7 +1,12 @@
 import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import torch
 from whisper_live.transcriber.tensorrt_utils import load_audio
-from whisper_live.vad import VoiceActivityDetector
+from whisper_live.vad import (
+    VADStreamState, VoiceActivityDetection, VoiceActivityDetectionService, VoiceActivityDetector
+)
 
 
 class TestVoiceActivityDetection(unittest.TestCase):
@@ -24,3 +29,60 @@ class TestVoiceActivityDetection(unittest.TestCase):
         audio_tensor = load_audio("assets/jfk.flac")
         is_speech_present = self.vad(audio_tensor)
         self.assertTrue(is_speech_present, "VAD failed to identify speech segment.")
+
+
+class TestStreamingVoiceActivityDetection(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = VoiceActivityDetection()
+        audio = load_audio("assets/jfk.flac")
+        cls.audio = audio[:512 * (audio.shape[0] // 512)]
+
+    def test_stream_matches_audio_forward(self):
+        expected = self.model.audio_forward(torch.from_numpy(self.audio.copy()), 16000)[0].numpy()
+        state = VADStreamState()
+        # packets that are not a multiple of the window size exercise the carried over samples
+        probs = np.concatenate([
+            self.model.stream(self.audio[i:i + 3000], state) for i in range(0, self.audio.shape[0], 3000)
+        ])
+        np.testing.assert_allclose(probs, expected, atol=1e-6)
+
+    def test_stream_batch_matches_single_streams(self):
+        audios = [self.audio[i * 16000:(i + 2) * 16000 + i * 700] for i in range(4)]
+        batched = self.model.stream_batch(audios, [VADStreamState() for _ in audios])
+        for audio, probs in zip(audios, batched):
+            np.testing.assert_allclose(probs, self.model.stream(audio, VADStreamState()), atol=1e-6)
+
+    def test_detector_keeps_state_between_frames(self):
+        detector = VoiceActivityDetector(model=self.model)
+        detector(self.audio[:4096])
+        self.assertEqual(detector.stream_state.pending.shape[0], 0)
+        self.assertTrue(detector.stream_state.state.any())
+        detector(self.audio[4096:4096 + 100])
+        self.assertEqual(detector.stream_state.pending.shape[0], 100)
+        detector.reset()
+        self.assertFalse(detector.stream_state.state.any())
+
+    def test_service_matches_single_streams(self):
+        service = VoiceActivityDetectionService(self.model, max_batch_wait_ms=5)
+        self.addCleanup(service.close)
+        audios = [self.audio[i * 8000:i * 8000 + 32000] for i in range(8)]
+
+        def run_session(audio):
+            state = VADStreamState()
+            return np.concatenate([service.stream(audio[i:i + 4096], state) for i in range(0, audio.shape[0], 4096)])
+
+        with ThreadPoolExecutor(len(audios)) as executor:
+            results = list(executor.map(run_session, audios))
+        for audio, probs in zip(audios, results):
+            np.testing.assert_allclose(probs, self.model.stream(audio, VADStreamState()), atol=1e-6)
+
+    def test_service_orders_repeated_state(self):
+        service = VoiceActivityDetectionService(self.model)
+        self.addCleanup(service.close)
+        # the same state submitted twice in one tick is scored in order
+        state, future_a, future_b = VADStreamState(), mock.MagicMock(), mock.MagicMock()
+        service.score([(self.audio[:4096], state, future_a), (self.audio[4096:8192], state, future_b)])
+        expected = self.model.stream(self.audio[:8192], VADStreamState())
+        np.testing.assert_allclose(future_a.set_result.call_args[0][0], expected[:8], atol=1e-6)
+        np.testing.assert_allclose(future_b.set_result.call_args[0][0], expected[8:], atol=1e-6)
@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.window_controller import AdaptiveWindowController
+
+
+class TestAdaptiveWindowController(unittest.TestCase):
+    def test_defaults_while_keeping_up(self):
+        controller = AdaptiveWindowController(target_rtf=0.5)
+        self.assertEqual(controller.min_chunk_duration(1.0), 1.0)
+        controller.update(0.4, 2.0)
+        self.assertEqual(controller.pressure, 1.0)
+        self.assertEqual(controller.min_chunk_duration(1.0), 1.0)
+        self.assertEqual(controller.min_new_audio(1.0), 0.0)
+        self.assertEqual(controller.max_window, 25.0)
+
+    def test_overload_means_fewer_shorter_passes(self):
+        controller = AdaptiveWindowController(target_rtf=0.5, smoothing=1.0)
+        controller.update(2.0, 2.0)
+        self.assertEqual(controller.pressure, 2.0)
+        self.assertEqual(controller.min_chunk_duration(1.0), 2.0)
+        self.assertEqual(controller.min_new_audio(1.0), 1.0)
+        self.assertEqual(controller.max_window, 12.5)
+
+        controller.update(100.0, 1.0)
+        self.assertEqual(controller.min_chunk_duration(1.0), 5.0)
+        self.assertEqual(controller.max_window, 8.0)
+
+    def test_recovers_as_rtf_drops(self):
+        controller = AdaptiveWindowController(target_rtf=0.5, smoothing=0.5)
+        controller.update(3.0, 2.0)
+        for _ in range(10):
+            controller.update(0.1, 2.0)
+        self.assertEqual(controller.pressure, 1.0)
+
+
+class TestAdaptivePacing(unittest.TestCase):
+    def setUp(self):
+        self.client = ServeClientBase("uid", mock.MagicMock())
+        self.client.window_controller = AdaptiveWindowController(target_rtf=0.5, smoothing=1.0)
+
+    def test_window_capped_under_load(self):
+        self.client.add_frames(np.zeros(20 * self.client.RATE, dtype=np.float32))
+        _, duration = self.client.get_audio_chunk_for_processing()
+        self.assertEqual(duration, 20.0)
+
+        self.client.record_pass(4.0, 4.0)
+        _, duration = self.client.get_audio_chunk_for_processing()
+        self.assertEqual(duration, 12.5)
+        self.assertTrue(self.client.window_capped)
+        # the same capped window is not decoded again while it has not moved
+        with self.client.lock:
+            self.assertFalse(self.client.is_ready_for_pass())
+        # once the window moved forward, the audio beyond the cap is pending and the next pass runs right away
+        self.client.timestamp_offset += 5.0
+        with self.client.lock:
+            self.assertTrue(self.client.is_ready_for_pass())
+
+    def test_capped_window_commits_its_last_segment(self):
+        self.client.add_frames(np.zeros(20 * self.client.RATE, dtype=np.float32))
+        self.client.record_pass(4.0, 4.0)
+        _, duration = self.client.get_audio_chunk_for_processing()
+        segment = mock.MagicMock(text="a long sentence", start=0.0, end=12.0, no_speech_prob=0.1)
+        self.client.update_segments([segment], duration)
+        self.assertEqual(self.client.text, ["a long sentence"])
+        self.assertEqual(self.client.timestamp_offset, 12.0)
+
+    def test_capped_window_without_speech_is_skipped(self):
+        self.client.add_frames(np.zeros(20 * self.client.RATE, dtype=np.float32))
+        self.client.record_pass(4.0, 4.0)
+        _, duration = self.client.get_audio_chunk_for_processing()
+        segment = mock.MagicMock(text="", start=0.0, end=12.5, no_speech_prob=0.9)
+        self.client.update_segments([segment], duration)
+        self.assertEqual(self.client.text, [])
+        self.assertEqual(self.client.timestamp_offset, 12.5)
+
+    def test_waits_for_more_audio_under_load(self):
+        self.client.record_pass(3.0, 2.0)
+        self.assertEqual(self.client.get_min_chunk_duration(), 3.0)
+        self.client.add_frames(np.zeros(4 * self.client.RATE, dtype=np.float32))
+        self.client.get_audio_chunk_for_processing()
+        self.client.add_frames(np.zeros(self.client.RATE, dtype=np.float32))
+        with self.client.lock:
+            self.assertFalse(self.client.is_ready_for_pass())
+        self.client.add_frames(np.zeros(self.client.RATE, dtype=np.float32))
+        with self.client.lock:
+            self.assertTrue(self.client.is_ready_for_pass())
+
+
+if __name__ == "__main__":
+    unittest.main()
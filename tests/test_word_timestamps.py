@@ -0,0 +1,148 @@
+import copy
+import random
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from whisper_live.backend.base import ServeClientBase
+from whisper_live.transcriber.transcriber_faster_whisper import WhisperModel, merge_punctuations
+
+PREPENDED = "\"'“¿([{-"
+APPENDED = "\"'.。,，!！?？:：”)]}、"
+
+
+def reference_merge_punctuations(alignment, prepended, appended):
+    # the sequential implementation merge_punctuations must agree with
+    i = len(alignment) - 2
+    j = len(alignment) - 1
+    while i >= 0:
+        previous = alignment[i]
+        following = alignment[j]
+        if previous["word"].startswith(" ") and previous["word"].strip() in prepended:
+            following["word"] = previous["word"] + following["word"]
+            following["tokens"] = previous["tokens"] + following["tokens"]
+            previous["word"] = ""
+            previous["tokens"] = []
+        else:
+            j = i
+        i -= 1
+
+    i = 0
+    j = 1
+    while j < len(alignment):
+        previous = alignment[i]
+        following = alignment[j]
+        if not previous["word"].endswith(" ") and following["word"] in appended:
+            previous["word"] = previous["word"] + following["word"]
+            previous["tokens"] = previous["tokens"] + following["tokens"]
+            following["word"] = ""
+            following["tokens"] = []
+        else:
+            i = j
+        j += 1
+
+
+class TestMergePunctuations(unittest.TestCase):
+    def test_matches_sequential_merge(self):
+        rng = random.Random(0)
+        vocabulary = [" hello", " world", "world", " (", " \"", "\"", ".", ",", "?", " -", "", "it's", " '"]
+        for _ in range(500):
+            alignment = [
+                {"word": rng.choice(vocabulary), "tokens": [k]} for k in range(rng.randint(0, 12))
+            ]
+            expected = copy.deepcopy(alignment)
+            reference_merge_punctuations(expected, PREPENDED, APPENDED)
+            merge_punctuations(alignment, PREPENDED, APPENDED)
+            self.assertEqual(alignment, expected)
+
+    def test_example(self):
+        alignment = [
+            {"word": w, "tokens": [k]} for k, w in enumerate([" \"", " Hello", ",", " world", ".", "\""])
+        ]
+        merge_punctuations(alignment, PREPENDED, APPENDED)
+        self.assertEqual([w["word"] for w in alignment], ["", " \" Hello,", "", " world.\"", "", ""])
+        self.assertEqual(alignment[3]["tokens"], [3, 4, 5])
+
+
+class TestFindAlignment(unittest.TestCase):
+    def setUp(self):
+        self.model = WhisperModel.__new__(WhisperModel)
+        self.model.model = mock.MagicMock()
+        self.model.tokens_per_second = 50
+        self.tokenizer = mock.MagicMock(eot=99, sot_sequence=[1])
+        # tokens 10, 11 form one word, 12 and 13 one word each
+        self.tokenizer.split_to_word_tokens.return_value = (
+            [" Hello", " you", ".", ""], [[10, 11], [12], [13], [99]]
+        )
+
+    def test_word_times_and_probabilities(self):
+        self.model.model.align.return_value = [
+            SimpleNamespace(
+                text_token_probs=[0.5, 0.7, 0.9, 0.4],
+                # token index per frame: 0 0 1 2 2 3 4
+                alignments=[(0, 0), (0, 1), (1, 3), (2, 5), (2, 6), (3, 10), (4, 12)],
+            )
+        ]
+        [words] = self.model.find_alignment(self.tokenizer, [[10, 11, 12, 13]], None, 100)
+        self.assertEqual([w["word"] for w in words], [" Hello", " you", "."])
+        self.assertEqual([w["start"] for w in words], [0.0, 0.1, 0.2])
+        self.assertEqual([w["end"] for w in words], [0.1, 0.2, 0.24])
+        np.testing.assert_allclose([w["probability"] for w in words], [0.6, 0.9, 0.4])
+        self.assertTrue(all(type(w["start"]) is float for w in words))
+
+
+class TestSentenceBoundaryClamping(unittest.TestCase):
+    def test_long_words_at_sentence_end_are_truncated(self):
+        model = WhisperModel.__new__(WhisperModel)
+        model.frames_per_second = 100
+        alignment = [
+            {"word": " a", "tokens": [1], "start": 0.0, "end": 0.2, "probability": 1.0},
+            {"word": " b", "tokens": [2], "start": 0.2, "end": 0.4, "probability": 1.0},
+            {"word": ".", "tokens": [3], "start": 0.4, "end": 2.0, "probability": 1.0},
+            {"word": " c", "tokens": [4], "start": 2.0, "end": 4.0, "probability": 1.0},
+        ]
+        model.find_alignment = mock.MagicMock(return_value=[alignment])
+        segments = [[{"seek": 0, "start": 0.0, "end": 4.0, "tokens": [1, 2, 3, 4]}]]
+        tokenizer = mock.MagicMock(eot=99)
+        model.add_word_timestamps(segments, tokenizer, None, 400, "", "", 0.0)
+        # the median duration is capped at 0.7 s, so words at or after a sentence end are cut to 1.4 s
+        self.assertAlmostEqual(alignment[2]["end"], 1.8)
+        self.assertAlmostEqual(alignment[3]["start"], 2.6)
+        self.assertEqual(alignment[1]["end"], 0.4)
+        self.assertEqual([w["word"] for w in segments[0][0]["words"]], [" a", " b", ".", " c"])
+
+
+class TestStreamingWordTimestamps(unittest.TestCase):
+    def make_segment(self, text, start, end, words):
+        words = [SimpleNamespace(start=s, end=e, word=w, probability=0.9) for s, e, w in words]
+        return SimpleNamespace(text=text, start=start, end=end, no_speech_prob=0.0, words=words, temperature=0.0)
+
+    def test_segments_carry_stream_word_times(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        client.word_timestamps = True
+        client.timestamp_offset = 10.0
+        segments = [
+            self.make_segment(" Hello world.", 0.0, 1.0, [(0.0, 0.4, " Hello"), (0.5, 1.0, " world.")]),
+            self.make_segment(" And", 1.2, 2.0, [(1.2, 2.5, " And")]),
+        ]
+        last = client.update_segments(segments, 2.0)
+        self.assertEqual(
+            client.transcript[0]["words"],
+            [
+                {"start": "10.000", "end": "10.400", "word": " Hello", "probability": 0.9},
+                {"start": "10.500", "end": "11.000", "word": " world.", "probability": 0.9},
+            ],
+        )
+        # word end times are clipped to the transcribed audio like segment end times
+        self.assertEqual(last["words"], [{"start": "11.200", "end": "12.000", "word": " And", "probability": 0.9}])
+
+    def test_no_words_by_default(self):
+        client = ServeClientBase("uid", mock.MagicMock())
+        last = client.update_segments([self.make_segment(" Hi", 0.0, 1.0, [(0.0, 1.0, " Hi")])], 1.0)
+        self.assertNotIn("words", last)
+
+
+if __name__ == "__main__":
+    unittest.main()
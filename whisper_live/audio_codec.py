@@ -0,0 +1,102 @@
+import numpy as np
+import av
+
+
+AUDIO_ENCODINGS = ("float32", "int16", "opus")
+"""Audio encodings a client can negotiate with the `audio_encoding` option."""
+
+INT16_SCALE = np.float32(1 / 32768)
+
+
+def validate_encoding(encoding):
+    if encoding not in AUDIO_ENCODINGS:
+        raise ValueError(f"Unsupported audio encoding '{encoding}', expected one of {list(AUDIO_ENCODINGS)}")
+
+
+class AudioDecoder:
+    """
+    Turns the audio messages of one connection into float32 samples at 16 kHz.
+
+    - "float32": raw little-endian float32 samples, as sent by clients that do not negotiate an encoding.
+    - "int16": raw little-endian 16-bit PCM, half the bytes of float32 and the format microphones deliver.
+    - "opus": one Opus packet per message. The decoder keeps state across packets, so every connection needs
+      its own `AudioDecoder`.
+    """
+
+    def __init__(self, encoding="float32", rate=16000):
+        """
+        Args:
+            encoding (str, optional): One of `AUDIO_ENCODINGS`. Defaults to "float32".
+            rate (int, optional): Sample rate of the decoded audio. Defaults to 16000.
+        """
+        validate_encoding(encoding)
+        self.encoding = encoding
+        self.rate = rate
+        self.codec = None
+        self.resampler = None
+        if encoding == "opus":
+            self.codec = av.CodecContext.create("opus", "r")
+            self.resampler = av.AudioResampler(format="flt", layout="mono", rate=rate)
+
+    def decode(self, data):
+        """
+        Args:
+            data (bytes): An audio message received from the client.
+
+        Returns:
+            np.ndarray: The decoded float32 samples, possibly empty while the Opus decoder fills its delay.
+        """
+        if self.encoding == "float32":
+            return np.frombuffer(data, dtype=np.float32)
+        if self.encoding == "int16":
+            return np.multiply(np.frombuffer(data, dtype="<i2"), INT16_SCALE, dtype=np.float32)
+        samples = [
+            resampled.to_ndarray().reshape(-1)
+            for frame in self.codec.decode(av.Packet(data))
+            for resampled in self.resampler.resample(frame)
+        ]
+        if not samples:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(samples) if len(samples) > 1 else samples[0]
+
+
+class AudioEncoder:
+    """
+    Client side counterpart of `AudioDecoder`, encodes 16-bit PCM microphone or file audio for the server.
+    """
+
+    def __init__(self, encoding="float32", rate=16000, opus_bitrate=24000):
+        """
+        Args:
+            encoding (str, optional): One of `AUDIO_ENCODINGS`. Defaults to "float32".
+            rate (int, optional): Sample rate of the audio. Defaults to 16000.
+            opus_bitrate (int, optional): Bitrate of the Opus encoder in bits per second. Defaults to 24000.
+        """
+        validate_encoding(encoding)
+        self.encoding = encoding
+        self.rate = rate
+        self.codec = None
+        if encoding == "opus":
+            self.codec = av.CodecContext.create("libopus", "w")
+            self.codec.sample_rate = rate
+            self.codec.layout = "mono"
+            self.codec.format = "s16"
+            self.codec.bit_rate = opus_bitrate
+
+    def encode(self, pcm16):
+        """
+        Args:
+            pcm16 (bytes): Mono 16-bit PCM audio.
+
+        Returns:
+            list: The messages to send, each a bytes object. Opus returns one message per packet completed by
+                this audio, which may be none.
+        """
+        if self.encoding == "int16":
+            return [pcm16]
+        samples = np.frombuffer(pcm16, dtype=np.int16)
+        if self.encoding == "float32":
+            return [np.multiply(samples, INT16_SCALE, dtype=np.float32).tobytes()]
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = self.rate
+        return [bytes(packet) for packet in self.codec.encode(frame)]
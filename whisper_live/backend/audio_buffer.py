@@ -0,0 +1,135 @@
+from collections import deque
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity buffer of mono audio samples addressed by absolute sample index.
+
+    Every sample is written twice, at `i % capacity` and at `i % capacity + capacity`, so any window of
+    up to `capacity` samples is available as one contiguous view without copying. Appending costs
+    O(frame size) no matter how full the buffer is; once the buffer is full the oldest samples are
+    overwritten.
+    """
+
+    def __init__(self, capacity, dtype=np.float32):
+        """
+        Args:
+            capacity (int): Maximum number of samples retained.
+            dtype (np.dtype, optional): Sample type. Defaults to float32.
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = int(capacity)
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self.start_sample = 0
+        """Absolute index of the oldest retained sample."""
+        self.end_sample = 0
+        """Absolute index one past the newest sample."""
+
+    def __len__(self):
+        return self.end_sample - self.start_sample
+
+    def append(self, frames):
+        """
+        Appends samples to the end of the buffer, dropping the oldest samples if it overflows.
+
+        Args:
+            frames (np.ndarray): One dimensional array of samples.
+        """
+        frames = np.asarray(frames, dtype=self._data.dtype).reshape(-1)
+        num_samples = frames.shape[0]
+        if num_samples == 0:
+            return
+        if num_samples > self.capacity:
+            self.end_sample += num_samples - self.capacity
+            frames = frames[-self.capacity:]
+            num_samples = self.capacity
+
+        pos = self.end_sample % self.capacity
+        head = min(num_samples, self.capacity - pos)
+        self._data[pos:pos + head] = frames[:head]
+        self._data[pos + self.capacity:pos + self.capacity + head] = frames[:head]
+        tail = num_samples - head
+        if tail:
+            self._data[:tail] = frames[head:]
+            self._data[self.capacity:self.capacity + tail] = frames[head:]
+
+        self.end_sample += num_samples
+        self.start_sample = max(self.start_sample, self.end_sample - self.capacity)
+
+    def view(self, start_sample=None, end_sample=None):
+        """
+        Returns a read-only contiguous view of the samples in `[start_sample, end_sample)`.
+
+        Bounds are clamped to the retained range. The view aliases the buffer, so it stays valid only
+        until the writer wraps around onto it, i.e. until `capacity - (end_sample - start_sample)` more
+        samples have been appended. Copy it if it must outlive that.
+
+        Args:
+            start_sample (int, optional): Absolute index of the first sample. Defaults to the oldest sample.
+            end_sample (int, optional): Absolute index one past the last sample. Defaults to the newest sample.
+
+        Returns:
+            np.ndarray: The requested samples.
+        """
+        start = self.start_sample if start_sample is None else max(int(start_sample), self.start_sample)
+        end = self.end_sample if end_sample is None else min(int(end_sample), self.end_sample)
+        if end <= start:
+            return self._data[:0]
+        pos = start % self.capacity
+        window = self._data[pos:pos + end - start]
+        window.flags.writeable = False
+        return window
+
+
+class SpeechTimeline:
+    """
+    Speech regions of an audio stream, as sorted and merged `[start, end)` ranges of absolute sample indices.
+
+    Regions are appended in stream order as audio arrives, so adding and pruning are O(1) and queries only
+    look at the few most recent regions.
+    """
+
+    def __init__(self):
+        self.regions = deque()
+
+    def add_speech(self, start_sample, end_sample):
+        """
+        Marks `[start_sample, end_sample)` as speech, merging it with the last region if they touch.
+
+        Args:
+            start_sample (int): Absolute index of the first speech sample.
+            end_sample (int): Absolute index one past the last speech sample.
+        """
+        if self.regions and self.regions[-1][1] >= start_sample:
+            self.regions[-1][1] = max(self.regions[-1][1], end_sample)
+        else:
+            self.regions.append([start_sample, end_sample])
+
+    def has_speech(self, start_sample, end_sample=None):
+        """
+        Returns whether any speech overlaps `[start_sample, end_sample)`.
+
+        Args:
+            start_sample (int): Absolute index of the first sample to check.
+            end_sample (int, optional): Absolute index one past the last sample to check. Defaults to the end of
+                the stream.
+
+        Returns:
+            bool: True if a speech region overlaps the range.
+        """
+        for region_start, region_end in reversed(self.regions):
+            if region_end <= start_sample:
+                return False
+            if end_sample is None or region_start < end_sample:
+                return True
+        return False
+
+    def discard_before(self, sample):
+        """
+        Drops regions that end at or before `sample`, e.g. audio no longer held in the buffer.
+        """
+        while self.regions and self.regions[0][1] <= sample:
+            self.regions.popleft()
@@ -1,13 +1,20 @@
+import contextlib
 import json
 import logging
 import threading
 import time
 import queue
-import numpy as np
+
+from whisper_live import metrics, tracing
+from whisper_live.backend.audio_buffer import AudioRingBuffer, SpeechTimeline
 
 
 class ServeClientBase(object):
+    BACKEND = "base"
     RATE = 16000
+    MIN_CHUNK_DURATION = 1.0
+    MAX_BUFFER_SECONDS = 45
+    VAD_PAD_SECONDS = 0.2
     SERVER_READY = "SERVER_READY"
     DISCONNECT = "DISCONNECT"
 
@@ -23,6 +30,26 @@ class ServeClientBase(object):
     """Whether to clip audio with no valid segments."""
     same_output_threshold: int
     """Number of repeated outputs before considering it as a valid segment."""
+    vad_gate: object
+    """Callable that returns whether an incoming audio frame contains speech, or None to transcribe all audio."""
+    min_new_audio: float
+    """Seconds of new audio that must arrive before another transcription pass over unchanged audio is run."""
+    on_wakeup: object
+    """Optional callable invoked, possibly from another thread, whenever the transcription loop should wake up."""
+    delta_segments: bool
+    """Whether messages carry only the segments completed since the previous message, see `prepare_segments`."""
+    word_timestamps: bool
+    """Whether segments sent to the client carry the start and end time of each of their words."""
+    local_agreement: object
+    """`LocalAgreement` commit policy of the connection, or None to commit segments with `update_segments`."""
+    window_controller: object
+    """`AdaptiveWindowController` pacing the passes of the connection by their real-time factor, or None."""
+    model_scheduler: object
+    """`FairScheduler` deciding when the connection runs on a model shared with others, or None to use its lock."""
+    priority: str
+    """Priority tier of the connection with the `model_scheduler`."""
+    model_pool: object
+    """`ModelPool` of replicas the connection runs its passes on, or None to use its own `transcriber`."""
 
     def __init__(
         self,
@@ -33,6 +60,8 @@ class ServeClientBase(object):
         clip_audio=False,
         same_output_threshold=10,
         translation_queue=None,
+        vad_gate=None,
+        min_new_audio=0.0,
     ):
         self.client_uid = client_uid
         self.websocket = websocket
@@ -43,8 +72,8 @@ class ServeClientBase(object):
 
         self.frames = b""
         self.timestamp_offset = 0.0
-        self.frames_np = None
-        self.frames_offset = 0.0
+        self.audio_buffer = AudioRingBuffer(self.MAX_BUFFER_SECONDS * self.RATE)
+        self.chunk_start_sample = 0
         self.text = []
         self.current_out = ""
         self.prev_out = ""
@@ -53,9 +82,44 @@ class ServeClientBase(object):
         self.transcript = []
         self.end_time_for_same_output = None
         self.translation_queue = translation_queue
+        self.vad_gate = vad_gate
+        self.speech_timeline = SpeechTimeline()
+        self.min_new_audio = min_new_audio
+        self.processed_end_sample = 0
+        self.received_end_sample = 0
+        self.window_capped = False
+        self.chunk_offset = 0.0
+        self.wakeup_pending = False
+        self.on_wakeup = None
+        self.delta_segments = False
+        self.sent_segments = 0
+        self.word_timestamps = False
+        self.local_agreement = None
+        self.window_controller = None
+        self.model_scheduler = None
+        self.priority = "normal"
+        self.model_pool = None
+
+        # cpu time accounting
+        self.loop_start_time = None
+        self.loop_cpu_time = 0.0
+        self.inference_cpu_time = 0.0
 
         # threading
         self.lock = threading.Lock()
+        self.audio_available = threading.Condition(self.lock)
+
+    @property
+    def frames_np(self):
+        """Contiguous view of the buffered audio, or None if no audio has been received yet."""
+        if not len(self.audio_buffer):
+            return None
+        return self.audio_buffer.view()
+
+    @property
+    def frames_offset(self):
+        """Stream time in seconds of the oldest sample still held in the audio buffer."""
+        return self.audio_buffer.start_sample / self.RATE
 
     def speech_to_text(self):
         """
@@ -77,29 +141,192 @@ class ServeClientBase(object):
                 logging.info("Exiting speech to text thread")
                 break
 
-            if self.frames_np is None:
-                continue
+            wait_time = self.run_transcription_step()
+            with tracing.span("wait_for_audio", session=self.client_uid):
+                self.wait_for_audio(wait_time)
 
-            if self.clip_audio:
-                self.clip_audio_if_no_valid_segment()
+    def run_transcription_step(self):
+        """
+        Runs `transcription_step` and accounts the CPU time it used on the calling thread.
 
+        Returns:
+            float or None: The value returned by `transcription_step`.
+        """
+        if self.loop_start_time is None:
+            self.loop_start_time = time.monotonic()
+        cpu_start = time.thread_time()
+        try:
+            return self.transcription_step()
+        finally:
+            self.loop_cpu_time += time.thread_time() - cpu_start
+
+    def transcription_step(self):
+        """
+        Runs a single pass of the transcription loop on the audio buffered so far.
+
+        The threaded `speech_to_text` loop calls this repeatedly; the asyncio server schedules it on a
+        bounded executor instead, so both modes share the same buffering and inference logic. Between passes
+        the caller waits for new audio with `wait_for_audio`, using the returned value as timeout.
+
+        Returns:
+            float or None: Maximum number of seconds to wait for new audio before running the next pass anyway,
+                or None to wait until new audio arrives.
+        """
+        if self.frames_np is None:
+            return None
+
+        if self.clip_audio:
+            self.clip_audio_if_no_valid_segment()
+
+        with tracing.span("get_audio_chunk", session=self.client_uid):
             input_bytes, duration = self.get_audio_chunk_for_processing()
-            if duration < 1.0:
-                time.sleep(0.1)     # wait for audio chunks to arrive
-                continue
+        if duration < self.get_min_chunk_duration():
+            return None     # wait for audio chunks to arrive
+        if not self.has_pending_speech(duration):
+            # same outcome as a transcription without voice activity, without running the model, but keep the
+            # end of the window so speech starting right after it is transcribed with its onset
+            self.timestamp_offset += max(0.0, duration - self.VAD_PAD_SECONDS)
+            return None
+        with tracing.span("transcription_pass", session=self.client_uid, window=round(duration, 3)):
             try:
-                input_sample = input_bytes.copy()
-                result = self.transcribe_audio(input_sample)
+                cpu_start = time.thread_time()
+                pass_start = time.perf_counter()
+                with tracing.span("transcribe_audio"):
+                    result = self.transcribe_audio(input_bytes)
+                self.inference_cpu_time += time.thread_time() - cpu_start
+                self.record_pass(time.perf_counter() - pass_start, duration)
 
                 if result is None or self.language is None:
                     self.timestamp_offset += duration
-                    time.sleep(0.25)    # wait for voice activity, result is None when no voice activity
-                    continue
-                self.handle_transcription_output(result, duration)
+                    return None    # wait for voice activity, result is None when no voice activity
+                with tracing.span("handle_transcription_output"):
+                    self.handle_transcription_output(result, duration)
 
             except Exception as e:
+                metrics.TRANSCRIBE_ERRORS.inc(backend=self.BACKEND)
                 logging.error(f"[ERROR]: Failed to transcribe audio chunk: {e}")
-                time.sleep(0.01)
+                return 0.1
+        # an incomplete segment is only finalized after repeating, so keep transcribing even if no audio arrives
+        return 0.1 if self.current_out else None
+
+    def record_pass(self, pass_time, duration):
+        """
+        Records the duration of a transcription pass in the metrics and the `window_controller`.
+
+        Args:
+            pass_time (float): Wall time the pass took in seconds.
+            duration (float): Duration of the transcribed audio in seconds.
+        """
+        metrics.TRANSCRIBE_SECONDS.observe(pass_time, backend=self.BACKEND)
+        metrics.TRANSCRIBED_AUDIO_SECONDS.inc(duration, backend=self.BACKEND)
+        metrics.REAL_TIME_FACTOR.observe(pass_time / duration, backend=self.BACKEND)
+        if self.window_controller is not None:
+            self.window_controller.update(pass_time, duration)
+
+    def get_model_scheduler(self):
+        """
+        Returns:
+            FairScheduler: The scheduler of the model instance the connection shares with other connections, or
+                None if it has a model of its own. Backends with shared models override this.
+        """
+        return None
+
+    @contextlib.contextmanager
+    def model_turn(self, lock, duration, pool=None):
+        """
+        Context manager to hold while running a pass, yielding the model instance to run it on.
+
+        Args:
+            lock (threading.Lock): Lock of the shared model, or None if the model is not shared.
+            duration (float): Seconds of audio the pass transcribes, what the `model_scheduler` charges the
+                connection for its turn.
+            pool (ModelPool, optional): Replicas of the model, the pass runs on the least loaded one instead of
+                `transcriber` and `lock` is not needed. Defaults to None.
+        """
+        if self.model_scheduler is not None:
+            turn = self.model_scheduler.turn(self.client_uid, duration, self.priority)
+        elif lock is not None and pool is None:
+            turn = lock
+        else:
+            turn = contextlib.nullcontext()
+        with turn:
+            if pool is None:
+                yield getattr(self, "transcriber", None)
+            else:
+                with pool.replica() as replica:
+                    yield replica
+
+    def get_min_chunk_duration(self):
+        """
+        Returns:
+            float: Seconds of audio that must be pending before a transcription pass runs, `MIN_CHUNK_DURATION`
+                unless the `window_controller` raised it.
+        """
+        if self.window_controller is not None:
+            return self.window_controller.min_chunk_duration(self.MIN_CHUNK_DURATION)
+        return self.MIN_CHUNK_DURATION
+
+    def is_ready_for_pass(self):
+        """
+        Whether another transcription pass should run. Must be called with `lock` held.
+
+        Returns:
+            bool: True if the client is exiting, a wakeup was requested, or at least `min_new_audio` seconds of
+                audio arrived since the last pass. The `window_controller` may ask for more while overloaded.
+                Audio left beyond a capped window only counts once the window moved forward, otherwise the next
+                pass would decode the same window again.
+        """
+        min_new_audio = self.min_new_audio
+        if self.window_controller is not None:
+            min_new_audio = max(min_new_audio, self.window_controller.min_new_audio(self.MIN_CHUNK_DURATION))
+        if self.window_capped and self.timestamp_offset == self.chunk_offset:
+            new_samples = self.audio_buffer.end_sample - self.received_end_sample
+        else:
+            new_samples = self.audio_buffer.end_sample - self.processed_end_sample
+        return self.exit or self.wakeup_pending or new_samples >= max(1, int(min_new_audio * self.RATE))
+
+    def wait_for_audio(self, timeout=None):
+        """
+        Blocks until another transcription pass should run, see `is_ready_for_pass`.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting indefinitely.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self.audio_available:
+            ready = self.audio_available.wait_for(self.is_ready_for_pass, timeout)
+            self.wakeup_pending = False
+            return ready
+
+    def wake(self):
+        """
+        Wakes the transcription loop up, even if no new audio arrived.
+        """
+        with self.audio_available:
+            self.wakeup_pending = True
+            self.audio_available.notify_all()
+        if self.on_wakeup is not None:
+            self.on_wakeup()
+
+    def get_cpu_stats(self):
+        """
+        CPU time used by the transcription loop of this connection.
+
+        Returns:
+            dict: Wall time since the first pass, CPU time of the loop, the part of it spent in inference, and the
+                remaining idle CPU time, also as a percentage of wall time.
+        """
+        wall_time = time.monotonic() - self.loop_start_time if self.loop_start_time is not None else 0.0
+        idle_cpu_time = max(0.0, self.loop_cpu_time - self.inference_cpu_time)
+        return {
+            "wall_time": wall_time,
+            "loop_cpu_time": self.loop_cpu_time,
+            "inference_cpu_time": self.inference_cpu_time,
+            "idle_cpu_time": idle_cpu_time,
+            "idle_cpu_percent": 100 * idle_cpu_time / wall_time if wall_time > 0 else 0.0,
+        }
 
     def transcribe_audio(self):
         raise NotImplementedError
@@ -107,7 +334,7 @@ class ServeClientBase(object):
     def handle_transcription_output(self, result, duration):
         raise NotImplementedError
     
-    def format_segment(self, start, end, text, completed=False):
+    def format_segment(self, start, end, text, completed=False, words=None):
         """
         Formats a transcription segment with precise start and end times alongside the transcribed text.
 
@@ -115,49 +342,97 @@ class ServeClientBase(object):
             start (float): The start time of the transcription segment in seconds.
             end (float): The end time of the transcription segment in seconds.
             text (str): The transcribed text corresponding to the segment.
+            words (list, optional): The words of the segment as `(start, end, text, probability)` tuples, added
+                to the segment if given. Defaults to None.
 
         Returns:
             dict: A dictionary representing the formatted transcription segment, including
                 'start' and 'end' times as strings with three decimal places and the 'text'
                 of the transcription.
         """
-        return {
+        segment = {
             'start': "{:.3f}".format(start),
             'end': "{:.3f}".format(end),
             'text': text,
             'completed': completed
         }
+        if words is not None:
+            segment['words'] = [
+                {
+                    'start': "{:.3f}".format(word_start),
+                    'end': "{:.3f}".format(word_end),
+                    'word': word,
+                    'probability': round(float(probability), 3),
+                }
+                for word_start, word_end, word, probability in words
+            ]
+        return segment
 
     def add_frames(self, frame_np):
         """
         Add audio frames to the ongoing audio stream buffer.
 
         This method is responsible for maintaining the audio stream buffer, allowing the continuous addition
-        of audio frames as they are received. It also ensures that the buffer does not exceed a specified size
-        to prevent excessive memory usage.
+        of audio frames as they are received. The buffer is a fixed-capacity ring buffer holding the most
+        recent `MAX_BUFFER_SECONDS` of audio, so appending a frame costs the same however full the buffer is.
+        Once it is full the oldest audio is overwritten and `frames_offset` advances accordingly.
 
-        If the buffer size exceeds a threshold (45 seconds of audio data), it discards the oldest 30 seconds
-        of audio data to maintain a reasonable buffer size. If the buffer is empty, it initializes it with the provided
-        audio frame. The audio stream buffer is used for real-time processing of audio data for transcription.
+        If a `vad_gate` is set, the frame is classified as it arrives and speech frames are recorded in
+        `speech_timeline`, so the transcription loop can skip windows without speech.
+
+        The transcription loop is only woken up once a pass would run, i.e. `is_ready_for_pass` holds and at
+        least the minimum chunk duration of audio is pending.
 
         Args:
             frame_np (numpy.ndarray): The audio frame data as a NumPy array.
 
         """
-        self.lock.acquire()
-        if self.frames_np is not None and self.frames_np.shape[0] > 45*self.RATE:
-            self.frames_offset += 30.0
-            self.frames_np = self.frames_np[int(30*self.RATE):]
+        start = time.perf_counter()
+        is_speech = self.vad_gate(frame_np) if self.vad_gate is not None else False
+        with self.audio_available:
+            frame_start = self.audio_buffer.end_sample
+            self.audio_buffer.append(frame_np)
+            if is_speech:
+                self.speech_timeline.add_speech(frame_start, self.audio_buffer.end_sample)
+            self.speech_timeline.discard_before(self.audio_buffer.start_sample)
             # check timestamp offset(should be >= self.frame_offset)
             # this basically means that there is no speech as timestamp offset hasnt updated
             # and is less than frame_offset
             if self.timestamp_offset < self.frames_offset:
                 self.timestamp_offset = self.frames_offset
-        if self.frames_np is None:
-            self.frames_np = frame_np.copy()
-        else:
-            self.frames_np = np.concatenate((self.frames_np, frame_np), axis=0)
-        self.lock.release()
+            pending = self.audio_buffer.end_sample / self.RATE - self.timestamp_offset
+            wake = self.is_ready_for_pass() and pending >= self.get_min_chunk_duration()
+            if wake:
+                self.audio_available.notify_all()
+        if wake and self.on_wakeup is not None:
+            self.on_wakeup()
+        metrics.AUDIO_RECEIVED_SECONDS.inc(len(frame_np) / self.RATE)
+        metrics.ADD_FRAMES_SECONDS.observe(time.perf_counter() - start)
+
+    def get_lag(self):
+        """
+        Returns:
+            float: Seconds of received audio that have not been transcribed yet.
+        """
+        with self.lock:
+            return max(0.0, self.audio_buffer.end_sample / self.RATE - self.timestamp_offset)
+
+    def has_pending_speech(self, duration):
+        """
+        Checks whether the chunk returned by the last `get_audio_chunk_for_processing` call contains speech.
+
+        Args:
+            duration (float): Duration of that chunk in seconds.
+
+        Returns:
+            bool: False only if a `vad_gate` is set and it found no speech in the chunk.
+        """
+        if self.vad_gate is None:
+            return True
+        with self.lock:
+            return self.speech_timeline.has_speech(
+                self.chunk_start_sample, self.chunk_start_sample + int(duration * self.RATE)
+            )
 
     def clip_audio_if_no_valid_segment(self):
         """
@@ -166,9 +441,9 @@ class ServeClientBase(object):
         no valid segment for the last 30 seconds from whisper
         """
         with self.lock:
-            if self.frames_np[int((self.timestamp_offset - self.frames_offset)*self.RATE):].shape[0] > 25 * self.RATE:
-                duration = self.frames_np.shape[0] / self.RATE
-                self.timestamp_offset = self.frames_offset + duration - 5
+            end_time = self.audio_buffer.end_sample / self.RATE
+            if end_time - self.timestamp_offset > 25:
+                self.timestamp_offset = end_time - 5
 
     def get_audio_chunk_for_processing(self):
         """
@@ -179,6 +454,11 @@ class ServeClientBase(object):
         the audio sample rate (RATE). It then returns this chunk of audio data along with its
         duration in seconds.
 
+        The chunk is copied out of the audio buffer while `lock` is held, since a window as long as the buffer
+        would otherwise be overwritten by the next `add_frames` during the pass. The stream position of its first
+        sample is stored in `chunk_start_sample`. With a `window_controller`, the chunk is cut at its `max_window`,
+        and the rest of the pending audio is left for the next passes; `window_capped` tells whether it was cut.
+
         Returns:
             tuple: A tuple containing:
                 - input_bytes (np.ndarray): The next chunk of audio data to be processed.
@@ -186,7 +466,16 @@ class ServeClientBase(object):
         """
         with self.lock:
             samples_take = max(0, (self.timestamp_offset - self.frames_offset) * self.RATE)
-            input_bytes = self.frames_np[int(samples_take):].copy()
+            self.chunk_start_sample = self.audio_buffer.start_sample + int(samples_take)
+            self.chunk_offset = self.timestamp_offset
+            self.received_end_sample = self.processed_end_sample = self.audio_buffer.end_sample
+            if self.window_controller is not None:
+                self.processed_end_sample = min(
+                    self.processed_end_sample,
+                    self.chunk_start_sample + int(self.window_controller.max_window * self.RATE),
+                )
+            self.window_capped = self.processed_end_sample < self.received_end_sample
+            input_bytes = self.audio_buffer.view(self.chunk_start_sample, self.processed_end_sample).copy()
         duration = input_bytes.shape[0] / self.RATE
         return input_bytes, duration
 
@@ -199,6 +488,11 @@ class ServeClientBase(object):
         recent segment of text if provided (which is considered incomplete because of the possibility
         of the last word being truncated in the audio chunk).
 
+        With `delta_segments` only the segments completed since the last successful
+        `send_transcription_to_client` are included instead, each with an `id` giving its position in the
+        transcript, so clients rebuild the transcript without the same segments being encoded and sent on every
+        pass. Segments of a failed send are included again on the next call.
+
         Args:
             last_segment (str, optional): The most recent segment of transcribed text to be added
                                           to the list of segments. Defaults to None.
@@ -207,7 +501,12 @@ class ServeClientBase(object):
             list: A list of transcribed text segments to be sent to the client.
         """
         segments = []
-        if len(self.transcript) >= self.send_last_n_segments:
+        if self.delta_segments:
+            segments = [
+                dict(segment, id=index)
+                for index, segment in enumerate(self.transcript[self.sent_segments:], self.sent_segments)
+            ]
+        elif len(self.transcript) >= self.send_last_n_segments:
             segments = self.transcript[-self.send_last_n_segments:].copy()
         else:
             segments = self.transcript.copy()
@@ -233,19 +532,25 @@ class ServeClientBase(object):
 
         This method formats the transcription segments into a JSON object and attempts to send
         this object to the client. If an error occurs during the send operation, it logs the error.
+        Segments with an `id` count as sent for `delta_segments` only once the send succeeded.
 
         Returns:
             segments (list): A list of transcription segments to be sent to the client.
         """
         try:
-            self.websocket.send(
-                json.dumps({
-                    "uid": self.client_uid,
-                    "segments": segments,
-                })
-            )
+            with tracing.span("send_transcription", segments=len(segments)):
+                self.websocket.send(
+                    json.dumps({
+                        "uid": self.client_uid,
+                        "segments": segments,
+                    })
+                )
         except Exception as e:
             logging.error(f"[ERROR]: Sending data to client: {e}")
+            return
+        sent = [segment["id"] for segment in segments if "id" in segment]
+        if sent:
+            self.sent_segments = max(self.sent_segments, sent[-1] + 1)
 
     def disconnect(self):
         """
@@ -271,7 +576,33 @@ class ServeClientBase(object):
         """
         logging.info("Cleaning up.")
         self.exit = True
+        self.wake()
+        stats = self.get_cpu_stats()
+        logging.info(
+            f"Client {self.client_uid} transcription loop used {stats['loop_cpu_time']:.2f}s CPU over "
+            f"{stats['wall_time']:.1f}s, {stats['idle_cpu_time']:.3f}s ({stats['idle_cpu_percent']:.2f}%) outside inference"
+        )
     
+    def segment_committed(self, segment):
+        """
+        Called for every segment whose text is committed to the transcript. Backends override this to carry
+        state, such as prompt tokens, over to later windows.
+
+        Args:
+            segment: The committed segment, as returned by the transcriber.
+        """
+        pass
+
+    def text_committed(self, text, segment):
+        """
+        Called for text committed by the `local_agreement` policy, which may end inside a segment.
+
+        Args:
+            text (str): The committed text.
+            segment: The segment the last committed word belongs to.
+        """
+        pass
+
     def get_segment_no_speech_prob(self, segment):
         return getattr(segment, "no_speech_prob", 0)
 
@@ -281,6 +612,25 @@ class ServeClientBase(object):
     def get_segment_end(self, segment):
         return getattr(segment, "end", getattr(segment, "end_ts", 0))
 
+    def get_segment_words(self, segment):
+        return getattr(segment, "words", None) or []
+
+    def get_stream_words(self, segment, duration):
+        """
+        Words of a segment with their times in seconds of the audio stream. Must be called with `lock` held.
+
+        Args:
+            segment: A segment returned by the transcriber.
+            duration (float): Duration of the current audio chunk, word end times are clipped to it.
+
+        Returns:
+            list: `(start, end, text, probability)` tuples.
+        """
+        return [
+            (self.timestamp_offset + w.start, self.timestamp_offset + min(duration, w.end), w.word, w.probability)
+            for w in self.get_segment_words(segment)
+        ]
+
     def update_segments(self, segments, duration):
         """
         Processes the segments from Whisper and updates the transcript.
@@ -290,6 +640,31 @@ class ServeClientBase(object):
             segments (list): List of segments returned by the transcriber.
             duration (float): Duration of the current audio chunk.
         
+        Returns:
+            dict or None: The last processed segment (if any).
+        """
+        start = time.perf_counter()
+        num_segments = len(self.transcript)
+        try:
+            with tracing.span("update_segments"):
+                if self.local_agreement is not None:
+                    return self.update_segments_local_agreement(segments, duration)
+                return self.update_segments_same_output(segments, duration)
+        finally:
+            metrics.UPDATE_SEGMENTS_SECONDS.observe(time.perf_counter() - start)
+            metrics.SEGMENTS_COMMITTED.inc(len(self.transcript) - num_segments)
+
+    def update_segments_same_output(self, segments, duration):
+        """
+        Default commit policy of `update_segments`. All segments but the last are committed, the last one is
+        committed once it was repeated `same_output_threshold` times. A window cut at the cap of the
+        `window_controller` does not grow and would only repeat its output, so if nothing else was committed
+        its last segment is committed right away, or skipped if it has no speech.
+
+        Args:
+            segments (list): List of segments returned by the transcriber.
+            duration (float): Duration of the current audio chunk.
+
         Returns:
             dict or None: The last processed segment (if any).
         """
@@ -303,14 +678,16 @@ class ServeClientBase(object):
             for s in segments[:-1]:
                 text_ = s.text
                 self.text.append(text_)
+                self.segment_committed(s)
                 with self.lock:
                     start = self.timestamp_offset + self.get_segment_start(s)
                     end = self.timestamp_offset + min(duration, self.get_segment_end(s))
+                    words = self.get_stream_words(s, duration) if self.word_timestamps else None
                 if start >= end:
                     continue
                 if self.get_segment_no_speech_prob(s) > self.no_speech_thresh:
                     continue
-                completed_segment = self.format_segment(start, end, text_, completed=True)
+                completed_segment = self.format_segment(start, end, text_, completed=True, words=words)
                 self.transcript.append(completed_segment)
 
                 if self.translation_queue:
@@ -328,7 +705,8 @@ class ServeClientBase(object):
                     self.timestamp_offset + self.get_segment_start(segments[-1]),
                     self.timestamp_offset + min(duration, self.get_segment_end(segments[-1])),
                     self.current_out,
-                    completed=False
+                    completed=False,
+                    words=self.get_stream_words(segments[-1], duration) if self.word_timestamps else None,
                 )
 
                 if self.translation_queue and self.current_out.strip():
@@ -345,22 +723,28 @@ class ServeClientBase(object):
             # audio thats not yet transcribed so, capturing the time when it was repeated for the first time
             if self.end_time_for_same_output is None:
                 self.end_time_for_same_output = self.get_segment_end(segments[-1])
-            time.sleep(0.1)  # wait briefly for any new voice activity
         else:
             self.same_output_count = 0
             self.end_time_for_same_output = None
 
-        # If the same incomplete segment is repeated too many times,
+        # If the same incomplete segment is repeated too many times, or the window is capped and would not move,
         # append it to the transcript and update the offset.
-        if self.same_output_count > self.same_output_threshold:
-            if not self.text or self.text[-1].strip().lower() != self.current_out.strip().lower():
+        window_stuck = self.window_capped and offset is None
+        if self.same_output_count > self.same_output_threshold or window_stuck:
+            if self.end_time_for_same_output is None:
+                self.end_time_for_same_output = self.get_segment_end(segments[-1])
+            if self.current_out.strip() and (
+                not self.text or self.text[-1].strip().lower() != self.current_out.strip().lower()
+            ):
                 self.text.append(self.current_out)
+                self.segment_committed(segments[-1])
                 with self.lock:
                     completed_segment = self.format_segment(
                         self.timestamp_offset,
                         self.timestamp_offset + min(duration, self.end_time_for_same_output),
                         self.current_out,
-                        completed=True
+                        completed=True,
+                        words=self.get_stream_words(segments[-1], duration) if self.word_timestamps else None,
                     )
                     self.transcript.append(completed_segment)
 
@@ -372,6 +756,8 @@ class ServeClientBase(object):
 
             self.current_out = ''
             offset = min(duration, self.end_time_for_same_output)
+            if offset <= 0:
+                offset = duration
             self.same_output_count = 0
             last_segment = None
             self.end_time_for_same_output = None
@@ -383,3 +769,63 @@ class ServeClientBase(object):
                 self.timestamp_offset += offset
 
         return last_segment
+
+    def update_segments_local_agreement(self, segments, duration):
+        """
+        Processes the segments from Whisper with the `local_agreement` commit policy.
+
+        The words of the segments form a hypothesis of the current window. Words on which the last hypotheses
+        agree are committed as one completed segment and the window is moved forward to the end of the last
+        committed word, the remaining words are sent as the incomplete segment. Segments need word timestamps.
+
+        Args:
+            segments (list): List of segments returned by the transcriber.
+            duration (float): Duration of the current audio chunk.
+
+        Returns:
+            dict or None: The incomplete segment (if any).
+        """
+        words = []
+        word_segments = []
+        with self.lock:
+            window_start = self.timestamp_offset
+            for s in segments:
+                if self.get_segment_no_speech_prob(s) > self.no_speech_thresh:
+                    continue
+                segment_words = self.get_stream_words(s, duration)
+                words.extend(segment_words)
+                word_segments.extend([s] * len(segment_words))
+        committed, pending = self.local_agreement.insert(words, window_start)
+
+        if committed:
+            text_ = "".join(w[2] for w in committed)
+            self.text.append(text_)
+            self.text_committed(text_, word_segments[len(committed) - 1])
+            completed_segment = self.format_segment(
+                committed[0][0], committed[-1][1], text_, completed=True,
+                words=committed if self.word_timestamps else None,
+            )
+            self.transcript.append(completed_segment)
+
+            if self.translation_queue:
+                try:
+                    self.translation_queue.put(completed_segment.copy(), timeout=0.1)
+                except queue.Full:
+                    logging.warning("Translation queue is full, skipping segment")
+            with self.lock:
+                self.timestamp_offset += committed[-1][1] - window_start
+
+        self.current_out = "".join(w[2] for w in pending)
+        self.prev_out = self.current_out
+        last_segment = None
+        if pending:
+            last_segment = self.format_segment(
+                pending[0][0], pending[-1][1], self.current_out, completed=False,
+                words=pending if self.word_timestamps else None,
+            )
+            if self.translation_queue and self.current_out.strip():
+                try:
+                    self.translation_queue.put(last_segment.copy(), timeout=0.1)
+                except queue.Full:
+                    logging.debug("Translation queue is full, skipping partial segment")
+        return last_segment
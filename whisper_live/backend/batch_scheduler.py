@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from whisper_live import metrics
+
+
+class BatchInferenceScheduler:
+    """
+    Collects transcription requests from many clients and runs them through a shared model in batches.
+
+    Clients call `transcribe` from their own transcription threads and block until their result is ready.
+    A single worker thread takes the first pending request, waits up to `max_batch_wait_ms` for more to
+    arrive (or until `max_batch_size` requests are pending), and hands the whole batch to
+    `model.transcribe_batch`, so concurrent clients share one encoder pass and one decoder pass instead of
+    taking turns on the model. Requests the batch cannot serve, e.g. windows that need a temperature fallback,
+    are handed back and transcribed on the thread of the client that sent them, so a slow window does not hold up
+    the rest of its batch. The decoding state passed with a request is only used by the worker while the client
+    waits for the result, and by the client itself otherwise.
+    """
+
+    def __init__(self, model, max_batch_size=8, max_batch_wait_ms=20):
+        """
+        Args:
+            model (WhisperModel): Model exposing `transcribe_batch`.
+            max_batch_size (int, optional): Maximum number of requests per batch. Defaults to 8.
+            max_batch_wait_ms (float, optional): How long the first request of a batch waits for others to
+                join it. Defaults to 20.
+        """
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_wait = max(0.0, max_batch_wait_ms) / 1000
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True, name="batch-inference")
+        self.worker.start()
+
+    def transcribe(self, audio, **kwargs):
+        """
+        Queues a transcription request and waits for its result.
+
+        Args:
+            audio (np.ndarray): The audio to transcribe.
+            **kwargs: Keyword arguments for `WhisperModel.transcribe`.
+
+        Returns:
+            tuple: The `(segments, info)` result of the transcription.
+        """
+        future = Future()
+        request = dict(kwargs, audio=audio)
+        self.requests.put((request, future))
+        result = future.result()
+        if result is None:
+            # the batch could not serve this request, transcribe it alone on this thread
+            return self.model.transcribe(**request)
+        return result
+
+    def next_batch(self):
+        """
+        Blocks until a request is pending, then collects up to `max_batch_size` requests that arrive within
+        `max_batch_wait` seconds of it.
+
+        Returns:
+            list: `(request, future)` tuples, empty if the scheduler was closed.
+        """
+        batch = [self.requests.get()]
+        if batch[0] is None:
+            return []
+        deadline = time.monotonic() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def run(self):
+        """
+        Worker loop, runs batches until `close` is called.
+        """
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                break
+            metrics.BATCH_SIZE.observe(len(batch))
+            metrics.BATCH_QUEUE_DEPTH.set(self.requests.qsize())
+            requests, futures = zip(*batch)
+            try:
+                results = self.model.transcribe_batch(list(requests), run_unbatched=False)
+            except Exception as e:
+                logging.error(f"[ERROR]: Batched transcription of {len(batch)} requests failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def close(self):
+        """
+        Stops the worker thread once the requests already queued have been served.
+        """
+        self.requests.put(None)
@@ -0,0 +1,131 @@
+import collections
+import contextlib
+import threading
+import time
+
+from whisper_live import metrics, tracing
+
+
+class FairScheduler:
+    """
+    Decides which session runs next on a model instance shared by many sessions, in place of a lock.
+
+    With a plain lock, whichever transcription thread grabs it next wins, so a session decoding 25 s windows can
+    hold the model for most of the time while sessions needing a 1 s update queue behind it. The scheduler runs
+    deficit round robin over the waiting sessions instead: every round, each waiting session earns credit in
+    seconds of audio, in proportion to the weight of its priority tier, and a session runs once its credit covers
+    the audio of its window. Sessions with short windows therefore run every round, and a long window runs once its
+    session has saved up for it, so each session gets a share of the model proportional to its weight, measured in
+    audio. A session running alone never waits for credit, the rounds are computed, not slept.
+
+    With more than one slot, e.g. in front of a `ModelPool`, up to `slots` sessions run at once and the next free
+    slot goes to the next session in the same order.
+    """
+    PRIORITY_WEIGHTS = {"low": 1.0, "normal": 2.0, "high": 4.0}
+    DEFAULT_PRIORITY = "normal"
+
+    def __init__(self, quantum=1.0, slots=1):
+        """
+        Args:
+            quantum (float, optional): Seconds of audio a `normal` session earns per round, other tiers earn in
+                proportion to their weight. Defaults to 1, so a session with 1 s windows runs every round.
+            slots (int, optional): Number of sessions that run on the model at once. Defaults to 1.
+        """
+        self.quantum = quantum / self.PRIORITY_WEIGHTS[self.DEFAULT_PRIORITY]
+        self.slots = max(1, int(slots))
+        self.condition = threading.Condition()
+        self.active = collections.deque()
+        """Sessions with pending requests, in round robin order."""
+        self.pending = {}
+        self.deficits = {}
+        self.head_credited = False
+        self.running = 0
+
+    def acquire(self, session, cost, priority=DEFAULT_PRIORITY):
+        """
+        Blocks until it is the turn of `session` to run on the model.
+
+        Args:
+            session: Identifier of the session, e.g. its client uid.
+            cost (float): Seconds of audio the session is about to transcribe.
+            priority (str, optional): Tier of the session, a key of `PRIORITY_WEIGHTS`. Defaults to "normal".
+
+        Returns:
+            float: Seconds waited for the turn.
+        """
+        if priority not in self.PRIORITY_WEIGHTS:
+            priority = self.DEFAULT_PRIORITY
+        # session, cost, weight and whether the request was granted
+        request = [session, max(0.0, cost), self.PRIORITY_WEIGHTS[priority], False]
+        start = time.perf_counter()
+        with self.condition:
+            if session not in self.pending:
+                self.pending[session] = collections.deque()
+                self.active.append(session)
+            self.pending[session].append(request)
+            self.grant_next()
+            while not request[3]:
+                self.condition.wait()
+        waited = time.perf_counter() - start
+        metrics.SCHEDULER_WAIT_SECONDS.observe(waited, priority=priority)
+        return waited
+
+    def release(self):
+        """
+        Ends the turn of a running session and hands its slot to the next one.
+        """
+        with self.condition:
+            self.running -= 1
+            self.grant_next()
+
+    def grant_next(self):
+        """Grants free slots to the next requests by deficit round robin, called with the condition held."""
+        while self.running < self.slots and self.active:
+            session = self.active[0]
+            requests = self.pending[session]
+            request = requests[0]
+            _, cost, weight, _ = request
+            if not self.head_credited:
+                # the session at the head starts its turn
+                self.deficits[session] = self.deficits.get(session, 0.0) + self.quantum * weight
+                self.head_credited = True
+            if self.deficits[session] >= cost:
+                self.deficits[session] -= cost
+                requests.popleft()
+                if not requests:
+                    # an idle session does not keep its credit, as in deficit round robin
+                    self.active.popleft()
+                    del self.pending[session]
+                    del self.deficits[session]
+                    self.head_credited = False
+                request[3] = True
+                self.running += 1
+                self.condition.notify_all()
+                continue
+            self.active.rotate(-1)
+            self.head_credited = False
+
+    def waiting(self):
+        """
+        Returns:
+            int: Number of requests waiting for their turn.
+        """
+        with self.condition:
+            return sum(len(requests) for requests in self.pending.values())
+
+    @contextlib.contextmanager
+    def turn(self, session, cost, priority=DEFAULT_PRIORITY):
+        """
+        Runs the body of the `with` statement on the model, as `with scheduler.turn(uid, 1.5):`.
+
+        Args:
+            session: Identifier of the session.
+            cost (float): Seconds of audio the session is about to transcribe.
+            priority (str, optional): Tier of the session. Defaults to "normal".
+        """
+        with tracing.span("wait_for_model", priority=priority):
+            self.acquire(session, cost, priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -1,19 +1,40 @@
-import os
 import json
 import logging
 import threading
 import time
-import torch
-import ctranslate2
-from huggingface_hub import snapshot_download
 
-from whisper_live.transcriber.transcriber_faster_whisper import WhisperModel
+from whisper_live.transcriber.encoder_cache import EncoderOutputCache
+from whisper_live.transcriber.mel_cache import MelSpectrogramCache
+from whisper_live.transcriber.transcriber_faster_whisper import DecodingContext
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.local_agreement import LocalAgreement
+from whisper_live.backend.batch_scheduler import BatchInferenceScheduler
+from whisper_live.backend.fair_scheduler import FairScheduler
+from whisper_live.backend.model_registry import ModelRegistry
 
 
 class ServeClientFasterWhisper(ServeClientBase):
+    BACKEND = "faster_whisper"
     SINGLE_MODEL = None
     SINGLE_MODEL_LOCK = threading.Lock()
+    SINGLE_MODEL_SCHEDULER = FairScheduler()
+    BATCH_SCHEDULER = None
+    DECODING_PROFILES = {
+        "default": {},
+        # streaming windows are decoded again a moment later, so a hard window gets at most one
+        # fallback and only once it contains a completed segment
+        "live": {"max_fallbacks": 1, "fallback_completed_only": True},
+    }
+    # a fixed cap keeps the prompt length of sessions with a long history equal, so their
+    # windows can still share a batch
+    PROMPT_HISTORY_TOKENS = 128
+    # windows that grew by less than 100 ms since the last encoded one reuse its encoder output
+    ENCODER_CACHE_MAX_NEW_FRAMES = 10
+    COMMIT_POLICIES = ("default", "local_agreement")
+    # number of consecutive hypotheses that must agree on a word under the local_agreement policy
+    LOCAL_AGREEMENT_N = 2
+    # a detected language is kept for the session only above this probability
+    LANGUAGE_PROBABILITY_THRESHOLD = 0.5
 
     def __init__(
         self,
@@ -33,6 +54,17 @@ class ServeClientFasterWhisper(ServeClientBase):
         same_output_threshold=7,
         cache_path="~/.cache/whisper-live/",
         translation_queue=None,
+        start_thread=True,
+        batch_inference=False,
+        max_batch_size=8,
+        max_batch_wait_ms=20,
+        vad_gate=None,
+        min_new_audio=0.0,
+        model_registry=None,
+        decoding_profile=None,
+        commit_policy=None,
+        word_timestamps=False,
+        language_detection_seconds=2.0,
     ):
         """
         Initialize a ServeClient instance.
@@ -53,6 +85,32 @@ class ServeClientFasterWhisper(ServeClientBase):
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            start_thread (bool, optional): Whether to run the transcription loop in a dedicated thread. The asyncio
+                server disables this and drives `transcription_step` from its executor instead. Defaults to True.
+            batch_inference (bool, optional): Only with `single_model`. Route transcription through a scheduler that
+                batches pending windows of all clients into shared model calls. Defaults to False.
+            max_batch_size (int, optional): Maximum number of windows per batch. Defaults to 8.
+            max_batch_wait_ms (float, optional): Maximum time a window waits for others to join its batch. Defaults to 20.
+            vad_gate (callable, optional): Classifies incoming frames as speech or not, so windows without speech
+                are skipped without running the model. Defaults to None.
+            min_new_audio (float, optional): Seconds of new audio to wait for between transcription passes. Defaults to 0,
+                i.e. a pass runs as soon as any new audio arrives.
+            model_registry (ModelRegistry, optional): Registry models are loaded through, which may have preloaded
+                them at server startup. If it has more than one replica or worker per model, connections share
+                a `ModelPool` of the model instead of loading their own. Defaults to a new registry.
+            decoding_profile (str or dict, optional): Name of an entry of `DECODING_PROFILES`, or a dict with the
+                same keys (`max_fallbacks`, `fallback_completed_only`) bounding the temperature fallback of each
+                window. Defaults to "default", which allows the full fallback of `WhisperModel.transcribe`.
+            commit_policy (str, optional): How text is committed to the transcript. "default" commits all but the
+                last segment of a window, or the last one once it repeated `same_output_threshold` times.
+                "local_agreement" decodes word timestamps and commits the words consecutive windows agree on,
+                moving the window forward at word boundaries, which keeps decoded windows short. Defaults to "default".
+            word_timestamps (bool, optional): Whether to decode word timestamps and send the start and end time of
+                every word along with the segments. Defaults to False.
+            language_detection_seconds (float, optional): If no language is given to a multilingual model, seconds
+                of audio to wait for before the first pass, which detects the language on that window and decodes
+                it with the same encoder output. Windows detected with a low probability are not decoded, and
+                the first confident detection is kept for the rest of the session. Defaults to 2.
 
         """
         super().__init__(
@@ -62,43 +120,61 @@ class ServeClientFasterWhisper(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
-            translation_queue
+            translation_queue,
+            vad_gate=vad_gate,
+            min_new_audio=min_new_audio,
         )
         self.cache_path = cache_path
-        self.model_sizes = [
-            "tiny", "tiny.en", "base", "base.en", "small", "small.en",
-            "medium", "medium.en", "large-v2", "large-v3", "distil-small.en",
-            "distil-medium.en", "distil-large-v2", "distil-large-v3",
-            "large-v3-turbo", "turbo"
-        ]
+        self.model_registry = model_registry or ModelRegistry(cache_path=cache_path)
+        self.model_sizes = ModelRegistry.MODEL_SIZES
 
         self.model_size_or_path = model
         self.language = "en" if self.model_size_or_path.endswith("en") else language
+        self.language_detection_seconds = language_detection_seconds
         self.task = task
         self.initial_prompt = initial_prompt
         self.vad_parameters = vad_parameters or {"onset": 0.5}
+        self.decoding_options = self.get_decoding_options(decoding_profile)
+        self.num_windows = 0
+        self.num_fallbacks = 0
+        self.word_timestamps = word_timestamps
+        if commit_policy == "local_agreement":
+            self.local_agreement = LocalAgreement(self.LOCAL_AGREEMENT_N)
+        elif commit_policy not in (None, "default"):
+            logging.warning(f"Unknown commit policy '{commit_policy}', using the default policy")
 
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        if device == "cuda":
-            major, _ = torch.cuda.get_device_capability(device)
-            self.compute_type = "float16" if major >= 7 else "float32"
-        else:
-            self.compute_type = "int8"
+        device = self.model_registry.device
+        self.compute_type = self.model_registry.compute_type
 
         if self.model_size_or_path is None:
             return
         logging.info(f"Using Device={device} with precision {self.compute_type}")
         logging.info("Initializing model (0%)")
     
+        self.model_lock = None
         try:
             if single_model:
                 if ServeClientFasterWhisper.SINGLE_MODEL is None:
-                    self.create_model(device)
+                    self.transcriber = self.model_registry.get(self.model_size_or_path)
                     ServeClientFasterWhisper.SINGLE_MODEL = self.transcriber
                 else:
                     self.transcriber = ServeClientFasterWhisper.SINGLE_MODEL
+                self.model_lock = ServeClientFasterWhisper.SINGLE_MODEL_LOCK
+                if batch_inference and ServeClientFasterWhisper.BATCH_SCHEDULER is None:
+                    ServeClientFasterWhisper.BATCH_SCHEDULER = BatchInferenceScheduler(
+                        self.transcriber,
+                        max_batch_size=max_batch_size,
+                        max_batch_wait_ms=max_batch_wait_ms,
+                    )
+            elif self.model_registry.pooled:
+                self.transcriber = self.model_registry.get(self.model_size_or_path)
+                self.model_lock = self.model_registry.inference_lock(self.model_size_or_path)
             else:
                 self.create_model(device)
+            if self.model_lock is not None and self.model_registry.pooled:
+                # the caches and the decoding context only need the tokenizer and feature extractor, which are
+                # the same for every replica
+                self.model_pool = self.model_registry.pool(self.model_size_or_path)
         except Exception as e:
             logging.error(f"Failed to load model: {e}")
             self.websocket.send(json.dumps({
@@ -110,10 +186,14 @@ class ServeClientFasterWhisper(ServeClientBase):
             return
 
         self.use_vad = use_vad
+        self.mel_cache = MelSpectrogramCache(self.transcriber.feature_extractor)
+        self.decoding_context = DecodingContext(self.transcriber, max_history_tokens=self.PROMPT_HISTORY_TOKENS)
+        self.encoder_cache = EncoderOutputCache(max_new_frames=self.ENCODER_CACHE_MAX_NEW_FRAMES)
 
         # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        if start_thread:
+            self.trans_thread = threading.Thread(target=self.speech_to_text)
+            self.trans_thread.start()
         self.websocket.send(
             json.dumps(
                 {
@@ -127,55 +207,54 @@ class ServeClientFasterWhisper(ServeClientBase):
     def create_model(self, device):
         """
         Instantiates a new model, sets it as the transcriber. If model is a huggingface model_id
-        then it is automatically converted to ctranslate2(faster_whisper) format.
+        then it is automatically converted to ctranslate2(faster_whisper) format. Models preloaded by the
+        model registry are not downloaded or converted again, and the first client takes the warmed up
+        instance left by the preload.
         """
-        model_ref = self.model_size_or_path
-
-        if model_ref in self.model_sizes:
-            model_to_load = model_ref
-            logging.info("Downloading model files (25%)")
-        else:
-            logging.info(f"Model not in model_sizes")
-            if os.path.isdir(model_ref) and ctranslate2.contains_model(model_ref):
-                model_to_load = model_ref
-                logging.info("Model files ready (25%)")
-            else:
-                logging.info("Downloading model files (25%)")
-                local_snapshot = snapshot_download(
-                    repo_id = model_ref,
-                    repo_type = "model",
-                )
-                if ctranslate2.contains_model(local_snapshot):
-                    model_to_load = local_snapshot
-                    logging.info("Model files ready (25%)")
-                else:
-                    cache_root = os.path.expanduser(os.path.join(self.cache_path, "whisper-ct2-models/"))
-                    os.makedirs(cache_root, exist_ok=True)
-                    safe_name = model_ref.replace("/", "--")
-                    ct2_dir = os.path.join(cache_root, safe_name)
-
-                    if not ctranslate2.contains_model(ct2_dir):
-                        logging.info("Converting to CTranslate2 (50%)")
-                        ct2_converter = ctranslate2.converters.TransformersConverter(
-                            local_snapshot,
-                            copy_files=["tokenizer.json", "preprocessor_config.json"]
-                        )
-                        ct2_converter.convert(
-                            output_dir=ct2_dir,
-                            quantization=self.compute_type,
-                            force=False,  # skip if already up-to-date
-                        )
-                        logging.info("Conversion complete (50%)")
-                    model_to_load = ct2_dir
-
-        logging.info("Loading into memory (75%)")
-        self.transcriber = WhisperModel(
-            model_to_load,
-            device=device,
-            compute_type=self.compute_type,
-            local_files_only=False,
+        self.transcriber = (
+            self.model_registry.take(self.model_size_or_path)
+            or self.model_registry.create(self.model_size_or_path)
         )
-        logging.info("Model ready (100%)")
+
+    def get_model_scheduler(self):
+        if self.model_pool is not None:
+            return self.model_pool.scheduler
+        if getattr(self, "model_lock", None) is None:
+            return None
+        if self.transcriber is ServeClientFasterWhisper.SINGLE_MODEL:
+            return ServeClientFasterWhisper.SINGLE_MODEL_SCHEDULER
+        return self.model_registry.inference_scheduler(self.model_size_or_path)
+
+    def get_decoding_options(self, decoding_profile):
+        """
+        Resolves a decoding profile to keyword arguments for `WhisperModel.transcribe`.
+
+        Args:
+            decoding_profile (str or dict or None): Profile name, explicit options, or None for the default profile.
+
+        Returns:
+            dict: The decoding options.
+        """
+        if decoding_profile is None:
+            return dict(self.DECODING_PROFILES["default"])
+        if isinstance(decoding_profile, dict):
+            unknown = set(decoding_profile) - {"max_fallbacks", "fallback_completed_only"}
+            if unknown:
+                logging.warning(f"Ignoring unknown decoding options {sorted(unknown)}")
+            return {k: v for k, v in decoding_profile.items() if k not in unknown}
+        if decoding_profile not in self.DECODING_PROFILES:
+            logging.warning(f"Unknown decoding profile '{decoding_profile}', using the default profile")
+            return dict(self.DECODING_PROFILES["default"])
+        return dict(self.DECODING_PROFILES[decoding_profile])
+
+    def get_decoding_stats(self):
+        """
+        Number of windows decoded for this connection and how many temperature fallbacks they needed.
+
+        Returns:
+            dict: `windows` and `fallbacks` counts.
+        """
+        return {"windows": self.num_windows, "fallbacks": self.num_fallbacks}
 
     def set_language(self, info):
         """
@@ -187,7 +266,7 @@ class ServeClientFasterWhisper(ServeClientBase):
                         language, and `language_probability`, a float representing the confidence level
                         of the language detection.
         """
-        if info.language_probability > 0.5:
+        if info.language_probability > self.LANGUAGE_PROBABILITY_THRESHOLD:
             self.language = info.language
             logging.info(f"Detected language {self.language} with probability {info.language_probability}")
             self.websocket.send(json.dumps(
@@ -198,7 +277,9 @@ class ServeClientFasterWhisper(ServeClientBase):
         Transcribes the provided audio sample using the configured transcriber instance.
 
         If the language has not been set, it updates the session's language based on the transcription
-        information.
+        information. Log-mel frames and encoder outputs are reused from earlier passes over the same
+        audio through `mel_cache` and `encoder_cache`. When a batch scheduler is active the request is batched together with those of other
+        clients instead of waiting for exclusive access to the shared model.
 
         Args:
             input_sample (np.array): The audio chunk to be transcribed. This should be a NumPy
@@ -209,22 +290,76 @@ class ServeClientFasterWhisper(ServeClientBase):
             depends on the implementation of the `transcriber.transcribe` method but typically
             includes the transcribed text.
         """
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.acquire()
-        result, info = self.transcriber.transcribe(
-            input_sample,
+        transcribe_kwargs = dict(
             initial_prompt=self.initial_prompt,
             language=self.language,
             task=self.task,
             vad_filter=self.use_vad,
-            vad_parameters=self.vad_parameters if self.use_vad else None)
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.release()
+            vad_parameters=self.vad_parameters if self.use_vad else None,
+            mel_cache=self.mel_cache,
+            stream_offset=self.chunk_start_sample,
+            decoding_context=self.decoding_context,
+            encoder_cache=self.encoder_cache,
+            word_timestamps=self.word_timestamps or self.local_agreement is not None,
+            **self.decoding_options)
+        if self.language is None:
+            transcribe_kwargs["min_language_probability"] = self.LANGUAGE_PROBABILITY_THRESHOLD
+        if ServeClientFasterWhisper.BATCH_SCHEDULER is not None and self.transcriber is ServeClientFasterWhisper.SINGLE_MODEL:
+            result, info = ServeClientFasterWhisper.BATCH_SCHEDULER.transcribe(input_sample, **transcribe_kwargs)
+        elif self.model_lock is not None:
+            with self.model_turn(self.model_lock, input_sample.shape[0] / self.RATE, self.model_pool) as transcriber:
+                result, info = transcriber.transcribe(input_sample, **transcribe_kwargs)
+        else:
+            result, info = self.transcriber.transcribe(input_sample, **transcribe_kwargs)
 
+        if info is not None:
+            self.num_windows += 1
+            self.num_fallbacks += info.num_fallbacks
         if self.language is None and info is not None:
             self.set_language(info)
         return result
 
+    def get_min_chunk_duration(self):
+        """
+        Until the language of a multilingual session is known, waits for `language_detection_seconds` of audio, so
+        detection runs on a window long enough to be confident.
+
+        Returns:
+            float: Seconds of audio that must be pending before a transcription pass runs.
+        """
+        min_duration = super().get_min_chunk_duration()
+        if self.language is None:
+            return max(min_duration, self.language_detection_seconds)
+        return min_duration
+
+    def segment_committed(self, segment):
+        """
+        Carries the tokens of a committed segment over to the prompt of later windows. Segments decoded at a
+        high fallback temperature are likely wrong, so they reset the history instead, like
+        `prompt_reset_on_temperature` does within a single transcription.
+
+        Args:
+            segment (Segment): The committed segment.
+        """
+        if segment.temperature is not None and segment.temperature > 0.5:
+            self.decoding_context.reset_history()
+        else:
+            self.decoding_context.commit(segment.tokens)
+
+    def text_committed(self, text, segment):
+        """
+        Carries text committed by the `local_agreement` policy over to the prompt of later windows, see
+        `segment_committed`.
+
+        Args:
+            text (str): The committed text.
+            segment (Segment): The segment the last committed word belongs to.
+        """
+        if segment.temperature is not None and segment.temperature > 0.5:
+            self.decoding_context.reset_history()
+        else:
+            self.decoding_context.commit_text(text)
+
     def handle_transcription_output(self, result, duration):
         """
         Handle the transcription output, updating the transcript and sending data to the client.
@@ -241,3 +376,14 @@ class ServeClientFasterWhisper(ServeClientBase):
 
         if len(segments):
             self.send_transcription_to_client(segments)
+
+    def cleanup(self):
+        super().cleanup()
+        stats = self.get_decoding_stats()
+        logging.info(f"Client {self.client_uid} decoded {stats['windows']} windows with {stats['fallbacks']} fallbacks")
+        if getattr(self, "encoder_cache", None) is not None:
+            stats = self.encoder_cache.get_stats()
+            logging.info(
+                f"Client {self.client_uid} encoder cache: {stats['hits']} hits, {stats['near_hits']} near hits, "
+                f"{stats['misses']} misses ({100 * stats['hit_rate']:.1f}% hit rate)"
+            )
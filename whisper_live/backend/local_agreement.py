@@ -0,0 +1,62 @@
+import string
+from collections import deque
+
+
+class LocalAgreement:
+    """
+    LocalAgreement-n commit policy for streaming transcription.
+
+    Every pass transcribes the audio from the last committed word up to the newest sample, producing a
+    hypothesis of timestamped words. A word is committed once the last `n` hypotheses agree on it, i.e. it is
+    part of the longest common word prefix of all of them. The caller then starts the next window at the end of
+    the last committed word, so the decoded window only spans audio whose transcript is still uncertain.
+
+    Words are tuples starting with `(start, end, text)`, with times in seconds of the audio stream; further items,
+    such as the word probability, are carried along.
+    """
+
+    def __init__(self, n=2):
+        """
+        Args:
+            n (int, optional): Number of consecutive hypotheses that have to agree on a word. Defaults to 2.
+        """
+        if n < 2:
+            raise ValueError("LocalAgreement needs at least 2 hypotheses to compare")
+        self.n = n
+        self.hypotheses = deque(maxlen=n - 1)
+        """Uncommitted words of the previous `n - 1` hypotheses, oldest first."""
+
+    @staticmethod
+    def normalize(text):
+        return text.strip().strip(string.punctuation).lower()
+
+    def insert(self, words, window_start):
+        """
+        Adds the hypothesis of a new pass and commits the words all recent hypotheses agree on.
+
+        Args:
+            words (list): Words of the new hypothesis, in order.
+            window_start (float): Stream time the transcribed window started at. Words of earlier hypotheses
+                that end before it were skipped by the caller and are dropped.
+
+        Returns:
+            tuple: `(committed, pending)`, the newly committed words and the uncommitted rest of the hypothesis.
+        """
+        previous = [[w for w in hypothesis if w[1] > window_start] for hypothesis in self.hypotheses]
+        agreed = 0
+        if len(previous) == self.n - 1:
+            for i, word in enumerate(words):
+                text = self.normalize(word[2])
+                if not all(i < len(hypothesis) and self.normalize(hypothesis[i][2]) == text for hypothesis in previous):
+                    break
+                agreed = i + 1
+        committed, pending = words[:agreed], words[agreed:]
+        self.hypotheses.clear()
+        # the deque drops the oldest hypothesis once it is full
+        for hypothesis in previous:
+            self.hypotheses.append(hypothesis[agreed:])
+        self.hypotheses.append(pending)
+        return committed, pending
+
+    def reset(self):
+        self.hypotheses.clear()
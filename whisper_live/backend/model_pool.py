@@ -0,0 +1,101 @@
+import contextlib
+import logging
+import os
+import threading
+
+from whisper_live import metrics
+from whisper_live.backend.fair_scheduler import FairScheduler
+
+
+class ModelPool:
+    """
+    Replicas of one model shared by all connections asking for it, between one model for everyone, which runs one
+    inference at a time, and one model per connection, whose memory grows with every client.
+
+    Every inference runs on the least loaded replica. A replica runs up to `workers` inferences at once, for models
+    that run concurrent calls in parallel themselves, like CTranslate2 models loaded with `num_workers`; when every
+    replica is full, the inference waits for a free one. Replicas cost memory, workers only the buffers of the
+    inferences in flight, so operators trade memory for parallelism with the two numbers.
+    """
+    MEMORY_FRACTION = 0.5
+    """Share of the available memory `auto_size` fills with replicas, the rest is left for inference buffers."""
+
+    def __init__(self, replicas, workers=1, name="model"):
+        """
+        Args:
+            replicas (list): Loaded instances of the model.
+            workers (int, optional): Concurrent inferences per replica. Defaults to 1.
+            name (str, optional): Name of the model in logs and metrics. Defaults to "model".
+        """
+        if not replicas:
+            raise ValueError("A model pool needs at least one replica")
+        self.replicas = list(replicas)
+        self.workers = max(1, int(workers))
+        self.name = name
+        self.loads = [0] * len(self.replicas)
+        self.condition = threading.Condition()
+        self.scheduler = FairScheduler(slots=self.capacity)
+        """Scheduler taking turns between connections on the pool when the server schedules them fairly."""
+
+    @property
+    def capacity(self):
+        """Number of inferences the pool runs at once."""
+        return len(self.replicas) * self.workers
+
+    def acquire(self):
+        """
+        Blocks until a replica has a free worker and reserves it on the least loaded one.
+
+        Returns:
+            int: Index of the replica, to pass to `release`.
+        """
+        with self.condition:
+            while min(self.loads) >= self.workers:
+                self.condition.wait()
+            index = self.loads.index(min(self.loads))
+            self.loads[index] += 1
+            metrics.MODEL_POOL_BUSY.set(sum(self.loads), model=self.name)
+            return index
+
+    def release(self, index):
+        with self.condition:
+            self.loads[index] -= 1
+            metrics.MODEL_POOL_BUSY.set(sum(self.loads), model=self.name)
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def replica(self):
+        """
+        Runs the body of the `with` statement on the least loaded replica, as
+        `with pool.replica() as model: model.transcribe(audio)`.
+        """
+        index = self.acquire()
+        try:
+            yield self.replicas[index]
+        finally:
+            self.release(index)
+
+    @staticmethod
+    def auto_size(threads_per_replica, memory_per_replica=None, available_memory=None):
+        """
+        Number of replicas that fit the CPU cores and `MEMORY_FRACTION` of the available memory.
+
+        Args:
+            threads_per_replica (int): CPU threads the inferences of one replica use together.
+            memory_per_replica (int, optional): Bytes one replica takes, e.g. the size of its weights. Defaults to
+                None, which sizes the pool from the cores only.
+            available_memory (int, optional): Bytes of memory available. Defaults to the free physical memory.
+
+        Returns:
+            int: The number of replicas, at least 1.
+        """
+        size = max(1, (os.cpu_count() or 1) // max(1, threads_per_replica))
+        if memory_per_replica:
+            if available_memory is None:
+                try:
+                    available_memory = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+                except (AttributeError, ValueError, OSError):
+                    logging.warning("Could not read the available memory, sizing the model pool from CPU cores only")
+            if available_memory:
+                size = min(size, max(1, int(available_memory * ModelPool.MEMORY_FRACTION // memory_per_replica)))
+        return size
@@ -0,0 +1,331 @@
+import os
+import logging
+import threading
+
+import numpy as np
+import torch
+import ctranslate2
+from huggingface_hub import snapshot_download
+
+from faster_whisper.audio import decode_audio
+from whisper_live.backend.fair_scheduler import FairScheduler
+from whisper_live.backend.model_pool import ModelPool
+from whisper_live.transcriber.transcriber_faster_whisper import WhisperModel
+
+
+class ModelRegistry:
+    """
+    Resolves, loads and warms up faster_whisper models, so that the work can happen once at server startup
+    instead of on the thread of the first connection that asks for a model.
+
+    A model reference is a model size (e.g. "small.en"), a Hugging Face model id, or a path to a CTranslate2
+    model. `resolve` downloads and, if needed, converts the model and remembers where it is on disk; `get`
+    additionally loads one shared `WhisperModel` and runs a warmup inference on it. `preload` does either
+    for a list of models before the server starts listening. With more than one replica or worker, `pool` holds
+    the replicas of a model that connections share instead of a single instance. Connections that load their own
+    instance `take` the warmed up spare a preload left for them, if any, and `create` one otherwise.
+    """
+    MODEL_SIZES = [
+        "tiny", "tiny.en", "base", "base.en", "small", "small.en",
+        "medium", "medium.en", "large-v2", "large-v3", "distil-small.en",
+        "distil-medium.en", "distil-large-v2", "distil-large-v3",
+        "large-v3-turbo", "turbo"
+    ]
+
+    def __init__(
+        self,
+        cache_path="~/.cache/whisper-live/",
+        device=None,
+        compute_type=None,
+        warmup_audio="assets/jfk.flac",
+        replicas=1,
+        replica_workers=1,
+    ):
+        """
+        Args:
+            cache_path (str, optional): Where converted CTranslate2 models are stored. Defaults to
+                "~/.cache/whisper-live/".
+            device (str, optional): "cuda" or "cpu". Defaults to "cuda" if available.
+            compute_type (str, optional): CTranslate2 compute type. Defaults to float16 on GPUs with compute
+                capability 7 or higher, float32 on older GPUs and int8 on CPU.
+            warmup_audio (str, optional): Audio file transcribed to warm up loaded models. One second of silence is
+                used if the file does not exist. Defaults to "assets/jfk.flac".
+            replicas (int, optional): Instances of every shared model in its `pool`, 0 to size the pool from the CPU
+                cores and the available memory. Defaults to 1.
+            replica_workers (int, optional): Transcriptions every shared instance runs in parallel, the
+                `num_workers` (CTranslate2 `inter_threads`) it is loaded with. Defaults to 1.
+        """
+        self.cache_path = cache_path
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        if compute_type is None:
+            if self.device == "cuda":
+                major, _ = torch.cuda.get_device_capability(self.device)
+                compute_type = "float16" if major >= 7 else "float32"
+            else:
+                compute_type = "int8"
+        self.compute_type = compute_type
+        self.warmup_audio = warmup_audio
+        self.replicas = replicas
+        self.replica_workers = max(1, int(replica_workers))
+        self.paths = {}
+        """Local model directory or model size of every resolved model reference."""
+        self.models = {}
+        """Shared, warmed up model of every loaded model reference."""
+        self.spares = {}
+        """Warmed up, unshared model of every model reference preloaded for connections loading their own."""
+        self.lock = threading.Lock()
+        self.model_locks = {}
+        self.inference_locks = {}
+        self.inference_schedulers = {}
+        self.pools = {}
+        """`ModelPool` of every model reference served by replicas."""
+
+    def model_lock(self, model_ref):
+        """
+        Returns the lock serializing the resolving and loading of one model reference, so concurrent requests
+        for the same model wait for a single load while other models load in parallel.
+        """
+        with self.lock:
+            return self.model_locks.setdefault(model_ref, threading.RLock())
+
+    def inference_lock(self, model_ref):
+        """
+        Returns the lock clients hold while running inference on the shared instance of a model.
+        """
+        with self.lock:
+            return self.inference_locks.setdefault(model_ref, threading.Lock())
+
+    def inference_scheduler(self, model_ref):
+        """
+        Returns the `FairScheduler` taking turns between the clients of the shared instance of a model, used in
+        place of its `inference_lock` when the server schedules clients fairly.
+        """
+        with self.lock:
+            if model_ref not in self.inference_schedulers:
+                self.inference_schedulers[model_ref] = FairScheduler()
+            return self.inference_schedulers[model_ref]
+
+    def resolve(self, model_ref):
+        """
+        Makes a model available on disk, downloading it and converting it to CTranslate2 if needed.
+
+        Args:
+            model_ref (str): Model size, Hugging Face model id or path to a CTranslate2 model.
+
+        Returns:
+            str: What to pass to `WhisperModel`, a model size or a local model directory.
+        """
+        with self.model_lock(model_ref):
+            if model_ref not in self.paths:
+                self.paths[model_ref] = self._resolve(model_ref)
+            return self.paths[model_ref]
+
+    def _resolve(self, model_ref):
+        if model_ref in self.MODEL_SIZES:
+            logging.info("Downloading model files (25%)")
+            return model_ref
+
+        logging.info(f"Model not in model_sizes")
+        if os.path.isdir(model_ref) and ctranslate2.contains_model(model_ref):
+            logging.info("Model files ready (25%)")
+            return model_ref
+
+        logging.info("Downloading model files (25%)")
+        local_snapshot = snapshot_download(
+            repo_id = model_ref,
+            repo_type = "model",
+        )
+        if ctranslate2.contains_model(local_snapshot):
+            logging.info("Model files ready (25%)")
+            return local_snapshot
+
+        cache_root = os.path.expanduser(os.path.join(self.cache_path, "whisper-ct2-models/"))
+        os.makedirs(cache_root, exist_ok=True)
+        safe_name = model_ref.replace("/", "--")
+        ct2_dir = os.path.join(cache_root, safe_name)
+
+        if not ctranslate2.contains_model(ct2_dir):
+            logging.info("Converting to CTranslate2 (50%)")
+            ct2_converter = ctranslate2.converters.TransformersConverter(
+                local_snapshot,
+                copy_files=["tokenizer.json", "preprocessor_config.json"]
+            )
+            ct2_converter.convert(
+                output_dir=ct2_dir,
+                quantization=self.compute_type,
+                force=False,  # skip if already up-to-date
+            )
+            logging.info("Conversion complete (50%)")
+        return ct2_dir
+
+    def create(self, model_ref, num_workers=1):
+        """
+        Loads a new, unshared instance of a model.
+
+        Args:
+            model_ref (str): Model size, Hugging Face model id or path to a CTranslate2 model.
+            num_workers (int, optional): Transcriptions the instance runs in parallel. Defaults to 1.
+
+        Returns:
+            WhisperModel: The loaded model.
+        """
+        model_to_load = self.resolve(model_ref)
+        logging.info("Loading into memory (75%)")
+        model = WhisperModel(
+            model_to_load,
+            device=self.device,
+            compute_type=self.compute_type,
+            num_workers=num_workers,
+            local_files_only=False,
+        )
+        logging.info("Model ready (100%)")
+        return model
+
+    def get(self, model_ref, warmup=True):
+        """
+        Returns the shared instance of a model, loading and warming it up on first use.
+
+        Args:
+            model_ref (str): Model size, Hugging Face model id or path to a CTranslate2 model.
+            warmup (bool, optional): Whether to run a warmup inference after loading. Defaults to True.
+
+        Returns:
+            WhisperModel: The shared model.
+        """
+        with self.model_lock(model_ref):
+            if model_ref not in self.models:
+                model = self.create(model_ref, num_workers=self.replica_workers)
+                if warmup:
+                    self.warmup(model)
+                self.models[model_ref] = model
+            return self.models[model_ref]
+
+    def take(self, model_ref):
+        """
+        Hands the warmed up spare instance of a preloaded model over to a connection for its own use.
+
+        Args:
+            model_ref (str): Model size, Hugging Face model id or path to a CTranslate2 model.
+
+        Returns:
+            WhisperModel or None: The spare model, or None if there is none (left), in which case the connection
+                creates its own.
+        """
+        with self.lock:
+            return self.spares.pop(model_ref, None)
+
+    @property
+    def pooled(self):
+        """
+        bool: Whether shared models are served by a `ModelPool` rather than a single instance behind a lock.
+        """
+        return self.replicas != 1 or self.replica_workers > 1
+
+    def pool_size(self, model_ref):
+        """
+        Returns:
+            int: The number of replicas of a model, `replicas` or, if it is 0, as many as the CPU cores and the
+                available memory fit, or the free memory of the GPU. Memory is only taken into account for models
+                stored in a local directory.
+        """
+        if self.replicas:
+            return self.replicas
+        threads = int(os.environ.get("OMP_NUM_THREADS", 4)) * self.replica_workers
+        model_file = os.path.join(self.resolve(model_ref), "model.bin")
+        memory = os.path.getsize(model_file) if os.path.isfile(model_file) else None
+        if self.device == "cuda":
+            # replicas on the GPU are bound by its memory only
+            if memory is None:
+                return 1
+            return max(1, int(torch.cuda.mem_get_info()[0] * ModelPool.MEMORY_FRACTION // memory))
+        return ModelPool.auto_size(threads, memory)
+
+    def pool(self, model_ref):
+        """
+        Returns the pool of replicas of a model, loading and warming them up on first use. The shared instance
+        returned by `get` is the first replica.
+
+        Args:
+            model_ref (str): Model size, Hugging Face model id or path to a CTranslate2 model.
+
+        Returns:
+            ModelPool: The pool of the model.
+        """
+        with self.model_lock(model_ref):
+            if model_ref not in self.pools:
+                replicas = [self.get(model_ref)]
+                for _ in range(self.pool_size(model_ref) - 1):
+                    replica = self.create(model_ref, num_workers=self.replica_workers)
+                    self.warmup(replica)
+                    replicas.append(replica)
+                self.pools[model_ref] = ModelPool(replicas, workers=self.replica_workers, name=model_ref)
+                logging.info(
+                    f"Serving {model_ref} with {len(replicas)} replicas of {self.replica_workers} workers each"
+                )
+            return self.pools[model_ref]
+
+    def warmup(self, model, warmup_steps=1):
+        """
+        Runs inference on a loaded model, since the first few inferences are slow.
+
+        Args:
+            model (WhisperModel): The model to warm up.
+            warmup_steps (int, optional): Number of transcriptions to run. Defaults to 1.
+        """
+        logging.info("[INFO:] Warming up faster_whisper model..")
+        if os.path.exists(self.warmup_audio):
+            audio = decode_audio(self.warmup_audio)
+        else:
+            audio = np.zeros(16000, dtype=np.float32)
+        for _ in range(warmup_steps):
+            segments, _ = model.transcribe(audio)
+            list(segments)
+
+    def preload(self, model_refs, load=True, shared=True):
+        """
+        Prepares models before the first connection asks for them.
+
+        Args:
+            model_refs (list[str]): Model sizes, Hugging Face model ids or paths to CTranslate2 models.
+            load (bool, optional): Load and warm up every model. If False, the models are only downloaded and
+                converted. Defaults to True.
+            shared (bool, optional): Keep the loaded models as the instances (or pools) connections share. If
+                False, every model is kept as a spare the first connection asking for it `take`s for its own use,
+                and later connections load their own instance from the prepared files. Defaults to True.
+        """
+        for model_ref in model_refs:
+            logging.info(f"Preloading model {model_ref}")
+            if load and shared and self.pooled:
+                self.pool(model_ref)
+            elif load and shared:
+                self.get(model_ref)
+            elif load:
+                with self.model_lock(model_ref):
+                    if model_ref not in self.spares:
+                        model = self.create(model_ref)
+                        self.warmup(model)
+                        with self.lock:
+                            self.spares[model_ref] = model
+            else:
+                self.resolve(model_ref)
+
+    @property
+    def loaded_models(self):
+        """
+        list[str]: Model references with a shared instance loaded in memory.
+        """
+        return list(self.models)
+
+    @property
+    def spare_models(self):
+        """
+        list[str]: Model references with a spare instance waiting for a connection.
+        """
+        return list(self.spares)
+
+    @property
+    def resolved_models(self):
+        """
+        list[str]: Model references available on disk.
+        """
+        return list(self.paths)
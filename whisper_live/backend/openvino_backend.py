@@ -5,12 +5,18 @@ import time
 
 from openvino import Core
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.fair_scheduler import FairScheduler
+from whisper_live.backend.model_pool import ModelPool
 from whisper_live.transcriber.transcriber_openvino import WhisperOpenVINO
 
 
 class ServeClientOpenVINO(ServeClientBase):
+    BACKEND = "openvino"
     SINGLE_MODEL = None
     SINGLE_MODEL_LOCK = threading.Lock()
+    SINGLE_MODEL_SCHEDULER = FairScheduler()
+    MODEL_POOLS = {}
+    MODEL_POOLS_LOCK = threading.Lock()
 
     def __init__(
         self,
@@ -28,6 +34,10 @@ class ServeClientOpenVINO(ServeClientBase):
         no_speech_thresh=0.45,
         clip_audio=False,
         same_output_threshold=10,
+        start_thread=True,
+        vad_gate=None,
+        min_new_audio=0.0,
+        model_replicas=1,
     ):
         """
         Initialize a ServeClient instance.
@@ -48,6 +58,14 @@ class ServeClientOpenVINO(ServeClientBase):
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            start_thread (bool, optional): Whether to run the transcription loop in a dedicated thread. The asyncio
+                server disables this and drives `transcription_step` from its executor instead. Defaults to True.
+            vad_gate (callable, optional): Classifies incoming frames as speech or not, so windows without speech
+                are skipped without running the model. Defaults to None.
+            min_new_audio (float, optional): Seconds of new audio to wait for between transcription passes. Defaults to 0,
+                i.e. a pass runs as soon as any new audio arrives.
+            model_replicas (int, optional): If more than 1, connections share a `ModelPool` of this many instances
+                of the model instead of `single_model` or an instance each. Defaults to 1.
         """
         super().__init__(
             client_uid,
@@ -56,6 +74,8 @@ class ServeClientOpenVINO(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
+            vad_gate=vad_gate,
+            min_new_audio=min_new_audio,
         )
         self.language = "en" if language is None else language
         if not self.language.startswith("<|"):
@@ -75,7 +95,10 @@ class ServeClientOpenVINO(ServeClientBase):
         self.device = selected_device
 
 
-        if single_model:
+        if model_replicas > 1:
+            self.model_pool = self.get_model_pool(model, model_replicas)
+            self.transcriber = self.model_pool.replicas[0]
+        elif single_model:
             if ServeClientOpenVINO.SINGLE_MODEL is None:
                 self.create_model(model)
                 ServeClientOpenVINO.SINGLE_MODEL = self.transcriber
@@ -85,8 +108,9 @@ class ServeClientOpenVINO(ServeClientBase):
             self.create_model(model)
 
         # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        if start_thread:
+            self.trans_thread = threading.Thread(target=self.speech_to_text)
+            self.trans_thread.start()
 
         self.websocket.send(json.dumps({
             "uid": self.client_uid,
@@ -107,6 +131,28 @@ class ServeClientOpenVINO(ServeClientBase):
             task=self.task
         )
 
+    def get_model_pool(self, model, replicas):
+        """
+        Returns the pool of instances of a model shared by all connections with the same language and task,
+        loading it on first use.
+        """
+        key = (model, self.language, self.task)
+        with ServeClientOpenVINO.MODEL_POOLS_LOCK:
+            if key not in ServeClientOpenVINO.MODEL_POOLS:
+                instances = []
+                for _ in range(replicas):
+                    self.create_model(model)
+                    instances.append(self.transcriber)
+                ServeClientOpenVINO.MODEL_POOLS[key] = ModelPool(instances, name=model)
+            return ServeClientOpenVINO.MODEL_POOLS[key]
+
+    def get_model_scheduler(self):
+        if self.model_pool is not None:
+            return self.model_pool.scheduler
+        if ServeClientOpenVINO.SINGLE_MODEL is not None and getattr(self, "transcriber", None) is ServeClientOpenVINO.SINGLE_MODEL:
+            return ServeClientOpenVINO.SINGLE_MODEL_SCHEDULER
+        return None
+
     def transcribe_audio(self, input_sample):
         """
         Transcribes the provided audio sample using the configured transcriber instance.
@@ -123,11 +169,9 @@ class ServeClientOpenVINO(ServeClientBase):
             depends on the implementation of the `transcriber.transcribe` method but typically
             includes the transcribed text.
         """
-        if ServeClientOpenVINO.SINGLE_MODEL:
-            ServeClientOpenVINO.SINGLE_MODEL_LOCK.acquire()
-        result = self.transcriber.transcribe(input_sample)
-        if ServeClientOpenVINO.SINGLE_MODEL:
-            ServeClientOpenVINO.SINGLE_MODEL_LOCK.release()
+        lock = ServeClientOpenVINO.SINGLE_MODEL_LOCK if ServeClientOpenVINO.SINGLE_MODEL else None
+        with self.model_turn(lock, input_sample.shape[0] / self.RATE, self.model_pool) as transcriber:
+            result = transcriber.transcribe(input_sample)
         return result
 
     def handle_transcription_output(self, result, duration):
@@ -10,6 +10,7 @@ import numpy as np
 import torch
 from transformers import SeamlessM4TProcessor, AutoModelForSeq2SeqLM
 from optimum.onnxruntime import ORTModelForSeq2SeqLM
+from whisper_live import metrics, tracing
 from whisper_live.backend.base import ServeClientBase
 
 
@@ -22,6 +23,7 @@ class ServeClientTranslation(ServeClientBase):
     separate thread. Reads from a queue populated by the transcription backend and
     streams translated segments back to the client via WebSocket.
     """
+    BACKEND = "translation"
     
     def __init__(
         self,
@@ -205,7 +207,10 @@ class ServeClientTranslation(ServeClientBase):
                 if last_state and last_state.get("text") == original_text and last_state.get("completed") == completed:
                     self.translation_queue.task_done()
                     continue
-                translated_text = self.translate_text(original_text)
+                translation_start = time.perf_counter()
+                with tracing.span("translate", session=self.client_uid, characters=len(original_text)):
+                    translated_text = self.translate_text(original_text)
+                metrics.TRANSLATION_SECONDS.observe(time.perf_counter() - translation_start)
                 
                 # Create translated segment
                 translated_segment = {
@@ -231,7 +236,11 @@ class ServeClientTranslation(ServeClientBase):
 
                 if updated:
                     self.translated_segments.sort(key=lambda seg: seg.get("start", 0.0))
-                    segments_to_send = self.prepare_translated_segments()
+                    if self.delta_segments:
+                        # the client inserts or replaces the segment with the same start and end itself
+                        segments_to_send = [translated_segment]
+                    else:
+                        segments_to_send = self.prepare_translated_segments()
                     self.send_translation_to_client(segments_to_send)
 
                 self._last_segment_state[segment_key] = {
@@ -268,12 +277,13 @@ class ServeClientTranslation(ServeClientBase):
             translated_segments (list): List of translated segments to send
         """
         try:
-            self.websocket.send(
-                json.dumps({
-                    "uid": self.client_uid,
-                    "translated_segments": translated_segments,
-                })
-            )
+            with tracing.span("send_translation", session=self.client_uid, segments=len(translated_segments)):
+                self.websocket.send(
+                    json.dumps({
+                        "uid": self.client_uid,
+                        "translated_segments": translated_segments,
+                    })
+                )
         except Exception as e:
             logging.error(f"[ERROR]: Sending translation data to client: {e}")
     
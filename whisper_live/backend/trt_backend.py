@@ -4,12 +4,19 @@ import threading
 import time
 
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.fair_scheduler import FairScheduler
+from whisper_live.backend.model_pool import ModelPool
 from whisper_live.transcriber.transcriber_tensorrt import WhisperTRTLLM
 
 
 class ServeClientTensorRT(ServeClientBase):
+    BACKEND = "tensorrt"
+    MIN_CHUNK_DURATION = 0.4
     SINGLE_MODEL = None
     SINGLE_MODEL_LOCK = threading.Lock()
+    SINGLE_MODEL_SCHEDULER = FairScheduler()
+    MODEL_POOLS = {}
+    MODEL_POOLS_LOCK = threading.Lock()
 
     def __init__(
         self,
@@ -26,6 +33,9 @@ class ServeClientTensorRT(ServeClientBase):
         no_speech_thresh=0.45,
         clip_audio=False,
         same_output_threshold=10,
+        start_thread=True,
+        min_new_audio=0.0,
+        model_replicas=1,
     ):
         """
         Initialize a ServeClient instance.
@@ -47,6 +57,12 @@ class ServeClientTensorRT(ServeClientBase):
             no_speech_thresh (float, optional): Segments with no speech probability above this threshold will be discarded. Defaults to 0.45.
             clip_audio (bool, optional): Whether to clip audio with no valid segments. Defaults to False.
             same_output_threshold (int, optional): Number of repeated outputs before considering it as a valid segment. Defaults to 10.
+            start_thread (bool, optional): Whether to run the transcription loop in a dedicated thread. The asyncio
+                server disables this and drives `transcription_step` from its executor instead. Defaults to True.
+            min_new_audio (float, optional): Seconds of new audio to wait for between transcription passes. Defaults to 0,
+                i.e. a pass runs as soon as any new audio arrives.
+            model_replicas (int, optional): If more than 1, connections share a `ModelPool` of this many engines of
+                the model instead of `single_model` or an engine each. Defaults to 1.
         """
         super().__init__(
             client_uid,
@@ -55,6 +71,7 @@ class ServeClientTensorRT(ServeClientBase):
             no_speech_thresh,
             clip_audio,
             same_output_threshold,
+            min_new_audio=min_new_audio,
         )
 
         self.language = language if multilingual else "en"
@@ -62,7 +79,10 @@ class ServeClientTensorRT(ServeClientBase):
         self.eos = False
         self.max_new_tokens = max_new_tokens
 
-        if single_model:
+        if model_replicas > 1:
+            self.model_pool = self.get_model_pool(model, model_replicas, multilingual, use_py_session)
+            self.transcriber = self.model_pool.replicas[0]
+        elif single_model:
             if ServeClientTensorRT.SINGLE_MODEL is None:
                 self.create_model(model, multilingual, use_py_session=use_py_session)
                 ServeClientTensorRT.SINGLE_MODEL = self.transcriber
@@ -72,8 +92,9 @@ class ServeClientTensorRT(ServeClientBase):
             self.create_model(model, multilingual, use_py_session=use_py_session)
 
         # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        if start_thread:
+            self.trans_thread = threading.Thread(target=self.speech_to_text)
+            self.trans_thread.start()
 
         self.websocket.send(json.dumps({
             "uid": self.client_uid,
@@ -98,6 +119,21 @@ class ServeClientTensorRT(ServeClientBase):
         if warmup:
             self.warmup()
 
+    def get_model_pool(self, model, replicas, multilingual, use_py_session=False):
+        """
+        Returns the pool of engines of a model shared by all connections with the same language and task,
+        building it on first use.
+        """
+        key = (model, self.language, self.task)
+        with ServeClientTensorRT.MODEL_POOLS_LOCK:
+            if key not in ServeClientTensorRT.MODEL_POOLS:
+                engines = []
+                for _ in range(replicas):
+                    self.create_model(model, multilingual, use_py_session=use_py_session)
+                    engines.append(self.transcriber)
+                ServeClientTensorRT.MODEL_POOLS[key] = ModelPool(engines, name=model)
+            return ServeClientTensorRT.MODEL_POOLS[key]
+
     def warmup(self, warmup_steps=10):
         """
         Warmup TensorRT since first few inferences are slow.
@@ -118,8 +154,12 @@ class ServeClientTensorRT(ServeClientBase):
             eos (bool): The value to set for the EOS flag.
         """
         self.lock.acquire()
+        changed = self.eos != eos
         self.eos = eos
         self.lock.release()
+        if changed:
+            # the pass that finalizes the current segment only needs the EOS flag, not new audio
+            self.wake()
 
     def handle_transcription_output(self, last_segment, duration):
         """
@@ -135,6 +175,13 @@ class ServeClientTensorRT(ServeClientBase):
         if self.eos:
             self.update_timestamp_offset(last_segment, duration)
 
+    def get_model_scheduler(self):
+        if self.model_pool is not None:
+            return self.model_pool.scheduler
+        if ServeClientTensorRT.SINGLE_MODEL is not None and getattr(self, "transcriber", None) is ServeClientTensorRT.SINGLE_MODEL:
+            return ServeClientTensorRT.SINGLE_MODEL_SCHEDULER
+        return None
+
     def transcribe_audio(self, input_bytes):
         """
         Transcribe the audio chunk and send the results to the client.
@@ -142,16 +189,14 @@ class ServeClientTensorRT(ServeClientBase):
         Args:
             input_bytes (np.array): The audio chunk to transcribe.
         """
-        if ServeClientTensorRT.SINGLE_MODEL:
-            ServeClientTensorRT.SINGLE_MODEL_LOCK.acquire()
-        logging.info(f"[WhisperTensorRT:] Processing audio with duration: {input_bytes.shape[0] / self.RATE}")
-        mel, duration = self.transcriber.log_mel_spectrogram(input_bytes)
-        last_segment = self.transcriber.transcribe(
-            mel,
-            text_prefix=f"<|startoftranscript|><|{self.language}|><|{self.task}|><|notimestamps|>",
-        )
-        if ServeClientTensorRT.SINGLE_MODEL:
-            ServeClientTensorRT.SINGLE_MODEL_LOCK.release()
+        lock = ServeClientTensorRT.SINGLE_MODEL_LOCK if ServeClientTensorRT.SINGLE_MODEL else None
+        with self.model_turn(lock, input_bytes.shape[0] / self.RATE, self.model_pool) as transcriber:
+            logging.info(f"[WhisperTensorRT:] Processing audio with duration: {input_bytes.shape[0] / self.RATE}")
+            mel, duration = transcriber.log_mel_spectrogram(input_bytes)
+            last_segment = transcriber.transcribe(
+                mel,
+                text_prefix=f"<|startoftranscript|><|{self.language}|><|{self.task}|><|notimestamps|>",
+            )
         if last_segment:
             self.handle_transcription_output(last_segment, duration)
 
@@ -191,20 +236,35 @@ class ServeClientTensorRT(ServeClientBase):
                 logging.info("Exiting speech to text thread")
                 break
 
-            if self.frames_np is None:
-                time.sleep(0.02)    # wait for any audio to arrive
-                continue
+            wait_time = self.run_transcription_step()
+            self.wait_for_audio(wait_time)
+
+    def transcription_step(self):
+        """
+        Runs a single pass of the TensorRT transcription loop.
+
+        Returns:
+            float or None: Maximum number of seconds to wait for new audio before the next pass, or None to wait
+                until new audio arrives or the EOS flag changes.
+        """
+        if self.frames_np is None:
+            return None    # wait for any audio to arrive
 
-            self.clip_audio_if_no_valid_segment()
+        self.clip_audio_if_no_valid_segment()
 
-            input_bytes, duration = self.get_audio_chunk_for_processing()
-            if duration < 0.4:
-                continue
+        input_bytes, duration = self.get_audio_chunk_for_processing()
+        if duration < self.get_min_chunk_duration():
+            return None
 
-            try:
-                input_sample = input_bytes.copy()
-                logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
-                self.transcribe_audio(input_sample)
+        try:
+            logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
+            cpu_start = time.thread_time()
+            pass_start = time.perf_counter()
+            self.transcribe_audio(input_bytes)
+            self.inference_cpu_time += time.thread_time() - cpu_start
+            self.record_pass(time.perf_counter() - pass_start, duration)
 
-            except Exception as e:
-                logging.error(f"[ERROR]: {e}")
+        except Exception as e:
+            logging.error(f"[ERROR]: {e}")
+            return 0.1
+        return None
@@ -0,0 +1,85 @@
+class AdaptiveWindowController:
+    """
+    Adapts the pacing of a streaming session to the measured real-time factor (RTF) of its transcription passes,
+    the duration of a pass divided by the duration of the window it transcribed.
+
+    While the smoothed RTF stays below `target_rtf` the backend defaults apply. Above it, the pressure
+    `rtf / target_rtf` scales them: passes wait for proportionally more audio before running, and windows are
+    capped to a proportionally shorter length. An overloaded session therefore runs fewer passes over bounded
+    windows instead of re-decoding an ever growing window, which would make every pass slower still. Audio beyond
+    the cap is not dropped, it is transcribed by the following passes once the window moves forward.
+    """
+
+    def __init__(
+        self,
+        target_rtf=0.5,
+        smoothing=0.3,
+        max_window=25.0,
+        min_window=8.0,
+        max_min_chunk=5.0,
+    ):
+        """
+        Args:
+            target_rtf (float, optional): RTF above which the session is slowed down. Defaults to 0.5, which
+                leaves room for passes over overlapping windows.
+            smoothing (float, optional): Weight of the latest pass in the moving average of the RTF. Defaults
+                to 0.3.
+            max_window (float, optional): Window length in seconds while the session keeps up. Defaults to 25,
+                the length at which audio without segments is clipped.
+            min_window (float, optional): Shortest window cap in seconds under load. Defaults to 8.
+            max_min_chunk (float, optional): Longest minimum chunk duration in seconds under load. Defaults to 5.
+        """
+        if target_rtf <= 0:
+            raise ValueError("target_rtf must be positive")
+        self.target_rtf = target_rtf
+        self.smoothing = smoothing
+        self.max_window_limit = max_window
+        self.min_window = min_window
+        self.max_min_chunk = max_min_chunk
+        self.rtf = None
+        """Exponential moving average of the RTF of the passes so far, None before the first pass."""
+
+    def update(self, pass_seconds, window_seconds):
+        """
+        Records a transcription pass.
+
+        Args:
+            pass_seconds (float): Wall time the pass took.
+            window_seconds (float): Duration of the audio it transcribed.
+        """
+        if window_seconds <= 0:
+            return
+        rtf = pass_seconds / window_seconds
+        self.rtf = rtf if self.rtf is None else self.smoothing * rtf + (1 - self.smoothing) * self.rtf
+
+    @property
+    def pressure(self):
+        """How far the smoothed RTF exceeds the target, 1 while the session keeps up."""
+        if self.rtf is None:
+            return 1.0
+        return max(1.0, self.rtf / self.target_rtf)
+
+    def min_chunk_duration(self, base):
+        """
+        Args:
+            base (float): Minimum chunk duration of the backend.
+
+        Returns:
+            float: Seconds of audio that must be pending before a pass runs.
+        """
+        return min(max(base, self.max_min_chunk), base * self.pressure)
+
+    def min_new_audio(self, base):
+        """
+        Args:
+            base (float): Minimum chunk duration of the backend.
+
+        Returns:
+            float: Seconds of new audio to wait for between passes, 0 while the session keeps up.
+        """
+        return self.min_chunk_duration(base) - base
+
+    @property
+    def max_window(self):
+        """Longest window in seconds a pass transcribes."""
+        return max(self.min_window, self.max_window_limit / self.pressure)
@@ -4,7 +4,6 @@ import wave
 
 import logging
 import numpy as np
-import pyaudio
 import threading
 import json
 import websocket
@@ -12,6 +11,12 @@ import uuid
 import time
 import av
 import whisper_live.utils as utils
+from whisper_live.audio_codec import AudioEncoder
+
+try:
+    import pyaudio
+except ImportError:    # headless use of `Client`, e.g. by the load generator in benchmarks/
+    pyaudio = None
 
 
 class Client:
@@ -41,6 +46,14 @@ class Client:
         target_language="fr",
         translation_callback=None,
         translation_srt_file_path="output_translated.srt",
+        decoding_profile=None,
+        commit_policy=None,
+        word_timestamps=False,
+        language_detection_seconds=2.0,
+        audio_encoding="float32",
+        delta_segments=False,
+        allow_model_downgrade=False,
+        priority="normal",
     ):
         """
         Initializes a Client instance for audio recording and streaming to a server.
@@ -67,6 +80,14 @@ class Client:
             target_language (str, optional): Target language for translation. Defaults to 'fr'.
             translation_callback (callable, optional): A callback function to handle translation results. Default is None.
             translation_srt_file_path (str, optional): The file path to save the translated output SRT file. Default is "output_translated.srt".
+            decoding_profile (str, optional): Decoding profile of the faster_whisper backend, e.g. "live" to bound the temperature fallback of streaming windows. Default is None.
+            commit_policy (str, optional): Commit policy of the faster_whisper backend, e.g. "local_agreement" to commit words consecutive windows agree on. Default is None.
+            word_timestamps (bool, optional): Whether the faster_whisper backend sends the start and end time of every word in a `words` list of each segment. Default is False.
+            language_detection_seconds (float, optional): Seconds of audio the faster_whisper backend detects the language on when `lang` is None. Default is 2.
+            audio_encoding (str, optional): Encoding of the audio sent to the server, "float32", "int16" (half the bandwidth) or "opus" (about a twentieth). Default is "float32".
+            delta_segments (bool, optional): Whether the server sends only newly completed segments instead of the last `send_last_n_segments` with every message. Default is False.
+            allow_model_downgrade (bool, optional): Whether a server at capacity may run a smaller model than `model` instead of asking the client to wait. Default is False.
+            priority (str, optional): Priority tier of the client on a server with fair scheduling, "low", "normal" or "high". Default is "normal".
         """
         self.recording = False
         self.task = "transcribe"
@@ -88,6 +109,17 @@ class Client:
         self.clip_audio = clip_audio
         self.same_output_threshold = same_output_threshold
         self.transcription_callback = transcription_callback
+        self.decoding_profile = decoding_profile
+        self.commit_policy = commit_policy
+        self.word_timestamps = word_timestamps
+        self.language_detection_seconds = language_detection_seconds
+        self.audio_encoding = audio_encoding
+        self.audio_encoder = AudioEncoder(audio_encoding)
+        self.delta_segments = delta_segments
+        self.allow_model_downgrade = allow_model_downgrade
+        self.priority = priority
+        self.received_segments = []
+        self.received_translations = []
 
         # Translation-specific attributes
         self.enable_translation = enable_translation
@@ -139,6 +171,52 @@ class Client:
         elif status == "WARNING":
             print(f"Message from Server: {message_data['message']}")
 
+    def apply_segment_delta(self, segments):
+        """
+        Rebuilds the segments the server sends without `delta_segments` from a delta message.
+
+        Completed segments carry the `id` of their position in the server transcript and are kept, the
+        segment without an `id` is the current incomplete one.
+
+        Args:
+            segments (list): Segments of a delta message.
+
+        Returns:
+            list: The last `send_last_n_segments` completed segments followed by the incomplete one, if any.
+        """
+        last_segment = None
+        for seg in segments:
+            if "id" not in seg:
+                last_segment = seg
+            elif seg["id"] == len(self.received_segments):
+                self.received_segments.append({k: v for k, v in seg.items() if k != "id"})
+        segments = self.received_segments[-self.send_last_n_segments:]
+        if last_segment is not None:
+            segments = segments + [last_segment]
+        return segments
+
+    def apply_translation_delta(self, segments):
+        """
+        Rebuilds the translated segments the server sends without `delta_segments` from a delta message,
+        which carries only the translation that was added or changed.
+
+        Args:
+            segments (list): Translated segments of a delta message.
+
+        Returns:
+            list: The last `send_last_n_segments` translated segments, ordered by start time.
+        """
+        for seg in segments:
+            for i, existing in enumerate(self.received_translations):
+                if existing.get("start") == seg.get("start") and existing.get("end") == seg.get("end"):
+                    self.received_translations[i] = seg
+                    break
+            else:
+                self.received_translations.append(seg)
+        # same ordering as the server, which sorts its translated segments on every update
+        self.received_translations.sort(key=lambda seg: seg.get("start", 0.0))
+        return self.received_translations[-self.send_last_n_segments:]
+
     def process_segments(self, segments, translated=False):
         """Processes transcript segments."""
         text = []
@@ -230,10 +308,16 @@ class Client:
             return
 
         if "segments" in message.keys():
-            self.process_segments(message["segments"])
+            segments = message["segments"]
+            if self.delta_segments:
+                segments = self.apply_segment_delta(segments)
+            self.process_segments(segments)
         
         if "translated_segments" in message.keys():
-            self.process_segments(message["translated_segments"], translated=True)
+            segments = message["translated_segments"]
+            if self.delta_segments:
+                segments = self.apply_translation_delta(segments)
+            self.process_segments(segments, translated=True)
 
     def on_error(self, ws, error):
         print(f"[ERROR] WebSocket Error: {error}")
@@ -271,6 +355,14 @@ class Client:
                     "same_output_threshold": self.same_output_threshold,
                     "enable_translation": self.enable_translation,
                     "target_language": self.target_language,
+                    "decoding_profile": self.decoding_profile,
+                    "commit_policy": self.commit_policy,
+                    "word_timestamps": self.word_timestamps,
+                    "language_detection_seconds": self.language_detection_seconds,
+                    "audio_encoding": self.audio_encoding,
+                    "delta_segments": self.delta_segments,
+                    "allow_model_downgrade": self.allow_model_downgrade,
+                    "priority": self.priority,
                 }
             )
         )
@@ -288,6 +380,16 @@ class Client:
         except Exception as e:
             print(e)
 
+    def send_audio_to_server(self, audio_bytes):
+        """
+        Encodes 16-bit PCM audio with the negotiated `audio_encoding` and sends it to the server.
+
+        Args:
+            audio_bytes (bytes): Mono 16-bit PCM audio at 16 kHz.
+        """
+        for message in self.audio_encoder.encode(audio_bytes):
+            self.send_packet_to_server(message)
+
     def close_websocket(self):
         """
         Close the WebSocket connection and join the WebSocket thread.
@@ -357,6 +459,8 @@ class TranscriptionTeeClient:
         self.clients = clients
         if not self.clients:
             raise Exception("At least one client is required.")
+        if pyaudio is None:
+            raise ImportError("TranscriptionTeeClient requires PyAudio, install it with `pip install PyAudio`.")
         self.chunk = 4096
         self.format = pyaudio.paInt16
         self.channels = 1
@@ -435,6 +539,17 @@ class TranscriptionTeeClient:
             if (unconditional or client.recording):
                 client.send_packet_to_server(packet)
 
+    def multicast_audio(self, audio_bytes):
+        """
+        Sends the same audio via all recording clients, each in the audio encoding it negotiated.
+
+        Args:
+            audio_bytes (bytes): Mono 16-bit PCM audio at 16 kHz.
+        """
+        for client in self.clients:
+            if client.recording:
+                client.send_audio_to_server(audio_bytes)
+
     def play_file(self, filename):
         """
         Play an audio file and send it to the server for processing.
@@ -471,8 +586,7 @@ class TranscriptionTeeClient:
                     if data == b"":
                         break
 
-                    audio_array = self.bytes_to_float_array(data)
-                    self.multicast_packet(audio_array.tobytes())
+                    self.multicast_audio(data)
                     if self.mute_audio_playback:
                         time.sleep(chunk_duration)
                     else:
@@ -559,11 +673,14 @@ class TranscriptionTeeClient:
             output_container = av.open(save_file, mode="w")
             output_audio_stream = output_container.add_stream(codec_name="pcm_s16le", rate=self.rate)
 
+        # the stream comes in whatever format, layout and rate the source uses, resample it to the 16-bit mono
+        # PCM every client encodes with its negotiated audio_encoding
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=self.rate)
         try:
             for packet in container.demux(audio_stream):
                 for frame in packet.decode():
-                    audio_data = frame.to_ndarray().tobytes()
-                    self.multicast_packet(audio_data)
+                    for resampled in resampler.resample(frame):
+                        self.multicast_audio(resampled.to_ndarray().tobytes())
 
                     if save_file:
                         output_container.mux(frame)
@@ -638,9 +755,7 @@ class TranscriptionTeeClient:
                 data = self.stream.read(self.chunk, exception_on_overflow=False)
                 self.frames += data
 
-                audio_array = self.bytes_to_float_array(data)
-
-                self.multicast_packet(audio_array.tobytes())
+                self.multicast_audio(data)
 
                 # save frames if more than a minute
                 if len(self.frames) > 60 * self.rate:
@@ -756,6 +871,14 @@ class TranscriptionClient(TranscriptionTeeClient):
         target_language (str, optional): Target language for translation. Defaults to 'fr'.
         translation_callback (callable, optional): A callback function to handle translation results. Default is None.
         translation_srt_file_path (str, optional): The file path to save the translated output SRT file. Default is "output_translated.srt".
+        decoding_profile (str, optional): Decoding profile of the faster_whisper backend, e.g. "live". Default is None.
+        commit_policy (str, optional): Commit policy of the faster_whisper backend, e.g. "local_agreement". Default is None.
+        word_timestamps (bool, optional): Whether the faster_whisper backend sends word start and end times. Default is False.
+        language_detection_seconds (float, optional): Seconds of audio the language is detected on when `lang` is None. Default is 2.
+        audio_encoding (str, optional): Encoding of the audio sent to the server, "float32", "int16" or "opus". Default is "float32".
+        delta_segments (bool, optional): Whether the server sends only newly completed segments. Default is False.
+        allow_model_downgrade (bool, optional): Whether a server at capacity may run a smaller model. Default is False.
+        priority (str, optional): Priority tier of the client with fair scheduling, "low", "normal" or "high". Default is "normal".
 
     Attributes:
         client (Client): An instance of the underlying Client class responsible for handling the WebSocket connection.
@@ -790,6 +913,14 @@ class TranscriptionClient(TranscriptionTeeClient):
         target_language="fr",
         translation_callback=None,
         translation_srt_file_path="./output_translated.srt",
+        decoding_profile=None,
+        commit_policy=None,
+        word_timestamps=False,
+        language_detection_seconds=2.0,
+        audio_encoding="float32",
+        delta_segments=False,
+        allow_model_downgrade=False,
+        priority="normal",
     ):
         self.client = Client(
             host,
@@ -810,6 +941,14 @@ class TranscriptionClient(TranscriptionTeeClient):
             target_language=target_language,
             translation_callback=translation_callback,
             translation_srt_file_path=translation_srt_file_path,
+            decoding_profile=decoding_profile,
+            commit_policy=commit_policy,
+            word_timestamps=word_timestamps,
+            language_detection_seconds=language_detection_seconds,
+            audio_encoding=audio_encoding,
+            delta_segments=delta_segments,
+            allow_model_downgrade=allow_model_downgrade,
+            priority=priority,
         )
 
         if save_output_recording and not output_recording_filename.endswith(".wav"):
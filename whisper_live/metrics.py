@@ -0,0 +1,342 @@
+import bisect
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Histogram buckets in seconds, the same as the Prometheus client libraries use by default."""
+
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+"""Buckets of real-time factors, a factor above 1 means audio is transcribed slower than it arrives."""
+
+
+def format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    """
+    A named metric with optional labels. Every combination of label values is a separate series, selected with
+    the keyword arguments of the update methods, e.g. `counter.inc(backend="faster_whisper")`.
+    """
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Args:
+            name (str): Metric name in the exposition format.
+            documentation (str): Help text of the metric.
+            labelnames (tuple, optional): Names of the labels of the metric. Defaults to no labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {list(self.labelnames)}, got {list(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        """Removes all series, e.g. before a collector sets the current ones."""
+        with self.lock:
+            self.series.clear()
+
+    def samples(self):
+        """
+        Returns:
+            list: `(suffix, labels, value)` tuples of all series, labels as a list of `(name, value)` pairs.
+        """
+        with self.lock:
+            return [
+                ("", list(zip(self.labelnames, key)), value)
+                for key, value in sorted(self.series.items())
+            ]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A monotonically increasing total, e.g. seconds of audio received."""
+    TYPE = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self.key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0.0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.series.get(self.key(labels), 0.0)
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. the depth of a queue."""
+    TYPE = "gauge"
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.series[key] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        with self.lock:
+            return self.series.get(self.key(labels), 0.0)
+
+
+class Histogram(Metric):
+    """Counts observations in cumulative buckets, e.g. the duration of each transcription pass."""
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            name (str): Metric name in the exposition format.
+            documentation (str): Help text of the metric.
+            labelnames (tuple, optional): Names of the labels of the metric. Defaults to no labels.
+            buckets (tuple, optional): Upper bounds of the buckets, `+Inf` is added. Defaults to `DEFAULT_BUCKETS`.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # per bucket counts, the last one for +Inf, followed by the sum
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def get(self, **labels):
+        """
+        Returns:
+            tuple: The `(count, sum)` of the observations of a series.
+        """
+        with self.lock:
+            series = self.series.get(self.key(labels))
+            return (sum(series[:-1]), series[-1]) if series is not None else (0, 0.0)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                labels = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                    cumulative += count
+                    samples.append(("_bucket", labels + [("le", format_value(bound))], cumulative))
+                samples.append(("_sum", labels, series[-1]))
+                samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the server and renders them in the Prometheus text exposition format.
+
+    Values that are cheaper to read when scraped than to keep up to date, like the lag of each client, are set
+    by collectors, callables that the registry runs before rendering.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Adds a metric, or returns the metric already registered under its name.
+
+        Args:
+            metric (Metric): The metric to add.
+
+        Returns:
+            Metric: The registered metric.
+        """
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric '{metric.name}' is already registered with a different type or labels")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        with self.lock:
+            self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self.lock:
+            if collector in self.collectors:
+                self.collectors.remove(collector)
+
+    def render(self):
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format.
+        """
+        with self.lock:
+            collectors = list(self.collectors)
+            metrics = list(self.metrics.values())
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logging.error(f"[ERROR]: Metrics collector failed: {e}")
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+"""The registry the server and the backends record their metrics in."""
+
+AUDIO_RECEIVED_SECONDS = REGISTRY.counter(
+    "whisper_live_audio_received_seconds_total", "Seconds of audio received from clients."
+)
+ADD_FRAMES_SECONDS = REGISTRY.histogram(
+    "whisper_live_add_frames_seconds", "Time spent buffering a received audio frame, including voice activity detection."
+)
+TRANSCRIBE_SECONDS = REGISTRY.histogram(
+    "whisper_live_transcribe_seconds", "Duration of transcription passes.", ("backend",)
+)
+TRANSCRIBED_AUDIO_SECONDS = REGISTRY.counter(
+    "whisper_live_transcribed_audio_seconds_total", "Seconds of audio covered by transcription passes.", ("backend",)
+)
+REAL_TIME_FACTOR = REGISTRY.histogram(
+    "whisper_live_real_time_factor", "Duration of a transcription pass divided by the audio it covers.", ("backend",),
+    buckets=RTF_BUCKETS,
+)
+TRANSCRIBE_ERRORS = REGISTRY.counter(
+    "whisper_live_transcribe_errors_total", "Transcription passes that raised an exception.", ("backend",)
+)
+UPDATE_SEGMENTS_SECONDS = REGISTRY.histogram(
+    "whisper_live_update_segments_seconds", "Time spent turning the output of a pass into segments."
+)
+SEGMENTS_COMMITTED = REGISTRY.counter(
+    "whisper_live_segments_committed_total", "Segments added to client transcripts."
+)
+TRANSLATION_SECONDS = REGISTRY.histogram(
+    "whisper_live_translation_seconds", "Duration of segment translations."
+)
+TRANSLATION_QUEUE_DEPTH = REGISTRY.gauge(
+    "whisper_live_translation_queue_depth", "Segments waiting to be translated, over all clients."
+)
+BATCH_QUEUE_DEPTH = REGISTRY.gauge(
+    "whisper_live_batch_queue_depth", "Transcription requests waiting for the batch inference scheduler."
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "whisper_live_batch_size", "Requests per batch of the batch inference scheduler.",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram(
+    "whisper_live_scheduler_wait_seconds", "Time a session waited for its turn on a shared model.", ("priority",)
+)
+MODEL_POOL_BUSY = REGISTRY.gauge(
+    "whisper_live_model_pool_busy", "Inferences running on the replicas of a model pool.", ("model",)
+)
+CLIENTS = REGISTRY.gauge("whisper_live_clients", "Connected clients.")
+CLIENT_LAG_SECONDS = REGISTRY.gauge(
+    "whisper_live_client_lag_seconds", "Buffered audio of a client not transcribed yet.", ("client_uid",)
+)
+CLIENT_RTF = REGISTRY.gauge(
+    "whisper_live_client_real_time_factor", "Smoothed real-time factor of the passes of a client.", ("client_uid",)
+)
+CLIENT_MIN_CHUNK_SECONDS = REGISTRY.gauge(
+    "whisper_live_client_min_chunk_seconds", "Audio a client waits for before a pass, set from its real-time factor.",
+    ("client_uid",),
+)
+CLIENT_MAX_WINDOW_SECONDS = REGISTRY.gauge(
+    "whisper_live_client_max_window_seconds", "Longest window a pass of a client transcribes, set from its real-time factor.",
+    ("client_uid",),
+)
+CONNECTIONS = REGISTRY.counter("whisper_live_connections_total", "Clients that were accepted.")
+CONNECTIONS_REJECTED = REGISTRY.counter(
+    "whisper_live_connections_rejected_total", "Clients that were asked to wait because the server was full."
+)
+CLIENT_TIMEOUTS = REGISTRY.counter(
+    "whisper_live_client_timeouts_total", "Clients disconnected for exceeding the maximum connection time."
+)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass    # scrapes every few seconds would flood the server log
+
+
+def start_http_server(port, host="0.0.0.0", registry=REGISTRY):
+    """
+    Serves the metrics of `registry` at `/metrics` from a daemon thread.
+
+    Args:
+        port (int): Port to listen on, 0 picks a free one.
+        host (str, optional): Address to bind. Defaults to all interfaces.
+        registry (MetricsRegistry, optional): The registry to expose. Defaults to `REGISTRY`.
+
+    Returns:
+        ThreadingHTTPServer: The running server, `shutdown()` stops it.
+    """
+    handler = type("MetricsHandler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True, name="metrics")
+    thread.start()
+    logging.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
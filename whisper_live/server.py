@@ -3,21 +3,38 @@ import time
 import threading
 import queue
 import json
+import asyncio
 import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import List, Optional
 
 import numpy as np
 from websockets.sync.server import serve
 from websockets.exceptions import ConnectionClosed
-from whisper_live.vad import VoiceActivityDetector
+from whisper_live import metrics, tracing
+from whisper_live.audio_codec import AUDIO_ENCODINGS, AudioDecoder
+from whisper_live.vad import VoiceActivityDetection, VoiceActivityDetectionService, VoiceActivityDetector
 from whisper_live.backend.base import ServeClientBase
+from whisper_live.backend.window_controller import AdaptiveWindowController
+from whisper_live.backend.fair_scheduler import FairScheduler
 
 logging.basicConfig(level=logging.INFO)
 
 class ClientManager:
-    def __init__(self, max_clients=4, max_connection_time=600):
+    MODEL_COSTS = {"tiny": 1.0, "base": 1.5, "small": 3.0, "medium": 6.0, "large": 12.0, "turbo": 5.0}
+    """Relative compute of a streaming session per model size, in units of a `tiny` session."""
+    DEFAULT_MODEL_COST = 3.0
+    """Cost of models whose size is not part of their name, like custom checkpoints, assumed to be `small`."""
+    DISTIL_COST_FACTOR = 0.5
+    VAD_COST_FACTOR = 0.7
+    """Silence is not transcribed when the session uses VAD."""
+    TRANSLATION_COST = 4.0
+    DOWNGRADE_MODELS = ("large-v3", "medium", "small", "base", "tiny")
+    """Models a session may be downgraded to, largest first."""
+
+    def __init__(self, max_clients=4, max_connection_time=600, capacity=None):
         """
         Initializes the ClientManager with specified limits on client connections and connection durations.
 
@@ -25,22 +42,30 @@ class ClientManager:
             max_clients (int, optional): The maximum number of simultaneous client connections allowed. Defaults to 4.
             max_connection_time (int, optional): The maximum duration (in seconds) a client can stay connected. Defaults
                                                  to 600 seconds (10 minutes).
+            capacity (float, optional): Inference budget of the server in cost units, see `estimate_cost`. Clients are
+                                        only admitted while the summed cost of all sessions fits. Defaults to None,
+                                        which limits the number of clients only.
         """
         self.clients = {}
         self.start_times = {}
+        self.costs = {}
         self.max_clients = max_clients
         self.max_connection_time = max_connection_time
+        self.capacity = capacity
 
-    def add_client(self, websocket, client):
+    def add_client(self, websocket, client, cost=0.0):
         """
         Adds a client and their connection start time to the tracking dictionaries.
 
         Args:
             websocket: The websocket associated with the client to add.
             client: The client object to be added and tracked.
+            cost (float, optional): Estimated cost of the session, counted against the capacity. Defaults to 0.
         """
         self.clients[websocket] = client
         self.start_times[websocket] = time.time()
+        self.costs[websocket] = cost
+        metrics.CONNECTIONS.inc()
 
     def get_client(self, websocket):
         """
@@ -68,38 +93,162 @@ class ClientManager:
         if client:
             client.cleanup()
         self.start_times.pop(websocket, None)
+        self.costs.pop(websocket, None)
+
+    def model_cost(self, model):
+        """
+        Args:
+            model (str): Model size, Hugging Face id or path of a session.
+
+        Returns:
+            float: Relative compute of transcribing a stream with the model, read from the size in its name.
+        """
+        name = os.path.basename(str(model).rstrip("/\\")).lower()
+        for size in ("turbo", "large", "medium", "small", "base", "tiny"):
+            if size in name:
+                cost = self.MODEL_COSTS[size]
+                break
+        else:
+            return self.DEFAULT_MODEL_COST
+        if "distil" in name:
+            cost *= self.DISTIL_COST_FACTOR
+        return cost
+
+    def estimate_cost(self, options, model=None):
+        """
+        Estimates the inference cost of a session from the options it connects with.
+
+        Costs are relative to a `tiny` session with VAD off, so the capacity of a server is about the number of
+        such sessions it keeps up with, e.g. as measured with `benchmarks.bench_load`.
+
+        Args:
+            options (dict): Options sent by the client.
+            model (str, optional): Model the server runs regardless of the options, e.g. a custom model. Defaults
+                to the model in the options.
 
-    def get_wait_time(self):
+        Returns:
+            float: The estimated cost of the session.
+        """
+        cost = self.model_cost(model or options.get("model") or "small")
+        if options.get("use_vad"):
+            cost *= self.VAD_COST_FACTOR
+        if options.get("enable_translation"):
+            cost += self.TRANSLATION_COST
+        return cost
+
+    def get_load(self):
+        """
+        Returns:
+            float: Summed cost of the connected sessions.
+        """
+        return sum(self.costs.values())
+
+    def fits(self, cost, load, num_clients):
+        """Whether a session of `cost` can be added to `num_clients` sessions costing `load` in total."""
+        if num_clients >= self.max_clients:
+            return False
+        if self.capacity is None or num_clients == 0:
+            return True     # a session costlier than the whole budget still runs on an idle server
+        return load + cost <= self.capacity
+
+    def get_wait_time(self, cost=None):
         """
         Calculates the estimated wait time for new clients based on the remaining connection times of current clients.
 
+        Without a cost this is the time until the first client leaves. With a cost, clients are assumed to leave in
+        the order their connection time runs out, and the wait lasts until enough of them are gone for the new
+        session to fit both the client limit and the capacity.
+
+        Args:
+            cost (float, optional): Estimated cost of the waiting session. Defaults to None.
+
         Returns:
             The estimated wait time in minutes for new clients to connect. Returns 0 if there are available slots.
         """
-        wait_time = None
-        for start_time in self.start_times.values():
-            current_client_time_remaining = self.max_connection_time - (time.time() - start_time)
-            if wait_time is None or current_client_time_remaining < wait_time:
-                wait_time = current_client_time_remaining
-        return wait_time / 60 if wait_time is not None else 0
+        now = time.time()
+        remaining = sorted(
+            (max(0.0, self.max_connection_time - (now - start_time)), self.costs.get(websocket, 0.0))
+            for websocket, start_time in self.start_times.items()
+        )
+        if cost is None:
+            return remaining[0][0] / 60 if remaining else 0
 
-    def is_server_full(self, websocket, options):
+        load = self.get_load()
+        num_clients = len(remaining)
+        wait_time = 0.0
+        for time_remaining, client_cost in remaining:
+            if self.fits(cost, load, num_clients):
+                break
+            wait_time = time_remaining
+            load -= client_cost
+            num_clients -= 1
+        return wait_time / 60
+
+    def downgrade_model(self, options, model=None):
+        """
+        Finds the largest model smaller than the requested one that fits the remaining capacity.
+
+        Args:
+            options (dict): Options sent by the client.
+            model (str, optional): Model to downgrade from. Defaults to the model in the options.
+
+        Returns:
+            str: The model to run instead, keeping an English-only variant, or None if none fits.
+        """
+        model = model or options.get("model") or "small"
+        requested_cost = self.model_cost(model)
+        english_only = str(model).endswith(".en")
+        load = self.get_load()
+        for candidate in self.DOWNGRADE_MODELS:
+            if english_only and candidate != "large-v3":
+                candidate += ".en"
+            candidate_cost = self.estimate_cost(options, candidate)
+            if self.model_cost(candidate) < requested_cost and self.fits(candidate_cost, load, len(self.clients)):
+                return candidate
+        return None
+
+    def is_server_full(self, websocket, options, model=None, allow_downgrade=True):
         """
         Checks if the server is at its maximum client capacity and sends a wait message to the client if necessary.
 
+        With a capacity, a session is also turned away when its estimated cost does not fit the remaining budget.
+        If the client set `allow_model_downgrade`, it is admitted with a smaller model that fits instead, written to
+        `options["model"]` and announced to the client with a warning.
+
         Args:
             websocket: The websocket of the client attempting to connect.
             options: A dictionary of options that may include the client's unique identifier.
+            model (str, optional): Model the server runs regardless of the options. Defaults to None.
+            allow_downgrade (bool, optional): Whether the server can run a smaller model than the requested one, False
+                                              for fixed models and backends without the standard model sizes.
 
         Returns:
             True if the server is full, False otherwise.
         """
-        if len(self.clients) >= self.max_clients:
-            wait_time = self.get_wait_time()
-            response = {"uid": options["uid"], "status": "WAIT", "message": wait_time}
-            websocket.send(json.dumps(response))
-            return True
-        return False
+        cost = self.estimate_cost(options, model)
+        if self.fits(cost, self.get_load(), len(self.clients)):
+            return False
+
+        if allow_downgrade and len(self.clients) < self.max_clients and options.get("allow_model_downgrade"):
+            downgraded = self.downgrade_model(options)
+            if downgraded is not None:
+                logging.info(
+                    f"Downgrading client '{options['uid']}' from model '{options.get('model')}' to '{downgraded}'"
+                )
+                websocket.send(json.dumps({
+                    "uid": options["uid"],
+                    "status": "WARNING",
+                    "message": f"Server is at capacity. Using model '{downgraded}' "
+                               f"instead of '{options.get('model')}'."
+                }))
+                options["model"] = downgraded
+                return False
+
+        wait_time = self.get_wait_time(cost)
+        response = {"uid": options["uid"], "status": "WAIT", "message": wait_time}
+        websocket.send(json.dumps(response))
+        metrics.CONNECTIONS_REJECTED.inc()
+        return True
 
     def is_client_timeout(self, websocket):
         """
@@ -114,10 +263,99 @@ class ClientManager:
         elapsed_time = time.time() - self.start_times[websocket]
         if elapsed_time >= self.max_connection_time:
             self.clients[websocket].disconnect()
+            metrics.CLIENT_TIMEOUTS.inc()
             logging.warning(f"Client with uid '{self.clients[websocket].client_uid}' disconnected due to overtime.")
             return True
         return False
 
+    def collect_metrics(self):
+        """
+        Sets the metrics read from the connected clients, run by the metrics registry on every scrape.
+        """
+        clients = list(self.clients.values())
+        metrics.CLIENTS.set(len(clients))
+        metrics.CLIENT_LAG_SECONDS.clear()
+        translation_queue_depth = 0
+        metrics.CLIENT_RTF.clear()
+        metrics.CLIENT_MIN_CHUNK_SECONDS.clear()
+        metrics.CLIENT_MAX_WINDOW_SECONDS.clear()
+        for client in clients:
+            metrics.CLIENT_LAG_SECONDS.set(client.get_lag(), client_uid=client.client_uid)
+            controller = client.window_controller
+            if controller is not None and controller.rtf is not None:
+                metrics.CLIENT_RTF.set(controller.rtf, client_uid=client.client_uid)
+                metrics.CLIENT_MIN_CHUNK_SECONDS.set(client.get_min_chunk_duration(), client_uid=client.client_uid)
+                metrics.CLIENT_MAX_WINDOW_SECONDS.set(controller.max_window, client_uid=client.client_uid)
+            if client.translation_queue is not None:
+                translation_queue_depth += client.translation_queue.qsize()
+        metrics.TRANSLATION_QUEUE_DEPTH.set(translation_queue_depth)
+
+
+class AsyncWebSocketBridge:
+    """
+    Adapts an asyncio websocket connection to the blocking `send`/`close` interface the backends expect.
+
+    Backends send results from executor or translation threads, so calls made off the event loop are
+    marshalled onto it and wait for the send to complete. Calls made on the loop itself are scheduled
+    as tasks so they never block it.
+    """
+
+    def __init__(self, websocket, loop):
+        self.websocket = websocket
+        self.loop = loop
+
+    def _in_loop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _run(self, coro):
+        if self._in_loop():
+            task = self.loop.create_task(coro)
+            task.add_done_callback(self._log_task_error)
+            return None
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    @staticmethod
+    def _log_task_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"[ERROR]: Websocket operation failed: {task.exception()}")
+
+    def send(self, message):
+        """
+        Sends a message to the client.
+
+        Args:
+            message (str or bytes): The message to send.
+        """
+        self._run(self.websocket.send(message))
+
+    def close(self):
+        """Closes the underlying websocket connection."""
+        self._run(self.websocket.close())
+
+
+class VoiceActivityState:
+    """
+    Server side voice activity tracking of a single connection.
+
+    The TensorRT backend runs VAD in the server to drop silent frames and to detect the end of speech. Each
+    connection gets its own detector state and silence counter, so one client going quiet never affects the
+    end of speech detection of another.
+    """
+    MAX_NO_VOICE_ACTIVITY_CHUNKS = 3
+
+    def __init__(self, detector, use_vad=True):
+        """
+        Args:
+            detector (VoiceActivityDetector): Detector tracking this connection's audio stream.
+            use_vad (bool, optional): Whether frames without voice activity are dropped. Defaults to True.
+        """
+        self.detector = detector
+        self.use_vad = use_vad
+        self.no_voice_activity_chunks = 0
+
 
 class BackendType(Enum):
     FASTER_WHISPER = "faster_whisper"
@@ -144,18 +382,36 @@ class BackendType(Enum):
 
 class TranscriptionServer:
     RATE = 16000
+    ASYNC_POLL_INTERVAL = 0.01
+    INGEST_WORKERS = 4
+    """Threads running server side VAD on incoming frames in async mode, apart from the transcription passes."""
 
     def __init__(self, translation_model_path: Optional[str] = None):
         self.client_manager = None
-        self.no_voice_activity_chunks = 0
-        self.use_vad = True
+        self.vad_model = None
+        self.vad_model_lock = threading.Lock()
+        self.vad_states = {}
+        self.audio_decoders = {}
         self.single_model = False
+        self.batch_inference = False
+        self.max_batch_size = 8
+        self.max_batch_wait_ms = 20
+        self.min_new_audio = 0.0
+        self.target_rtf = None
+        self.fair_scheduling = False
+        self.model_replicas = 1
+        self.replica_workers = 1
+        self.batch_vad = False
+        self.vad_batch_wait_ms = 2
+        self.model_registry = None
         self.translation_model_path = translation_model_path
+        self.inference_executor = None
+        self.ingest_executor = None
 
     def initialize_client(
         self, websocket, options, faster_whisper_custom_model_path,
         whisper_tensorrt_path, trt_multilingual, trt_py_session=False,
-        translation_model_path=None,
+        translation_model_path=None, start_thread=True,
     ):
         client: Optional[ServeClientBase] = None
 
@@ -179,6 +435,7 @@ class TranscriptionServer:
                 send_last_n_segments=options.get("send_last_n_segments", 10),
                 model_path=translation_model_path or self.translation_model_path,
             )
+            translation_client.delta_segments = options.get("delta_segments", False)
             
             # Start translation thread
             translation_thread = threading.Thread(
@@ -205,6 +462,9 @@ class TranscriptionServer:
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
+                    start_thread=start_thread,
+                    min_new_audio=self.min_new_audio,
+                    model_replicas=self.model_replicas,
                 )
                 logging.info("Running TensorRT backend.")
             except Exception as e:
@@ -232,6 +492,10 @@ class TranscriptionServer:
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
+                    start_thread=start_thread,
+                    vad_gate=self.create_vad_gate(options.get("use_vad")),
+                    min_new_audio=self.min_new_audio,
+                    model_replicas=self.model_replicas,
                 )
                 logging.info("Running OpenVINO backend.")
             except Exception as e:
@@ -260,14 +524,25 @@ class TranscriptionServer:
                     model=options["model"],
                     initial_prompt=options.get("initial_prompt"),
                     vad_parameters=options.get("vad_parameters"),
-                    use_vad=self.use_vad,
+                    use_vad=options.get("use_vad"),
                     single_model=self.single_model,
                     send_last_n_segments=options.get("send_last_n_segments", 10),
                     no_speech_thresh=options.get("no_speech_thresh", 0.45),
                     clip_audio=options.get("clip_audio", False),
                     same_output_threshold=options.get("same_output_threshold", 10),
                     cache_path=self.cache_path,
-                    translation_queue=translation_queue
+                    translation_queue=translation_queue,
+                    start_thread=start_thread,
+                    batch_inference=self.batch_inference,
+                    max_batch_size=self.max_batch_size,
+                    max_batch_wait_ms=self.max_batch_wait_ms,
+                    vad_gate=self.create_vad_gate(options.get("use_vad")),
+                    min_new_audio=self.min_new_audio,
+                    model_registry=self.model_registry,
+                    decoding_profile=options.get("decoding_profile"),
+                    commit_policy=options.get("commit_policy"),
+                    word_timestamps=options.get("word_timestamps", False),
+                    language_detection_seconds=options.get("language_detection_seconds", 2.0),
                 )
 
                 logging.info("Running faster_whisper backend.")
@@ -278,11 +553,89 @@ class TranscriptionServer:
         if client is None:
             raise ValueError(f"Backend type {self.backend.value} not recognised or not handled.")
 
+        client.delta_segments = options.get("delta_segments", False)
+        if self.target_rtf is not None:
+            client.window_controller = AdaptiveWindowController(self.target_rtf)
+        if self.fair_scheduling:
+            client.model_scheduler = client.get_model_scheduler()
+            client.priority = options.get("priority") or FairScheduler.DEFAULT_PRIORITY
+            if client.priority not in FairScheduler.PRIORITY_WEIGHTS:
+                logging.warning(f"Unknown priority '{client.priority}', using '{FairScheduler.DEFAULT_PRIORITY}'")
+                client.priority = FairScheduler.DEFAULT_PRIORITY
         if translation_client:
             client.translation_client = translation_client
             client.translation_thread = translation_thread
 
-        self.client_manager.add_client(websocket, client)
+        model = whisper_tensorrt_path if self.backend.is_tensorrt() else options.get("model")
+        self.client_manager.add_client(websocket, client, self.client_manager.estimate_cost(options, model))
+
+    def preload_faster_whisper_models(self, model_refs=None, custom_model_path=None):
+        """
+        Creates the faster_whisper model registry and prepares models before the first connection.
+
+        Every model is downloaded, converted, loaded and warmed up, so the first client asking for it gets
+        `SERVER_READY` as quickly as later ones. The loaded instances are only shared by clients in single model
+        mode, where the custom model is installed as the shared model, or with model replicas. Otherwise each
+        client keeps its own instance, and the preloaded one goes to the first client asking for it.
+
+        Args:
+            model_refs (list[str], optional): Model sizes, Hugging Face model ids or paths to CTranslate2 models.
+            custom_model_path (str, optional): The custom model passed with `-fw`, if any.
+        """
+        from whisper_live.backend.faster_whisper_backend import ServeClientFasterWhisper
+        from whisper_live.backend.model_registry import ModelRegistry
+
+        self.model_registry = ModelRegistry(
+            cache_path=self.cache_path, replicas=self.model_replicas, replica_workers=self.replica_workers
+        )
+        model_refs = list(model_refs or [])
+        if self.single_model and custom_model_path is not None and custom_model_path not in model_refs:
+            model_refs.append(custom_model_path)
+        try:
+            self.model_registry.preload(model_refs, shared=self.single_model or self.model_registry.pooled)
+        except Exception as e:
+            logging.error(f"[ERROR]: Failed to preload models: {e}")
+            return
+        if self.single_model and custom_model_path is not None and ServeClientFasterWhisper.SINGLE_MODEL is None:
+            ServeClientFasterWhisper.SINGLE_MODEL = self.model_registry.get(custom_model_path)
+        if model_refs:
+            logging.info(
+                f"Preloaded models: {self.model_registry.loaded_models + self.model_registry.spare_models}"
+            )
+
+    def get_vad_model(self):
+        """
+        Returns the VAD model shared by all connections, loading it on first use.
+
+        Connections only share the ONNX session; each keeps its own stream state in a `VoiceActivityDetector`.
+        With `batch_vad`, the model is wrapped in a `VoiceActivityDetectionService` that scores the frames of all
+        connections together.
+
+        Returns:
+            VoiceActivityDetection or VoiceActivityDetectionService: The shared model.
+        """
+        with self.vad_model_lock:
+            if self.vad_model is None:
+                if self.batch_vad:
+                    self.vad_model = VoiceActivityDetectionService(max_batch_wait_ms=self.vad_batch_wait_ms)
+                else:
+                    self.vad_model = VoiceActivityDetection()
+            return self.vad_model
+
+    def create_vad_gate(self, use_vad):
+        """
+        Creates the per-client VAD used to classify audio frames as they arrive, so silent clients do not
+        run transcription at all.
+
+        Args:
+            use_vad (bool): Whether the client enabled VAD.
+
+        Returns:
+            VoiceActivityDetector or None: The detector, or None if the client disabled VAD.
+        """
+        if not use_vad:
+            return None
+        return VoiceActivityDetector(frame_rate=self.RATE, model=self.get_vad_model())
 
     def get_audio_from_websocket(self, websocket):
         """
@@ -294,8 +647,20 @@ class TranscriptionServer:
         Returns:
             A numpy array containing the audio.
         """
-        frame_data = websocket.recv()
+        return self.parse_audio_frame(websocket.recv(), self.audio_decoders.get(websocket))
+
+    def parse_audio_frame(self, frame_data, decoder=None):
+        """
+        Converts a raw websocket message into an audio frame.
+
+        Args:
+            frame_data (bytes or str): The message received from the client.
+            decoder (AudioDecoder, optional): Decoder for the audio encoding the client negotiated. Defaults to
+                None, i.e. raw float32 samples.
 
+        Returns:
+            A numpy array containing the audio, or False if the client signalled the end of audio.
+        """
         # Android/iOS clients send a text "END_OF_AUDIO" frame when the
         # user stops streaming. websockets returns str for text frames, so
         # normalising both bytes and str here prevents numpy from raising
@@ -308,6 +673,8 @@ class TranscriptionServer:
         if frame_data == b"END_OF_AUDIO":
             return False
 
+        if decoder is not None:
+            return decoder.decode(frame_data)
         return np.frombuffer(frame_data, dtype=np.float32)
 
     def handle_new_connection(
@@ -318,19 +685,42 @@ class TranscriptionServer:
         trt_multilingual,
         trt_py_session=False,
         translation_model_path=None,
+        options=None,
+        start_thread=True,
     ):
         try:
             logging.info("New client connected")
-            options = websocket.recv()
+            if options is None:
+                options = websocket.recv()
             options = json.loads(options)
 
-            self.use_vad = options.get('use_vad')
-            if self.client_manager.is_server_full(websocket, options):
+            audio_encoding = options.get("audio_encoding") or "float32"
+            if audio_encoding not in AUDIO_ENCODINGS:
+                logging.error(f"Client {options.get('uid')} asked for unsupported audio_encoding '{audio_encoding}'")
+                websocket.send(json.dumps({
+                    "uid": options.get("uid"),
+                    "status": "ERROR",
+                    "message": f"unsupported audio_encoding '{audio_encoding}', expected one of "
+                               f"{list(AUDIO_ENCODINGS)}",
+                }))
+                websocket.close()
+                return False
+
+            # a custom or TensorRT model is served whatever the client asks for, so it is costed and never downgraded
+            fixed_model = whisper_tensorrt_path if self.backend.is_tensorrt() else faster_whisper_custom_model_path
+            allow_downgrade = self.backend.is_faster_whisper() and fixed_model is None
+            if self.client_manager.is_server_full(websocket, options, fixed_model, allow_downgrade):
                 websocket.close()
                 return False  # Indicates that the connection should not continue
 
+            # the connection state is only stored once the client is registered, so a failed setup leaves none behind
+            decoder = AudioDecoder(audio_encoding, rate=self.RATE)
+            vad_state = None
             if self.backend.is_tensorrt():
-                self.vad_detector = VoiceActivityDetector(frame_rate=self.RATE)
+                vad_state = VoiceActivityState(
+                    VoiceActivityDetector(frame_rate=self.RATE, model=self.get_vad_model()),
+                    use_vad=options.get('use_vad'),
+                )
             self.initialize_client(
                 websocket,
                 options,
@@ -339,7 +729,16 @@ class TranscriptionServer:
                 trt_multilingual,
                 trt_py_session=trt_py_session,
                 translation_model_path=translation_model_path or self.translation_model_path,
+                start_thread=start_thread,
             )
+            if not self.client_manager.get_client(websocket):
+                # initialize_client logged why the client could not be created
+                websocket.close()
+                return False
+
+            self.audio_decoders[websocket] = decoder
+            if vad_state is not None:
+                self.vad_states[websocket] = vad_state
             return True
         except json.JSONDecodeError:
             logging.error("Failed to decode JSON from client")
@@ -353,18 +752,32 @@ class TranscriptionServer:
 
     def process_audio_frames(self, websocket):
         frame_np = self.get_audio_from_websocket(websocket)
+        return self.handle_audio_frame(websocket, frame_np)
+
+    def handle_audio_frame(self, websocket, frame_np):
+        """
+        Routes a decoded audio frame to the client, applying server side VAD for the TensorRT backend.
+
+        Args:
+            websocket: The websocket associated with the client.
+            frame_np (numpy.ndarray or bool): The audio frame, or False when the client sent END_OF_AUDIO.
+
+        Returns:
+            bool: False if the connection should stop receiving audio, True otherwise.
+        """
         client = self.client_manager.get_client(websocket)
         if frame_np is False:
             if self.backend.is_tensorrt():
                 client.set_eos(True)
             return False
+        if not len(frame_np):
+            return True     # the Opus decoder is still filling its delay
 
         if self.backend.is_tensorrt():
             voice_active = self.voice_activity(websocket, frame_np)
             if voice_active:
-                self.no_voice_activity_chunks = 0
                 client.set_eos(False)
-            if self.use_vad and not voice_active:
+            if self.vad_states[websocket].use_vad and not voice_active:
                 return True
 
         client.add_frames(frame_np)
@@ -429,6 +842,131 @@ class TranscriptionServer:
                 websocket.close()
             del websocket
 
+    async def recv_audio_async(
+        self,
+        websocket,
+        backend: BackendType = BackendType.FASTER_WHISPER,
+        faster_whisper_custom_model_path=None,
+        whisper_tensorrt_path=None,
+        trt_multilingual=False,
+        trt_py_session=False,
+        translation_model_path=None,
+    ):
+        """
+        Asyncio counterpart of `recv_audio`.
+
+        Websocket I/O for every connection runs on the server's event loop, so no thread is held per
+        connection. Client initialization (model loading) runs on the loop's default executor, and each
+        transcription pass is scheduled on the bounded inference executor by `run_transcription_loop`
+        instead of a per-client `speech_to_text` thread. Frames that go through server side VAD run on the
+        separate ingest executor, so intake does not queue behind long passes. The wire protocol is unchanged.
+
+        Args:
+            websocket: The asyncio websocket connection for the client.
+            backend (BackendType): The backend to run the server with.
+            faster_whisper_custom_model_path (str): path to custom faster whisper model.
+            whisper_tensorrt_path (str): Required for tensorrt backend.
+            trt_multilingual(bool): Only used for tensorrt, True if multilingual model.
+        """
+        loop = asyncio.get_running_loop()
+        bridge = AsyncWebSocketBridge(websocket, loop)
+        self.backend = backend
+        try:
+            options = await websocket.recv()
+        except ConnectionClosed:
+            logging.info("Connection closed by client")
+            return
+
+        connected = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.handle_new_connection,
+                bridge,
+                faster_whisper_custom_model_path,
+                whisper_tensorrt_path,
+                trt_multilingual,
+                trt_py_session=trt_py_session,
+                translation_model_path=translation_model_path,
+                options=options,
+                start_thread=False,
+            )
+        )
+        client = self.client_manager.get_client(bridge)
+        if not connected or not client:
+            return
+
+        transcription_task = loop.create_task(self.run_transcription_loop(client))
+        try:
+            while not self.client_manager.is_client_timeout(bridge):
+                frame_np = self.parse_audio_frame(await websocket.recv(), self.audio_decoders.get(bridge))
+                if self.backend.is_tensorrt() or client.vad_gate is not None:
+                    # server side VAD runs a model, keep it off the event loop
+                    keep_receiving = await loop.run_in_executor(
+                        self.ingest_executor, self.handle_audio_frame, bridge, frame_np
+                    )
+                else:
+                    keep_receiving = self.handle_audio_frame(bridge, frame_np)
+                if not keep_receiving:
+                    break
+        except ConnectionClosed:
+            logging.info("Connection closed by client")
+        except Exception as e:
+            logging.error(f"Unexpected error: {str(e)}")
+        finally:
+            if self.client_manager.get_client(bridge):
+                await loop.run_in_executor(None, self.cleanup, bridge)
+                await websocket.close()
+            transcription_task.cancel()
+
+    async def run_transcription_loop(self, client):
+        """
+        Drives a client's transcription passes on the inference executor until the client exits.
+
+        Between passes the task waits on an `asyncio.Event` that the client sets whenever audio arrives, so idle
+        connections do not poll.
+
+        Args:
+            client (ServeClientBase): The client whose buffered audio should be transcribed.
+        """
+        loop = asyncio.get_running_loop()
+        audio_event = asyncio.Event()
+        client.on_wakeup = lambda: loop.call_soon_threadsafe(audio_event.set)
+        while not client.exit:
+            try:
+                wait_time = await loop.run_in_executor(self.inference_executor, client.run_transcription_step)
+            except Exception as e:
+                logging.error(f"[ERROR]: Transcription pass failed: {e}")
+                wait_time = self.ASYNC_POLL_INTERVAL
+            deadline = None if wait_time is None else loop.time() + wait_time
+            while True:
+                audio_event.clear()
+                if client.wait_for_audio(timeout=0):
+                    break
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(audio_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+        logging.info("Exiting transcription task")
+
+    async def serve_async(self, host, port, handler):
+        """
+        Serves websocket connections with `handler` on an asyncio event loop until cancelled.
+
+        Args:
+            host (str): The host address to bind the server.
+            port (int): The port number to bind the server.
+            handler (coroutine function): Connection handler, e.g. a partial of `recv_audio_async`.
+        """
+        try:
+            from websockets.asyncio.server import serve as serve_asyncio
+        except ImportError:    # websockets < 13
+            from websockets.server import serve as serve_asyncio
+        async with serve_asyncio(handler, host, port):
+            await asyncio.Future()    # run forever
+
     def run(
         self,
         host,
@@ -443,6 +981,22 @@ class TranscriptionServer:
         max_connection_time=600,
         cache_path="~/.cache/whisper-live/",
         translation_model_path=None,
+        async_mode=False,
+        inference_workers=None,
+        batch_inference=False,
+        max_batch_size=8,
+        max_batch_wait_ms=20,
+        min_new_audio=0.0,
+        batch_vad=False,
+        vad_batch_wait_ms=2,
+        preload_models=None,
+        metrics_port=None,
+        trace_path=None,
+        target_rtf=None,
+        capacity=None,
+        fair_scheduling=False,
+        model_replicas=1,
+        replica_workers=1,
     ):
         """
         Run the transcription server.
@@ -450,11 +1004,59 @@ class TranscriptionServer:
         Args:
             host (str): The host address to bind the server.
             port (int): The port number to bind the server.
+            async_mode (bool): Serve all connections from a single asyncio event loop instead of one thread
+                per connection, running transcription passes on a bounded executor.
+            inference_workers (int): Maximum number of concurrent transcription passes in async mode. Defaults
+                to the `ThreadPoolExecutor` default.
+            batch_inference (bool): In single model mode with the faster_whisper backend, batch the pending audio of
+                all clients into shared encoder and decoder calls instead of serializing clients on the model.
+            max_batch_size (int): Maximum number of client windows per batch.
+            max_batch_wait_ms (float): Maximum time in milliseconds a window waits for others to join its batch.
+            min_new_audio (float): Seconds of new audio a client must receive before its audio is transcribed
+                again. Higher values trade latency for fewer transcription passes.
+            batch_vad (bool): Score the VAD frames of all connections in shared batched model calls.
+            vad_batch_wait_ms (float): Maximum time in milliseconds a VAD frame waits for frames of other
+                connections with `batch_vad`.
+            preload_models (list[str]): faster_whisper models (sizes, Hugging Face ids or paths) to load and warm
+                up before the server starts listening. Connections only share the preloaded instance in single
+                model mode or with model replicas, otherwise each loads its own from the prepared files. The
+                custom model is always preloaded in single model mode.
+            metrics_port (int): Serve latency, throughput and per client lag metrics in the Prometheus text format
+                at `/metrics` on this port. Defaults to no metrics endpoint.
+            trace_path (str): Record the duration of every pipeline stage and write it to this file as Chrome trace
+                JSON when the server exits. Defaults to no tracing.
+            target_rtf (float): Adapt the pacing of every connection to the real-time factor of its transcription
+                passes. Above this factor, passes wait for more audio and windows are capped shorter, see
+                `AdaptiveWindowController`. Defaults to fixed pacing.
+            capacity (float): Inference budget of the server in cost units, relative to a `tiny` session. Clients
+                are admitted while the estimated cost of all sessions, from their model size, VAD and translation
+                options, fits the budget. Defaults to limiting the number of clients only.
+            fair_scheduling (bool): Take turns between the clients of a shared model by deficit round robin over
+                the audio of their windows, weighted by their `priority` tier, instead of in the order they grab
+                its lock. See `FairScheduler`. Does not apply to `batch_inference`, which runs clients together.
+            model_replicas (int): Instances of every model that clients share in a `ModelPool`, each pass running on
+                the least loaded one. With more than 1, clients asking for the same model share its replicas
+                instead of loading an instance each, also without `single_model`. 0 sizes the pool from the CPU
+                cores and available memory, with the faster_whisper backend only. Defaults to 1.
+            replica_workers (int): faster_whisper only. Passes every replica runs in parallel, through CTranslate2
+                workers (`num_workers`) that share the weights of the replica. Defaults to 1.
         """
         self.cache_path = cache_path
+        self.min_new_audio = min_new_audio
+        self.target_rtf = target_rtf
+        self.fair_scheduling = fair_scheduling
+        self.model_replicas = model_replicas
+        self.replica_workers = replica_workers
+        self.batch_vad = batch_vad
+        self.vad_batch_wait_ms = vad_batch_wait_ms
         if translation_model_path is not None:
             self.translation_model_path = translation_model_path
-        self.client_manager = ClientManager(max_clients, max_connection_time)
+        self.client_manager = ClientManager(max_clients, max_connection_time, capacity)
+        if trace_path is not None:
+            tracing.enable(trace_path)
+        if metrics_port is not None:
+            metrics.REGISTRY.add_collector(self.client_manager.collect_metrics)
+            metrics.start_http_server(metrics_port)
         if faster_whisper_custom_model_path is not None and not os.path.exists(faster_whisper_custom_model_path):
             raise ValueError(f"Custom faster_whisper model '{faster_whisper_custom_model_path}' is not a valid path.")
         if whisper_tensorrt_path is not None and not os.path.exists(whisper_tensorrt_path):
@@ -463,21 +1065,45 @@ class TranscriptionServer:
             if faster_whisper_custom_model_path or whisper_tensorrt_path:
                 logging.info("Custom model option was provided. Switching to single model mode.")
                 self.single_model = True
-                # TODO: load model initially
             else:
                 logging.info("Single model mode currently only works with custom models.")
+        if batch_inference:
+            if self.single_model and backend == BackendType.FASTER_WHISPER.value:
+                self.batch_inference = True
+                self.max_batch_size = max_batch_size
+                self.max_batch_wait_ms = max_batch_wait_ms
+            else:
+                logging.info("Batched inference requires single model mode with the faster_whisper backend.")
         if not BackendType.is_valid(backend):
             raise ValueError(f"{backend} is not a valid backend type. Choose backend from {BackendType.valid_types()}")
+        if backend == BackendType.FASTER_WHISPER.value:
+            self.preload_faster_whisper_models(preload_models, faster_whisper_custom_model_path)
+        handler_kwargs = dict(
+            backend=BackendType(backend),
+            faster_whisper_custom_model_path=faster_whisper_custom_model_path,
+            whisper_tensorrt_path=whisper_tensorrt_path,
+            trt_multilingual=trt_multilingual,
+            trt_py_session=trt_py_session,
+            translation_model_path=self.translation_model_path,
+        )
+        if async_mode:
+            self.inference_executor = ThreadPoolExecutor(
+                max_workers=inference_workers, thread_name_prefix="inference"
+            )
+            self.ingest_executor = ThreadPoolExecutor(
+                max_workers=self.INGEST_WORKERS, thread_name_prefix="ingest"
+            )
+            try:
+                asyncio.run(
+                    self.serve_async(host, port, functools.partial(self.recv_audio_async, **handler_kwargs))
+                )
+            finally:
+                self.inference_executor.shutdown(wait=False)
+                self.ingest_executor.shutdown(wait=False)
+            return
+
         with serve(
-            functools.partial(
-                self.recv_audio,
-                backend=BackendType(backend),
-                faster_whisper_custom_model_path=faster_whisper_custom_model_path,
-                whisper_tensorrt_path=whisper_tensorrt_path,
-                trt_multilingual=trt_multilingual,
-                trt_py_session=trt_py_session,
-                translation_model_path=self.translation_model_path,
-            ),
+            functools.partial(self.recv_audio, **handler_kwargs),
             host,
             port
         ) as server:
@@ -487,10 +1113,10 @@ class TranscriptionServer:
         """
         Evaluates the voice activity in a given audio frame and manages the state of voice activity detection.
 
-        This method uses the configured voice activity detection (VAD) model to assess whether the given audio frame
+        This method uses the connection's voice activity detection (VAD) state to assess whether the given audio frame
         contains speech. If the VAD model detects no voice activity for more than three consecutive frames,
-        it sets an end-of-speech (EOS) flag for the associated client. This method aims to efficiently manage
-        speech detection to improve subsequent processing steps.
+        it sets an end-of-speech (EOS) flag for the associated client. It never blocks, so the receive loop keeps
+        taking frames while the client is silent.
 
         Args:
             websocket: The websocket associated with the current client. Used to retrieve the client object
@@ -503,14 +1129,15 @@ class TranscriptionServer:
                 after detecting no voice activity for more than three consecutive frames, it also triggers the
                 end-of-speech (EOS) flag for the client.
         """
-        if not self.vad_detector(frame_np):
-            self.no_voice_activity_chunks += 1
-            if self.no_voice_activity_chunks > 3:
+        vad_state = self.vad_states[websocket]
+        if not vad_state.detector(frame_np):
+            vad_state.no_voice_activity_chunks += 1
+            if vad_state.no_voice_activity_chunks > vad_state.MAX_NO_VOICE_ACTIVITY_CHUNKS:
                 client = self.client_manager.get_client(websocket)
                 if not client.eos:
                     client.set_eos(True)
-                time.sleep(0.1)    # Sleep 100m; wait some voice activity.
             return False
+        vad_state.no_voice_activity_chunks = 0
         return True
 
     def cleanup(self, websocket):
@@ -529,3 +1156,5 @@ class TranscriptionServer:
             if hasattr(client, 'translation_thread') and client.translation_thread:
                 client.translation_thread.join(timeout=2.0)
             self.client_manager.remove_client(websocket)
+        self.vad_states.pop(websocket, None)
+        self.audio_decoders.pop(websocket, None)
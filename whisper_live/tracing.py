@@ -0,0 +1,163 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+
+class Tracer:
+    """
+    Records spans as complete events of the Chrome trace format, which chrome://tracing and Perfetto open as a
+    flame chart per thread.
+
+    Spans started while another span is open on the same thread inherit its arguments, so the session id and
+    window length set on a transcription pass are attached to the encoder and decoder spans it contains.
+    """
+
+    def __init__(self, path, max_events=1000000):
+        """
+        Args:
+            path (str): File the trace is written to by `save`.
+            max_events (int, optional): Events kept in memory, later ones are dropped and counted. Defaults to
+                1000000, a few hundred megabytes.
+        """
+        self.path = path
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self.thread_names = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.pid = os.getpid()
+
+    def push(self, args):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        args = {**stack[-1], **args} if stack else args
+        stack.append(args)
+        return args
+
+    def pop(self):
+        self.local.stack.pop()
+
+    def record(self, name, start_ns, end_ns, args):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": "whisper_live",
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self.pid,
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self.lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+            if thread.ident not in self.thread_names:
+                self.thread_names[thread.ident] = thread.name
+
+    def save(self):
+        """
+        Writes the spans recorded so far to `path`.
+        """
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+            dropped = self.dropped
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        if dropped:
+            logging.warning(f"Trace buffer was full, dropped {dropped} spans")
+        logging.info(f"Wrote {len(events)} spans to {self.path}")
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.args = self.tracer.push(self.args)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer.pop()
+        self.tracer.record(self.name, self.start, end, self.args)
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+_tracer = None
+
+
+def span(name, **args):
+    """
+    Times a stage of the pipeline, as `with tracing.span("encode", frames=3000):`. Returns a shared no-op
+    context manager while tracing is disabled, so spans in hot paths cost a global lookup and a call.
+
+    Args:
+        name (str): Name of the stage.
+        **args: Arguments shown with the span, inherited by the spans it contains.
+    """
+    if _tracer is None:
+        return NULL_SPAN
+    return Span(_tracer, name, args)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def enable(path, max_events=1000000):
+    """
+    Starts recording spans, which are written to `path` by `disable` or when the process exits.
+
+    Args:
+        path (str): File to write the Chrome trace JSON to.
+        max_events (int, optional): See `Tracer`.
+
+    Returns:
+        Tracer: The active tracer.
+    """
+    global _tracer
+    if _tracer is not None:
+        disable()
+    _tracer = Tracer(path, max_events)
+    atexit.register(_tracer.save)
+    return _tracer
+
+
+def disable():
+    """
+    Stops recording spans and writes the trace file.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        atexit.unregister(tracer.save)
+        tracer.save()
@@ -0,0 +1,111 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EncoderOutputCache:
+    """
+    Per-stream cache of Whisper encoder outputs, keyed by where the window starts in the stream and a hash of
+    its log-mel frames.
+
+    A streaming client transcribes the same audio again whenever its loop runs before new audio arrived, e.g.
+    while it waits for an unfinished segment to repeat often enough to be committed, or during pauses. Those
+    windows have exactly the same features, so their encoder output is reused instead of computed again.
+    Optionally, a window with the same key as a cached one, i.e. the same start, that only grew by up to
+    `max_new_frames` frames also reuses the cached output; the decoder then does not see the newest audio of
+    that pass, which is picked up by the next pass that grows the window further.
+
+    A cache belongs to a single audio stream and must not be shared between clients.
+    """
+
+    def __init__(self, max_new_frames=0, max_entries=2):
+        """
+        Args:
+            max_new_frames (int, optional): How many frames (10 ms each) a window may have grown since a cached
+                window with the same start and still reuse its encoder output. Defaults to 0, i.e. only identical
+                windows are reused.
+            max_entries (int, optional): Number of windows kept, for audio spanning more than one 30 second
+                window. Defaults to 2.
+        """
+        self.max_new_frames = max_new_frames
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        """Cached `(content_frames, digest, encoder_output)` per window key."""
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(features, content_frames):
+        """
+        Hashes the content frames of a window, the rest of a padded window is always zero.
+        """
+        content = np.ascontiguousarray(features[..., :content_frames])
+        return hashlib.blake2b(memoryview(content), digest_size=16).digest()
+
+    def lookup(self, window_key, features, content_frames):
+        """
+        Returns the cached encoder output for a window, if any.
+
+        Args:
+            window_key (hashable): Where the window starts in the stream, e.g. its absolute start sample.
+            features (np.ndarray): Padded log-mel frames of the window.
+            content_frames (int): Number of frames of `features` that hold audio.
+
+        Returns:
+            tuple: `(encoder_output, digest)`, where `encoder_output` is None on a miss and `digest` can be passed
+                to `store`.
+        """
+        entry = self.entries.get(window_key)
+        if entry is not None:
+            cached_frames, cached_digest, encoder_output = entry
+            if 0 < content_frames - cached_frames <= self.max_new_frames:
+                self.near_hits += 1
+                self.entries.move_to_end(window_key)
+                return encoder_output, None
+        digest = self.digest(features, content_frames)
+        if entry is not None and entry[0] == content_frames and entry[1] == digest:
+            self.hits += 1
+            self.entries.move_to_end(window_key)
+            return entry[2], digest
+        self.misses += 1
+        return None, digest
+
+    def store(self, window_key, content_frames, digest, encoder_output):
+        """
+        Caches the encoder output of a window.
+
+        Args:
+            window_key (hashable): Where the window starts in the stream, as passed to `lookup`.
+            content_frames (int): Number of frames of the window that hold audio.
+            digest (bytes): Hash returned by `lookup` for this window.
+            encoder_output (ctranslate2.StorageView): The encoder output.
+        """
+        self.entries[window_key] = (content_frames, digest, encoder_output)
+        self.entries.move_to_end(window_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def reset(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        """
+        float: Share of lookups that reused an encoder output.
+        """
+        lookups = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / lookups if lookups else 0.0
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Counts of exact hits, near hits and misses, and the hit rate.
+        """
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,108 @@
+import numpy as np
+
+from faster_whisper.feature_extractor import FeatureExtractor
+
+
+class MelSpectrogramCache:
+    """
+    Per-stream cache of log-mel frames for `FeatureExtractor`, keyed by absolute sample position.
+
+    Consecutive streaming windows overlap almost entirely, so most STFT frames of a window were already
+    computed for the previous one. A frame only depends on the 400 samples around its center, except for
+    the frames near the window edges that see reflection or zero padding. Those interior frames are cached
+    as un-normalized `log10` mel values, keyed by the absolute sample index of their center, and reused
+    whenever a later window puts a frame at the same center. Edge frames and new frames are computed on
+    every call, then the window-wide dynamic range clamp and scaling are applied exactly as in
+    `FeatureExtractor.__call__`.
+
+    A cache belongs to a single audio stream and must not be shared between clients.
+    """
+
+    def __init__(self, feature_extractor: FeatureExtractor):
+        """
+        Args:
+            feature_extractor (FeatureExtractor): The model's feature extractor.
+        """
+        self.feature_extractor = feature_extractor
+        self.window = np.hanning(feature_extractor.n_fft + 1)[:-1].astype("float32")
+        self.first_center = None
+        """Absolute sample index of the center of the first cached frame."""
+        self.frames = None
+        """Cached `log10` mel frames, shape (n_mels, num_frames), one every `hop_length` samples."""
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self):
+        self.first_center = None
+        self.frames = None
+
+    def log_mel_frames(self, padded, frame_indices):
+        """
+        Computes clipped `log10` mel values for the given frames of a padded waveform.
+
+        Args:
+            padded (np.ndarray): Waveform after the zero and reflection padding of `FeatureExtractor`.
+            frame_indices (np.ndarray): Frame indices into `padded`.
+
+        Returns:
+            np.ndarray: Array of shape (n_mels, len(frame_indices)).
+        """
+        n_fft = self.feature_extractor.n_fft
+        hop_length = self.feature_extractor.hop_length
+        starts = frame_indices * hop_length
+        windows = padded[starts[:, None] + np.arange(n_fft)] * self.window
+        stft = np.fft.rfft(windows, n=n_fft, axis=-1).astype("complex64")
+        magnitudes = np.abs(stft.T) ** 2
+        mel_spec = self.feature_extractor.mel_filters @ magnitudes
+        return np.log10(np.clip(mel_spec, a_min=1e-10, a_max=None))
+
+    def __call__(self, waveform, start_sample, padding=160):
+        """
+        Computes the log-mel spectrogram of `waveform`, reusing frames cached from earlier windows.
+
+        Args:
+            waveform (np.ndarray): The audio window.
+            start_sample (int): Absolute sample index of the first sample of `waveform` in the stream.
+            padding (int, optional): Zero padding appended to the waveform. Defaults to 160.
+
+        Returns:
+            np.ndarray: The same features as `FeatureExtractor.__call__(waveform, padding)`.
+        """
+        n_fft = self.feature_extractor.n_fft
+        hop_length = self.feature_extractor.hop_length
+        num_samples = waveform.shape[0]
+        if num_samples < 2 * n_fft:
+            return self.feature_extractor(waveform, padding=padding)
+
+        waveform = waveform.astype(np.float32, copy=False)
+        half_window = n_fft // 2
+        padded = np.pad(np.pad(waveform, (0, padding)), half_window, mode="reflect")
+        num_frames = (padded.shape[0] - n_fft) // hop_length
+
+        # frames whose samples all lie within the real audio of this window
+        first_interior = -(-half_window // hop_length)
+        last_interior = (num_samples - half_window) // hop_length
+        interior = np.arange(first_interior, last_interior + 1)
+        centers = start_sample + interior * hop_length
+
+        interior_frames = np.empty((self.feature_extractor.mel_filters.shape[0], interior.shape[0]), dtype=np.float32)
+        cached = np.zeros(interior.shape[0], dtype=bool)
+        if self.frames is not None and (centers[0] - self.first_center) % hop_length == 0:
+            cache_index = (centers - self.first_center) // hop_length
+            cached = (cache_index >= 0) & (cache_index < self.frames.shape[1])
+            interior_frames[:, cached] = self.frames[:, cache_index[cached]]
+        if not cached.all():
+            interior_frames[:, ~cached] = self.log_mel_frames(padded, interior[~cached])
+        self.hits += int(cached.sum())
+        self.misses += int((~cached).sum())
+        self.first_center = int(centers[0])
+        self.frames = interior_frames
+
+        log_spec = np.empty((interior_frames.shape[0], num_frames), dtype=np.float32)
+        log_spec[:, first_interior:last_interior + 1] = interior_frames
+        edges = np.r_[0:first_interior, last_interior + 1:num_frames]
+        log_spec[:, edges] = self.log_mel_frames(padded, edges)
+
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        return log_spec
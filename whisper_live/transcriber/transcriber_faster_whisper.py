@@ -6,10 +6,10 @@ import logging
 import os
 import zlib
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, fields
 from inspect import signature
 from math import ceil
-from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+from typing import BinaryIO, Hashable, Iterable, List, Optional, Tuple, Union
 from warnings import warn
 
 import ctranslate2
@@ -30,6 +30,10 @@ from faster_whisper.vad import (
     merge_segments,
 )
 
+from whisper_live import tracing
+from whisper_live.transcriber.encoder_cache import EncoderOutputCache
+from whisper_live.transcriber.mel_cache import MelSpectrogramCache
+
 
 @dataclass
 class Word:
@@ -98,6 +102,8 @@ class TranscriptionOptions:
     clip_timestamps: Union[str, List[float]]
     hallucination_silence_threshold: Optional[float]
     hotwords: Optional[str]
+    max_fallbacks: Optional[int] = None
+    fallback_completed_only: bool = False
 
 
 @dataclass
@@ -109,6 +115,95 @@ class TranscriptionInfo:
     all_language_probs: Optional[List[Tuple[str, float]]]
     transcription_options: TranscriptionOptions
     vad_options: VadOptions
+    num_fallbacks: int = 0
+
+
+class DecodingContext:
+    """Decoding state of one audio stream that is transcribed window by window.
+
+    Successive windows of a stream are decoded with the same task, language and decoding
+    options, so the `Tokenizer`, the suppressed tokens and the encoded initial prompt are
+    built once here instead of on every `transcribe` call. The context also keeps the
+    tokens of the segments the caller committed, which are used as the prompt of later
+    windows in place of text that is no longer part of the audio being decoded.
+    """
+
+    def __init__(self, model: "WhisperModel", max_history_tokens: Optional[int] = None):
+        """
+        Args:
+          model: The model the stream is transcribed with.
+          max_history_tokens: Maximum number of committed tokens kept as prompt. Defaults
+            to the longest prompt the model accepts.
+        """
+        self.model = model
+        self.max_prompt_tokens = model.max_length // 2 - 1
+        self.max_history_tokens = min(
+            max_history_tokens or self.max_prompt_tokens, self.max_prompt_tokens
+        )
+        self.tokenizers = {}
+        self.suppressed_tokens = {}
+        self.initial_prompts = {}
+        self.history: List[int] = []
+
+    def get_tokenizer(self, task: str, language: Optional[str]) -> Tokenizer:
+        key = (task, language)
+        if key not in self.tokenizers:
+            self.tokenizers[key] = Tokenizer(
+                self.model.hf_tokenizer,
+                self.model.model.is_multilingual,
+                task=task,
+                language=language,
+            )
+        return self.tokenizers[key]
+
+    def get_suppressed_tokens(
+        self, tokenizer: Tokenizer, suppress_tokens: List[int]
+    ) -> Optional[List[int]]:
+        key = (tokenizer.task, tokenizer.language, tuple(suppress_tokens))
+        if key not in self.suppressed_tokens:
+            self.suppressed_tokens[key] = get_suppressed_tokens(
+                tokenizer, list(suppress_tokens)
+            )
+        return self.suppressed_tokens[key]
+
+    def get_prompt_tokens(
+        self, initial_prompt: Optional[Union[str, Iterable[int]]] = None
+    ) -> Optional[List[int]]:
+        """Returns the initial prompt followed by the most recent committed tokens.
+
+        Arguments:
+          initial_prompt: The caller's initial prompt, as text or token ids.
+
+        Returns:
+          Token ids to pass as `initial_prompt`, or None if there is no prompt.
+        """
+        if initial_prompt is None:
+            prompt = []
+        elif isinstance(initial_prompt, str):
+            if initial_prompt not in self.initial_prompts:
+                self.initial_prompts[initial_prompt] = self.model.hf_tokenizer.encode(
+                    " " + initial_prompt.strip(), add_special_tokens=False
+                ).ids
+            prompt = self.initial_prompts[initial_prompt]
+        else:
+            prompt = list(initial_prompt)
+        history_budget = max(0, self.max_prompt_tokens - len(prompt))
+        history = self.history[-history_budget:] if history_budget else []
+        prompt = prompt + history
+        return prompt or None
+
+    def commit(self, tokens: List[int]) -> None:
+        """Appends the tokens of a committed segment to the prompt history."""
+        self.history.extend(tokens)
+        if len(self.history) > self.max_history_tokens:
+            del self.history[: len(self.history) - self.max_history_tokens]
+
+    def commit_text(self, text: str) -> None:
+        """Appends committed text that does not end at a segment boundary to the prompt history."""
+        self.commit(self.model.hf_tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def reset_history(self) -> None:
+        self.history = []
 
 
 class BatchedInferencePipeline:
@@ -746,6 +841,13 @@ class WhisperModel:
         hotwords: Optional[str] = None,
         language_detection_threshold: Optional[float] = 0.5,
         language_detection_segments: int = 1,
+        mel_cache: Optional[MelSpectrogramCache] = None,
+        stream_offset: int = 0,
+        max_fallbacks: Optional[int] = None,
+        fallback_completed_only: bool = False,
+        decoding_context: Optional[DecodingContext] = None,
+        encoder_cache: Optional[EncoderOutputCache] = None,
+        min_language_probability: Optional[float] = None,
     ) -> Tuple[Iterable[Segment], TranscriptionInfo]:
         """Transcribes an input file.
 
@@ -815,6 +917,26 @@ class WhisperModel:
           language_detection_threshold: If the maximum probability of the language tokens is higher
            than this value, the language is detected.
           language_detection_segments: Number of segments to consider for the language detection.
+          mel_cache: Cache of log-mel frames for the stream `audio` was cut from. Frames computed
+            for earlier overlapping windows of the stream are reused instead of recomputed.
+          stream_offset: Sample index of the first sample of `audio` within the stream, used to
+            look up frames in `mel_cache`.
+          max_fallbacks: Maximum number of temperature fallbacks per window. If not set, every
+            temperature in `temperature` may be tried.
+          fallback_completed_only: Only fall back if the window contains a completed segment,
+            i.e. a segment followed by another one. Windows whose only segment may still be cut
+            off by the end of the audio keep their first decoding, for streaming callers that
+            decode the same audio again once more of it has arrived.
+          decoding_context: Decoding state of the stream `audio` was cut from. Reuses its
+            tokenizer, suppressed tokens and encoded `initial_prompt`, and appends the tokens
+            of the segments committed so far to the prompt. Ignored if `multilingual` is set.
+          encoder_cache: Encoder outputs of earlier windows of the stream `audio` was cut from,
+            keyed by their position given by `stream_offset` and the hash of their features.
+            A window with the same features as a cached one reuses its encoder output instead
+            of running the encoder.
+          min_language_probability: If the language is detected with a lower probability than
+            this value, the audio is not decoded and an empty list of segments is returned
+            along with the detection result.
         Returns:
           A tuple with:
 
@@ -872,7 +994,22 @@ class WhisperModel:
             speech_chunks = None
         if audio.shape[0] == 0:
             return None, None
-        features = self.feature_extractor(audio, chunk_length=chunk_length)
+        with tracing.span("extract_features", samples=audio.shape[0]):
+            features = self._extract_features(
+                audio, chunk_length, mel_cache, stream_offset, speech_chunks
+            )
+
+        # Identifies where the features come from in the stream. With VAD the speech chunk starts
+        # are included, so only windows whose last chunk grew share a key.
+        encoder_cache_key = None
+        if encoder_cache is not None and chunk_length is None:
+            if speech_chunks is None:
+                encoder_cache_key = stream_offset
+            else:
+                encoder_cache_key = (
+                    stream_offset,
+                    tuple(chunk["start"] for chunk in speech_chunks),
+                )
 
         encoder_output = None
         all_language_probs = None
@@ -894,15 +1031,27 @@ class WhisperModel:
                     if start_timestamp * self.frames_per_second < content_frames
                     else 0
                 )
-                (
-                    language,
-                    language_probability,
-                    all_language_probs,
-                ) = self.detect_language(
-                    features=features[..., seek:],
-                    language_detection_segments=language_detection_segments,
-                    language_detection_threshold=language_detection_threshold,
+                # the first window is encoded once, for detection and for decoding
+                segment_size = min(
+                    self.feature_extractor.nb_max_frames, content_frames - seek
+                )
+                encoder_output = self._encode_cached(
+                    pad_or_trim(features[:, seek : seek + segment_size]),
+                    segment_size,
+                    encoder_cache if encoder_cache_key is not None else None,
+                    (encoder_cache_key, seek),
                 )
+                with tracing.span("detect_language"):
+                    (
+                        language,
+                        language_probability,
+                        all_language_probs,
+                    ) = self.detect_language(
+                        features=features[..., seek:],
+                        language_detection_segments=language_detection_segments,
+                        language_detection_threshold=language_detection_threshold,
+                        encoder_output=encoder_output,
+                    )
 
                 self.logger.info(
                     "Detected language '%s' with probability %.2f",
@@ -919,12 +1068,19 @@ class WhisperModel:
 
             language_probability = 1
 
-        tokenizer = Tokenizer(
-            self.hf_tokenizer,
-            self.model.is_multilingual,
-            task=task,
-            language=language,
-        )
+        if multilingual:
+            # the tokenizer language is switched per window
+            decoding_context = None
+        if decoding_context is not None:
+            tokenizer = decoding_context.get_tokenizer(task, language)
+            initial_prompt = decoding_context.get_prompt_tokens(initial_prompt)
+        else:
+            tokenizer = Tokenizer(
+                self.hf_tokenizer,
+                self.model.is_multilingual,
+                task=task,
+                language=language,
+            )
 
         options = TranscriptionOptions(
             beam_size=beam_size,
@@ -945,7 +1101,11 @@ class WhisperModel:
             prefix=prefix,
             suppress_blank=suppress_blank,
             suppress_tokens=(
-                get_suppressed_tokens(tokenizer, suppress_tokens)
+                (
+                    decoding_context.get_suppressed_tokens(tokenizer, suppress_tokens)
+                    if decoding_context is not None
+                    else get_suppressed_tokens(tokenizer, suppress_tokens)
+                )
                 if suppress_tokens
                 else suppress_tokens
             ),
@@ -959,26 +1119,409 @@ class WhisperModel:
             clip_timestamps=clip_timestamps,
             hallucination_silence_threshold=hallucination_silence_threshold,
             hotwords=hotwords,
+            max_fallbacks=max_fallbacks,
+            fallback_completed_only=fallback_completed_only,
         )
 
-        segments = self.generate_segments(
-            features, tokenizer, options, log_progress, encoder_output
+        info = TranscriptionInfo(
+            language=language,
+            language_probability=language_probability,
+            duration=duration,
+            duration_after_vad=duration_after_vad,
+            transcription_options=options,
+            vad_options=vad_parameters,
+            all_language_probs=all_language_probs,
         )
 
+        if (
+            min_language_probability is not None
+            and language_probability < min_language_probability
+        ):
+            return [], info
+
+        with tracing.span("generate_segments", frames=features.shape[-1] - 1):
+            segments = self.generate_segments(
+                features,
+                tokenizer,
+                options,
+                log_progress,
+                encoder_output,
+                info,
+                encoder_cache if encoder_cache_key is not None else None,
+                encoder_cache_key,
+            )
+
         if speech_chunks:
             segments = restore_speech_timestamps(segments, speech_chunks, sampling_rate)
 
+        return segments, info
+
+    def transcribe_batch(
+        self, requests: List[dict], run_unbatched: bool = True
+    ) -> List[Optional[Tuple[Optional[List[Segment]], Optional[TranscriptionInfo]]]]:
+        """Transcribes several independent waveforms with shared encoder and decoder calls.
+
+        Requests whose audio fits in a single 30 seconds window and whose language is known
+        are grouped by prompt layout and decoding options. Each group is encoded with a single
+        `encode` call and decoded with a single `generate` call at the first temperature.
+        Requests that cannot be batched, and batched results that would trigger a temperature
+        fallback or need another window after an unfinished last segment, are transcribed
+        again with `transcribe`, so every result matches what `transcribe` returns for the
+        same arguments.
+
+        The `decoding_context` and `mel_cache` of a request are read and updated on the calling
+        thread, so the thread that owns them must not use them until the call returns.
+
+        Arguments:
+          requests: Keyword arguments for `transcribe`, one dict per waveform. `audio` must
+            be a numpy array.
+          run_unbatched: Transcribe the requests that cannot be batched here. If False, their
+            result is None and the caller runs `transcribe` for them, e.g. on the thread of the
+            stream they belong to, so they do not hold up the rest of the batch.
+
+        Returns:
+          A list with one `(segments, info)` tuple per request, in the same order, or None for
+          requests left to the caller.
+        """
+        defaults = {
+            name: parameter.default
+            for name, parameter in signature(self.transcribe).parameters.items()
+            if parameter.default is not parameter.empty
+        }
+        results = [None] * len(requests)
+        groups = {}
+
+        for index, request in enumerate(requests):
+            item = self._prepare_batch_item({**defaults, **request})
+            if item is None:
+                if run_unbatched:
+                    results[index] = self.transcribe(**request)
+            elif item["features"] is None:
+                results[index] = (None, None)
+            else:
+                options = item["options"]
+                key = (
+                    item["prompt"].index(item["tokenizer"].sot),
+                    len(item["prompt"]),
+                    options.beam_size,
+                    options.best_of,
+                    options.patience,
+                    options.length_penalty,
+                    options.repetition_penalty,
+                    options.no_repeat_ngram_size,
+                    options.max_new_tokens,
+                    options.max_initial_timestamp,
+                    options.suppress_blank,
+                    options.suppress_tokens,
+                    options.temperatures[0],
+                )
+                groups.setdefault(key, []).append((index, item))
+
+        for group in groups.values():
+            for (index, item), output in zip(group, self._generate_batch([item for _, item in group])):
+                if output is None:
+                    if run_unbatched:
+                        results[index] = self.transcribe(**requests[index])
+                else:
+                    results[index] = output
+
+        return results
+
+    def _extract_features(
+        self,
+        audio: np.ndarray,
+        chunk_length: Optional[int] = None,
+        mel_cache: Optional[MelSpectrogramCache] = None,
+        stream_offset: int = 0,
+        speech_chunks: Optional[List[dict]] = None,
+    ) -> np.ndarray:
+        if mel_cache is None or chunk_length is not None:
+            return self.feature_extractor(audio, chunk_length=chunk_length)
+        if speech_chunks is not None:
+            # the VAD output is only contiguous with the stream if a single region was kept
+            if len(speech_chunks) != 1:
+                return self.feature_extractor(audio)
+            stream_offset += speech_chunks[0]["start"]
+        return mel_cache(audio, stream_offset)
+
+    def _prepare_batch_item(self, params: dict) -> Optional[dict]:
+        if (
+            params["language"] is None
+            or params["multilingual"]
+            or params["word_timestamps"]
+            or params["clip_timestamps"] != "0"
+            or params["chunk_length"] is not None
+            or not isinstance(params["audio"], np.ndarray)
+        ):
+            return None
+
+        audio = params["audio"]
+        sampling_rate = self.feature_extractor.sampling_rate
+        duration = audio.shape[0] / sampling_rate
+        speech_chunks = None
+        vad_parameters = params["vad_parameters"]
+        if params["vad_filter"]:
+            if vad_parameters is None:
+                vad_parameters = VadOptions()
+            elif isinstance(vad_parameters, dict):
+                vad_parameters = VadOptions(**vad_parameters)
+            speech_chunks = get_speech_timestamps(audio, vad_parameters)
+            audio_chunks, _ = collect_chunks(audio, speech_chunks)
+            audio = np.concatenate(audio_chunks, axis=0)
+        if audio.shape[0] == 0:
+            return {"features": None}
+
+        features = self._extract_features(
+            audio,
+            mel_cache=params["mel_cache"],
+            stream_offset=params["stream_offset"],
+            speech_chunks=speech_chunks,
+        )
+        content_frames = features.shape[-1] - 1
+        if content_frames > self.feature_extractor.nb_max_frames:
+            return None
+
+        language = params["language"]
+        if not self.model.is_multilingual and language != "en":
+            language = "en"
+        decoding_context = params["decoding_context"]
+        if decoding_context is not None:
+            tokenizer = decoding_context.get_tokenizer(params["task"], language)
+            initial_prompt = decoding_context.get_prompt_tokens(params["initial_prompt"])
+        else:
+            tokenizer = Tokenizer(
+                self.hf_tokenizer,
+                self.model.is_multilingual,
+                task=params["task"],
+                language=language,
+            )
+            initial_prompt = params["initial_prompt"]
+        temperature = params["temperature"]
+        suppress_tokens = params["suppress_tokens"]
+        if suppress_tokens:
+            suppress_tokens = (
+                decoding_context.get_suppressed_tokens(tokenizer, suppress_tokens)
+                if decoding_context is not None
+                else get_suppressed_tokens(tokenizer, suppress_tokens)
+            )
+        options = TranscriptionOptions(
+            **{
+                field.name: params[field.name]
+                for field in fields(TranscriptionOptions)
+                if field.name not in ("temperatures", "suppress_tokens", "initial_prompt")
+            },
+            temperatures=(
+                list(temperature) if isinstance(temperature, (list, tuple)) else [temperature]
+            ),
+            suppress_tokens=suppress_tokens,
+            initial_prompt=initial_prompt,
+        )
+
+        previous_tokens = []
+        if options.initial_prompt is not None:
+            if isinstance(options.initial_prompt, str):
+                previous_tokens = tokenizer.encode(" " + options.initial_prompt.strip())
+            else:
+                previous_tokens = list(options.initial_prompt)
+        prompt = self.get_prompt(
+            tokenizer,
+            previous_tokens,
+            without_timestamps=options.without_timestamps,
+            prefix=options.prefix,
+            hotwords=options.hotwords,
+        )
+
         info = TranscriptionInfo(
             language=language,
-            language_probability=language_probability,
+            language_probability=1,
             duration=duration,
-            duration_after_vad=duration_after_vad,
+            duration_after_vad=audio.shape[0] / sampling_rate,
             transcription_options=options,
             vad_options=vad_parameters,
-            all_language_probs=all_language_probs,
+            all_language_probs=None,
         )
+        return {
+            "features": features,
+            "content_frames": content_frames,
+            "tokenizer": tokenizer,
+            "options": options,
+            "prompt": prompt,
+            "speech_chunks": speech_chunks,
+            "info": info,
+        }
+
+    def _generate_batch(self, items: List[dict]) -> List[Optional[tuple]]:
+        # All items share the decoding options and prompt layout, see `transcribe_batch`.
+        options = items[0]["options"]
+        prompt_length = len(items[0]["prompt"])
+        if options.max_new_tokens is not None:
+            max_length = prompt_length + options.max_new_tokens
+        else:
+            max_length = self.max_length
+        if max_length > self.max_length:
+            return [None] * len(items)
+
+        temperature = options.temperatures[0]
+        if temperature > 0:
+            kwargs = {
+                "beam_size": 1,
+                "num_hypotheses": options.best_of,
+                "sampling_topk": 0,
+                "sampling_temperature": temperature,
+            }
+        else:
+            kwargs = {
+                "beam_size": options.beam_size,
+                "patience": options.patience,
+            }
 
-        return segments, info
+        features = np.stack(
+            [pad_or_trim(item["features"][:, : item["content_frames"]]) for item in items]
+        )
+        encoder_output = self.encode(features)
+        results = self.model.generate(
+            encoder_output,
+            [item["prompt"] for item in items],
+            length_penalty=options.length_penalty,
+            repetition_penalty=options.repetition_penalty,
+            no_repeat_ngram_size=options.no_repeat_ngram_size,
+            max_length=max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=options.suppress_blank,
+            suppress_tokens=options.suppress_tokens,
+            max_initial_timestamp_index=int(
+                round(options.max_initial_timestamp / self.time_precision)
+            ),
+            **kwargs,
+        )
+
+        outputs = []
+        for item, result in zip(items, results):
+            tokenizer = item["tokenizer"]
+            item_options = item["options"]
+            tokens = result.sequences_ids[0]
+            seq_len = len(tokens)
+            cum_logprob = result.scores[0] * (seq_len**item_options.length_penalty)
+            avg_logprob = cum_logprob / (seq_len + 1)
+            compression_ratio = get_compression_ratio(tokenizer.decode(tokens).strip())
+
+            if self._can_fall_back(item_options) and self._needs_fallback(
+                result, avg_logprob, compression_ratio, item_options
+            ) and not (
+                item_options.fallback_completed_only
+                and not self._has_completed_segment(tokens, tokenizer)
+            ):
+                outputs.append(None)
+                continue
+
+            segments = self._segments_from_window(
+                tokenizer,
+                item_options,
+                result,
+                avg_logprob,
+                temperature,
+                compression_ratio,
+                item["content_frames"],
+            )
+            if segments is None:
+                outputs.append(None)
+                continue
+            if item["speech_chunks"]:
+                segments = restore_speech_timestamps(
+                    segments, item["speech_chunks"], self.feature_extractor.sampling_rate
+                )
+            outputs.append((segments, item["info"]))
+        return outputs
+
+    def _can_fall_back(self, options: TranscriptionOptions) -> bool:
+        return len(options.temperatures) > 1 and options.max_fallbacks != 0
+
+    def _has_completed_segment(self, tokens: List[int], tokenizer: Tokenizer) -> bool:
+        # Consecutive timestamp tokens end one segment and start the next one.
+        return any(
+            previous >= tokenizer.timestamp_begin and token >= tokenizer.timestamp_begin
+            for previous, token in zip(tokens, tokens[1:])
+        )
+
+    def _needs_fallback(
+        self,
+        result: ctranslate2.models.WhisperGenerationResult,
+        avg_logprob: float,
+        compression_ratio: float,
+        options: TranscriptionOptions,
+    ) -> bool:
+        # Same criteria as `generate_with_fallback`.
+        needs_fallback = (
+            options.compression_ratio_threshold is not None
+            and compression_ratio > options.compression_ratio_threshold
+        ) or (
+            options.log_prob_threshold is not None
+            and avg_logprob < options.log_prob_threshold
+        )
+        if (
+            options.no_speech_threshold is not None
+            and result.no_speech_prob > options.no_speech_threshold
+            and options.log_prob_threshold is not None
+            and avg_logprob < options.log_prob_threshold
+        ):
+            needs_fallback = False  # silence
+        return needs_fallback
+
+    def _segments_from_window(
+        self,
+        tokenizer: Tokenizer,
+        options: TranscriptionOptions,
+        result: ctranslate2.models.WhisperGenerationResult,
+        avg_logprob: float,
+        temperature: float,
+        compression_ratio: float,
+        content_frames: int,
+    ) -> Optional[List[Segment]]:
+        # Single window version of the loop body in `generate_segments`. Returns None if
+        # `generate_segments` would decode another window, i.e. the last segment is not
+        # closed and the rest of the audio is decoded again from its start.
+        if options.no_speech_threshold is not None:
+            should_skip = result.no_speech_prob > options.no_speech_threshold
+            if (
+                options.log_prob_threshold is not None
+                and avg_logprob > options.log_prob_threshold
+            ):
+                should_skip = False
+            if should_skip:
+                return []
+
+        current_segments, seek, _ = self._split_segments_by_timestamps(
+            tokenizer=tokenizer,
+            tokens=result.sequences_ids[0],
+            time_offset=0.0,
+            segment_size=content_frames,
+            segment_duration=content_frames * self.feature_extractor.time_per_frame,
+            seek=0,
+        )
+        if seek < content_frames:
+            return None
+
+        segments = []
+        for segment in current_segments:
+            tokens = segment["tokens"]
+            text = tokenizer.decode(tokens)
+            if segment["start"] == segment["end"] or not text.strip():
+                continue
+            segments.append(Segment(
+                id=len(segments) + 1,
+                seek=0,
+                start=segment["start"],
+                end=segment["end"],
+                text=text,
+                tokens=tokens,
+                temperature=temperature,
+                avg_logprob=avg_logprob,
+                compression_ratio=compression_ratio,
+                no_speech_prob=result.no_speech_prob,
+                words=None,
+            ))
+        return segments
 
     def _split_segments_by_timestamps(
         self,
@@ -1066,6 +1609,9 @@ class WhisperModel:
         options: TranscriptionOptions,
         log_progress,
         encoder_output: Optional[ctranslate2.StorageView] = None,
+        info: Optional[TranscriptionInfo] = None,
+        encoder_cache: Optional[EncoderOutputCache] = None,
+        encoder_cache_key: Optional[Hashable] = None,
     ) -> Iterable[Segment]:
         content_frames = features.shape[-1] - 1
         content_duration = float(content_frames * self.feature_extractor.time_per_frame)
@@ -1147,7 +1693,12 @@ class WhisperModel:
             previous_tokens = all_tokens[prompt_reset_since:]
 
             if seek > 0 or encoder_output is None:
-                encoder_output = self.encode(segment)
+                encoder_output = self._encode_cached(
+                    segment,
+                    segment_size,
+                    encoder_cache,
+                    (encoder_cache_key, seek),
+                )
 
             if options.multilingual:
                 results = self.model.detect_language(encoder_output)
@@ -1165,12 +1716,13 @@ class WhisperModel:
                 hotwords=options.hotwords,
             )
 
-            (
-                result,
-                avg_logprob,
-                temperature,
-                compression_ratio,
-            ) = self.generate_with_fallback(encoder_output, prompt, tokenizer, options)
+            with tracing.span("decode", seek=seek):
+                (
+                    result,
+                    avg_logprob,
+                    temperature,
+                    compression_ratio,
+                ) = self.generate_with_fallback(encoder_output, prompt, tokenizer, options, info)
 
             if options.no_speech_threshold is not None:
                 # no voice activity check
@@ -1236,15 +1788,16 @@ class WhisperModel:
             )
 
             if options.word_timestamps:
-                self.add_word_timestamps(
-                    [current_segments],
-                    tokenizer,
-                    encoder_output,
-                    segment_size,
-                    options.prepend_punctuations,
-                    options.append_punctuations,
-                    last_speech_timestamp=last_speech_timestamp,
-                )
+                with tracing.span("align_words"):
+                    self.add_word_timestamps(
+                        [current_segments],
+                        tokenizer,
+                        encoder_output,
+                        segment_size,
+                        options.prepend_punctuations,
+                        options.append_punctuations,
+                        last_speech_timestamp=last_speech_timestamp,
+                    )
                 if not single_timestamp_ending:
                     last_word_end = get_end(current_segments)
                     if last_word_end is not None and last_word_end > time_offset:
@@ -1358,7 +1911,23 @@ class WhisperModel:
             features = np.expand_dims(features, 0)
         features = get_ctranslate2_storage(features)
 
-        return self.model.encode(features, to_cpu=to_cpu)
+        with tracing.span("encode", batch=features.shape[0]):
+            return self.model.encode(features, to_cpu=to_cpu)
+
+    def _encode_cached(
+        self,
+        features: np.ndarray,
+        content_frames: int,
+        encoder_cache: Optional[EncoderOutputCache],
+        window_key: Hashable,
+    ) -> ctranslate2.StorageView:
+        if encoder_cache is None:
+            return self.encode(features)
+        encoder_output, digest = encoder_cache.lookup(window_key, features, content_frames)
+        if encoder_output is None:
+            encoder_output = self.encode(features)
+            encoder_cache.store(window_key, content_frames, digest, encoder_output)
+        return encoder_output
 
     def generate_with_fallback(
         self,
@@ -1366,6 +1935,7 @@ class WhisperModel:
         prompt: List[int],
         tokenizer: Tokenizer,
         options: TranscriptionOptions,
+        info: Optional[TranscriptionInfo] = None,
     ) -> Tuple[ctranslate2.models.WhisperGenerationResult, float, float, float]:
         decode_result = None
         all_results = []
@@ -1390,7 +1960,13 @@ class WhisperModel:
                 f"so that their combined length is less that {self.max_length}."
             )
 
-        for temperature in options.temperatures:
+        temperatures = options.temperatures
+        if options.max_fallbacks is not None:
+            temperatures = temperatures[: options.max_fallbacks + 1]
+
+        for attempt, temperature in enumerate(temperatures):
+            if attempt > 0 and info is not None:
+                info.num_fallbacks += 1
             if temperature > 0:
                 kwargs = {
                     "beam_size": 1,
@@ -1473,6 +2049,13 @@ class WhisperModel:
             ):
                 needs_fallback = False  # silence
 
+            if (
+                needs_fallback
+                and options.fallback_completed_only
+                and not self._has_completed_segment(tokens, tokenizer)
+            ):
+                needs_fallback = False  # decoded again once more audio arrives
+
             if not needs_fallback:
                 break
         else:
@@ -1553,28 +2136,36 @@ class WhisperModel:
         )
         median_max_durations = []
         for alignment in alignments:
-            word_durations = np.array(
-                [word["end"] - word["start"] for word in alignment]
-            )
-            word_durations = word_durations[word_durations.nonzero()]
+            starts = np.array([word["start"] for word in alignment], dtype=np.float64)
+            ends = np.array([word["end"] for word in alignment], dtype=np.float64)
+            word_durations = ends - starts
+            nonzero_durations = word_durations[word_durations.nonzero()]
             median_duration = (
-                np.median(word_durations) if len(word_durations) > 0 else 0.0
+                np.median(nonzero_durations) if len(nonzero_durations) > 0 else 0.0
             )
             median_duration = min(0.7, float(median_duration))
             max_duration = median_duration * 2
 
             # hack: truncate long words at sentence boundaries.
             # a better segmentation algorithm based on VAD should be able to replace this.
-            if len(word_durations) > 0:
+            if len(nonzero_durations) > 0:
                 sentence_end_marks = ".。!！?？"
                 # ensure words at sentence boundaries
                 # are not longer than twice the median word duration.
-                for i in range(1, len(alignment)):
-                    if alignment[i]["end"] - alignment[i]["start"] > max_duration:
-                        if alignment[i]["word"] in sentence_end_marks:
-                            alignment[i]["end"] = alignment[i]["start"] + max_duration
-                        elif alignment[i - 1]["word"] in sentence_end_marks:
-                            alignment[i]["start"] = alignment[i]["end"] - max_duration
+                too_long = word_durations > max_duration
+                too_long[0] = False
+                if too_long.any():
+                    is_mark = np.array(
+                        [word["word"] in sentence_end_marks for word in alignment]
+                    )
+                    clip_end = too_long & is_mark
+                    clip_start = too_long & ~is_mark
+                    clip_start[1:] &= is_mark[:-1]
+                    clip_start[0] = False
+                    for i in np.flatnonzero(clip_end):
+                        alignment[i]["end"] = float(starts[i] + max_duration)
+                    for i in np.flatnonzero(clip_start):
+                        alignment[i]["start"] = float(ends[i] - max_duration)
 
             merge_punctuations(alignment, prepend_punctuations, append_punctuations)
             median_max_durations.append((median_duration, max_duration))
@@ -1676,10 +2267,10 @@ class WhisperModel:
         )
         return_list = []
         for result, text_token in zip(results, text_tokens):
-            text_token_probs = result.text_token_probs
-            alignments = result.alignments
-            text_indices = np.array([pair[0] for pair in alignments])
-            time_indices = np.array([pair[1] for pair in alignments])
+            text_token_probs = np.asarray(result.text_token_probs, dtype=np.float64)
+            alignments = np.asarray(result.alignments, dtype=np.int64).reshape(-1, 2)
+            text_indices = alignments[:, 0]
+            time_indices = alignments[:, 1]
 
             words, word_tokens = tokenizer.split_to_word_tokens(
                 text_token + [tokenizer.eot]
@@ -1692,9 +2283,10 @@ class WhisperModel:
                 # IndexError: arrays used as indices must be of integer (or boolean) type
                 return_list.append([])
                 continue
-            word_boundaries = np.pad(
-                np.cumsum([len(t) for t in word_tokens[:-1]]), (1, 0)
+            word_lengths = np.fromiter(
+                (len(t) for t in word_tokens[:-1]), dtype=np.int64
             )
+            word_boundaries = np.pad(np.cumsum(word_lengths), (1, 0))
             if len(word_boundaries) <= 1:
                 return_list.append([])
                 continue
@@ -1703,12 +2295,15 @@ class WhisperModel:
                 bool
             )
             jump_times = time_indices[jumps] / self.tokens_per_second
-            start_times = jump_times[word_boundaries[:-1]]
-            end_times = jump_times[word_boundaries[1:]]
-            word_probabilities = [
-                np.mean(text_token_probs[i:j])
-                for i, j in zip(word_boundaries[:-1], word_boundaries[1:])
-            ]
+            start_times = jump_times[word_boundaries[:-1]].tolist()
+            end_times = jump_times[word_boundaries[1:]].tolist()
+            # mean probability of the tokens of each word, in one pass over all tokens
+            word_probabilities = (
+                np.add.reduceat(
+                    text_token_probs[: word_boundaries[-1]], word_boundaries[:-1]
+                )
+                / word_lengths
+            ).tolist()
 
             return_list.append(
                 [
@@ -1734,6 +2329,7 @@ class WhisperModel:
         vad_parameters: Union[dict, VadOptions] = None,
         language_detection_segments: int = 1,
         language_detection_threshold: float = 0.5,
+        encoder_output: Optional[ctranslate2.StorageView] = None,
     ) -> Tuple[str, float, List[Tuple[str, float]]]:
         """
         Use Whisper to detect the language of the input audio or features.
@@ -1750,6 +2346,8 @@ class WhisperModel:
             language_detection_threshold: If the maximum probability of the language tokens is
                 higher than this value, the language is detected.
             language_detection_segments: Number of segments to consider for the language detection.
+            encoder_output: Encoder output of the first window of `features`, used instead of
+                encoding it again.
 
         Returns:
             language: Detected language.
@@ -1777,9 +2375,12 @@ class WhisperModel:
 
         detected_language_info = {}
         for i in range(0, features.shape[-1], self.feature_extractor.nb_max_frames):
-            encoder_output = self.encode(
-                pad_or_trim(features[..., i : i + self.feature_extractor.nb_max_frames])
-            )
+            if i > 0 or encoder_output is None:
+                encoder_output = self.encode(
+                    pad_or_trim(
+                        features[..., i : i + self.feature_extractor.nb_max_frames]
+                    )
+                )
             # results is a list of tuple[str, float] with language names and probabilities.
             results = self.model.detect_language(encoder_output)[0]
 
@@ -1867,34 +2468,45 @@ def get_suppressed_tokens(
 
 
 def merge_punctuations(alignment: List[dict], prepended: str, appended: str) -> None:
-    # merge prepended punctuations
-    i = len(alignment) - 2
-    j = len(alignment) - 1
-    while i >= 0:
-        previous = alignment[i]
-        following = alignment[j]
-        if previous["word"].startswith(" ") and previous["word"].strip() in prepended:
-            # prepend it to the following word
+    # only punctuation words take part in a merge, so the words that do are found
+    # with array operations and the loops below only visit those
+    num_words = len(alignment)
+    if num_words < 2:
+        return
+
+    # merge prepended punctuations into the next word that is not merged itself
+    is_prepended = np.array(
+        [
+            word["word"].startswith(" ") and word["word"].strip() in prepended
+            for word in alignment[:-1]
+        ]
+        + [False]
+    )
+    if is_prepended.any():
+        indices = np.arange(num_words)
+        next_target = np.minimum.accumulate(
+            np.where(is_prepended, num_words, indices)[::-1]
+        )[::-1]
+        for i in np.flatnonzero(is_prepended)[::-1]:
+            previous = alignment[i]
+            following = alignment[next_target[i + 1]]
             following["word"] = previous["word"] + following["word"]
             following["tokens"] = previous["tokens"] + following["tokens"]
             previous["word"] = ""
             previous["tokens"] = []
-        else:
-            j = i
-        i -= 1
 
-    # merge appended punctuations
-    i = 0
-    j = 1
-    while j < len(alignment):
+    # merge appended punctuations into the previous word that is not merged itself
+    is_appended = [word["word"] in appended for word in alignment]
+    target = {}
+    for j in np.flatnonzero(is_appended):
+        if j == 0:
+            continue
+        i = target.get(j - 1, j - 1)
         previous = alignment[i]
-        following = alignment[j]
-        if not previous["word"].endswith(" ") and following["word"] in appended:
-            # append it to the previous word
+        if not previous["word"].endswith(" "):
+            following = alignment[j]
             previous["word"] = previous["word"] + following["word"]
             previous["tokens"] = previous["tokens"] + following["tokens"]
             following["word"] = ""
             following["tokens"] = []
-        else:
-            i = j
-        j += 1
\ No newline at end of file
+            target[j] = i
@@ -1,11 +1,40 @@
 import os
+import logging
+import queue
 import subprocess
+import threading
+import time
+from concurrent.futures import Future
 import torch
 import numpy as np
 import onnxruntime
 import warnings
 
 
+class VADStreamState:
+    """
+    Recurrent state of one audio stream for `VoiceActivityDetection.stream`.
+
+    Holds the Silero LSTM state, the trailing context samples of the previous window, and samples that did not
+    fill a whole window yet, so a stream can be fed packet by packet without resetting the model in between.
+    """
+
+    def __init__(self, sr=16000):
+        """
+        Args:
+            sr (int, optional): Sampling rate of the stream, 8000 or 16000. Defaults to 16000.
+        """
+        self.sr = sr
+        self.window_size = 512 if sr == 16000 else 256
+        self.context_size = 64 if sr == 16000 else 32
+        self.reset()
+
+    def reset(self):
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.context = np.zeros(self.context_size, dtype=np.float32)
+        self.pending = np.zeros(0, dtype=np.float32)
+
+
 class VoiceActivityDetection():
 
     def __init__(self, force_onnx_cpu=True):
@@ -108,6 +137,77 @@ class VoiceActivityDetection():
         stacked = torch.cat(outs, dim=1)
         return stacked.cpu()
 
+    def run_windows(self, windows, states):
+        """
+        Scores one window for each of several independent streams with a single `session.run`.
+
+        Args:
+            windows (np.ndarray): Array of shape (batch, window_size), one window per stream.
+            states (list[VADStreamState]): The state of each stream, updated in place. All streams must share a
+                sampling rate and every state may appear only once, since consecutive windows of a stream depend
+                on each other.
+
+        Returns:
+            np.ndarray: Speech probability of each window, shape (batch,).
+        """
+        sr = states[0].sr
+        x = np.concatenate([np.stack([s.context for s in states]), windows], axis=1).astype(np.float32, copy=False)
+        ort_inputs = {
+            'input': x,
+            'state': np.concatenate([s.state for s in states], axis=1),
+            'sr': np.array(sr, dtype='int64'),
+        }
+        out, state = self.session.run(None, ort_inputs)
+        context_size = states[0].context_size
+        for i, s in enumerate(states):
+            s.state = state[:, i:i + 1]
+            s.context = x[i, -context_size:]
+        return out[:, 0]
+
+    def stream_batch(self, audios, states):
+        """
+        Scores newly arrived audio of several streams, keeping each stream's model state between calls.
+
+        Audio that does not fill a whole window is kept in the stream state and scored with the next call. The
+        k-th window of every stream is scored in the same `session.run`, so the number of model calls depends on
+        the longest input rather than the number of streams.
+
+        Args:
+            audios (list[np.ndarray]): New audio of each stream.
+            states (list[VADStreamState]): The state of each stream, each appearing at most once.
+
+        Returns:
+            list[np.ndarray]: Speech probability of every completed window of each stream.
+        """
+        window_size = states[0].window_size
+        windows = []
+        for audio, s in zip(audios, states):
+            audio = np.concatenate([s.pending, np.asarray(audio, dtype=np.float32).reshape(-1)])
+            num_windows = audio.shape[0] // window_size
+            s.pending = audio[num_windows * window_size:]
+            windows.append(audio[:num_windows * window_size].reshape(num_windows, window_size))
+
+        probs = [np.zeros(w.shape[0], dtype=np.float32) for w in windows]
+        for k in range(max((w.shape[0] for w in windows), default=0)):
+            active = [i for i, w in enumerate(windows) if w.shape[0] > k]
+            out = self.run_windows(np.stack([windows[i][k] for i in active]), [states[i] for i in active])
+            for i, p in zip(active, out):
+                probs[i][k] = p
+        return probs
+
+    def stream(self, audio, state):
+        """
+        Scores newly arrived audio of a single stream, see `stream_batch`.
+
+        Args:
+            audio (np.ndarray): New audio of the stream.
+            state (VADStreamState): The state of the stream.
+
+        Returns:
+            np.ndarray: Speech probability of every completed window.
+        """
+        return self.stream_batch([audio], [state])[0]
+
     @staticmethod
     def download(model_url="https://github.com/snakers4/silero-vad/raw/v5.0/files/silero_vad.onnx"):
         target_dir = os.path.expanduser("~/.cache/whisper-live/")
@@ -128,17 +228,136 @@ class VoiceActivityDetection():
         return model_filename
 
 
+class VoiceActivityDetectionService:
+    """
+    Process-wide VAD that scores the audio of all sessions in shared model calls.
+
+    Sessions call `stream` from their own threads, exactly as they would call `VoiceActivityDetection.stream`,
+    and block until their audio is scored. A single worker thread takes the first pending request, waits up to
+    `max_batch_wait_ms` for other sessions to submit theirs (or until `max_batch_size` are pending), and scores
+    the whole tick with `VoiceActivityDetection.stream_batch`, i.e. one `session.run` of batch size N per model
+    window instead of N tiny runs. Every session keeps its own `VADStreamState`, whose LSTM state rows are
+    gathered into the batch and scattered back after each run.
+    """
+
+    def __init__(self, model=None, max_batch_size=256, max_batch_wait_ms=2):
+        """
+        Args:
+            model (VoiceActivityDetection, optional): Model to score audio with. Defaults to a new model.
+            max_batch_size (int, optional): Maximum number of sessions scored per tick. Defaults to 256.
+            max_batch_wait_ms (float, optional): How long the first request of a tick waits for other sessions.
+                Defaults to 2.
+        """
+        self.model = model if model is not None else VoiceActivityDetection()
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_wait = max(0.0, max_batch_wait_ms) / 1000
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True, name="vad-service")
+        self.worker.start()
+
+    def stream(self, audio, state):
+        """
+        Queues newly arrived audio of a session and waits for its speech probabilities.
+
+        Args:
+            audio (np.ndarray): New audio of the session.
+            state (VADStreamState): The state of the session.
+
+        Returns:
+            np.ndarray: Speech probability of every completed window, see `VoiceActivityDetection.stream`.
+        """
+        future = Future()
+        self.requests.put((audio, state, future))
+        return future.result()
+
+    def next_batch(self):
+        """
+        Blocks until a request is pending, then collects up to `max_batch_size` requests that arrive within
+        `max_batch_wait` seconds of it.
+
+        Returns:
+            list: `(audio, state, future)` tuples, empty if the service was closed.
+        """
+        batch = [self.requests.get()]
+        if batch[0] is None:
+            return []
+        deadline = time.monotonic() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def score(self, batch):
+        """
+        Scores a batch of requests and resolves their futures.
+
+        A state may be submitted more than once in a tick, e.g. by a session calling from several threads. Its
+        windows depend on each other, so such requests are scored in later rounds, in submission order.
+
+        Args:
+            batch (list): `(audio, state, future)` tuples.
+        """
+        while batch:
+            seen = set()
+            current, deferred = [], []
+            for request in batch:
+                (deferred if id(request[1]) in seen else current).append(request)
+                seen.add(id(request[1]))
+            audios, states, futures = zip(*current)
+            try:
+                results = self.model.stream_batch(list(audios), list(states))
+            except Exception as e:
+                logging.error(f"[ERROR]: Batched VAD of {len(current)} sessions failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            batch = deferred
+
+    def run(self):
+        """
+        Worker loop, scores ticks until `close` is called.
+        """
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                break
+            self.score(batch)
+
+    def close(self):
+        """
+        Stops the worker thread once the requests already queued have been scored.
+        """
+        self.requests.put(None)
+
+
 class VoiceActivityDetector:
-    def __init__(self, threshold=0.5, frame_rate=16000):
+    def __init__(self, threshold=0.5, frame_rate=16000, model=None):
         """
         Initializes the VoiceActivityDetector with a voice activity detection model and a threshold.
 
+        The detector tracks a single audio stream: the model state is kept from one frame to the next instead of
+        being reset for every frame, so use one detector per client.
+
         Args:
             threshold (float, optional): The probability threshold for detecting voice activity. Defaults to 0.5.
+            frame_rate (int, optional): Sampling rate of the audio. Defaults to 16000.
+            model (VoiceActivityDetection or VoiceActivityDetectionService, optional): Model to score audio with,
+                which may be shared between detectors. Defaults to a new model.
         """
-        self.model = VoiceActivityDetection()
+        self.model = model if model is not None else VoiceActivityDetection()
         self.threshold = threshold
         self.frame_rate = frame_rate
+        self.stream_state = VADStreamState(frame_rate)
+        self.last_result = False
 
     def __call__(self, audio_frame):
         """
@@ -151,7 +370,16 @@ class VoiceActivityDetector:
 
         Returns:
             bool: True if the speech probability exceeds the threshold, indicating the presence of voice activity;
-                  False otherwise.
+                  False otherwise. Frames too short to complete a model window repeat the previous result.
+        """
+        speech_probs = self.model.stream(audio_frame, self.stream_state)
+        if speech_probs.shape[0]:
+            self.last_result = bool((speech_probs > self.threshold).any())
+        return self.last_result
+
+    def reset(self):
+        """
+        Forgets the stream history, e.g. when the audio is discontinuous.
         """
-        speech_probs = self.model.audio_forward(torch.from_numpy(audio_frame.copy()), self.frame_rate)[0]
-        return torch.any(speech_probs > self.threshold).item()
+        self.stream_state.reset()
+        self.last_result = False